@@ -1,3 +1,26 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Campaign, Candidate, ProcessedResponse, Outcome, OutboxMessage
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = ('role', 'form_id', 'is_active', 'created_at')
+
+
+@admin.register(Candidate)
+class CandidateAdmin(admin.ModelAdmin):
+    list_display = ('email', 'campaign', 'score', 'response_id')
+    list_filter = ('campaign',)
+    search_fields = ('email', 'response_id')
+
+
+admin.site.register(ProcessedResponse)
+admin.site.register(Outcome)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('email', 'kind', 'decision', 'status', 'attempts', 'sent_at', 'campaign')
+    list_filter = ('campaign', 'kind', 'status')
+    search_fields = ('email', 'idempotency_key')
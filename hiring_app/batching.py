@@ -0,0 +1,55 @@
+import httplib2
+from googleapiclient.errors import HttpError
+
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+def is_transient(error):
+    """True for Google API failures worth retrying after a backoff."""
+    if isinstance(error, HttpError):
+        # Per-user quota comes back as 403 rateLimitExceeded / userRateLimitExceeded
+        return error.resp.status in TRANSIENT_STATUSES or (
+            error.resp.status == 403 and b"ateLimitExceeded" in (error.content or b""))
+    return isinstance(error, (httplib2.HttpLib2Error, OSError))
+
+
+class ApiBatch:
+    """Collects googleapiclient requests for one service and runs them as BatchHttpRequests.
+
+    Results come back keyed by whatever the caller passed to add(), so per-candidate
+    outcomes can be reported without caring how the calls were grouped.
+    """
+
+    def __init__(self, service, limit=100):
+        self.service = service
+        self.limit = limit
+        self._items = []
+
+    def add(self, key, request):
+        self._items.append((key, request))
+
+    def __len__(self):
+        return len(self._items)
+
+    def execute(self, on_chunk=None):
+        # {key: (response, exception)}; exactly one of the two is None.
+        # on_chunk receives each batch's slice of that dict as soon as the batch returns.
+        results = {}
+        for start in range(0, len(self._items), self.limit):
+            chunk = self._items[start:start + self.limit]
+
+            def on_item(request_id, response, exception, chunk=chunk):
+                results[chunk[int(request_id)][0]] = (response, exception)
+
+            batch = self.service.new_batch_http_request(callback=on_item)
+            for i, (_, request) in enumerate(chunk):
+                batch.add(request, request_id=str(i))
+            try:
+                batch.execute()
+            except (HttpError, httplib2.HttpLib2Error, OSError) as e:
+                # The batch request itself failed: every item in it gets that error
+                for key, _ in chunk:
+                    results.setdefault(key, (None, e))
+            if on_chunk: on_chunk({key: results[key] for key, _ in chunk if key in results})
+        self._items = []
+        return results
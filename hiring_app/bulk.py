@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db.models import OuterRef, Subquery
+
+from . import details
+from .models import Outcome
+
+# Bulk export of a campaign's candidates to CSV or Parquet/Arrow, and reading such files back
+# for HiringAutomator.import_candidates. Rows are produced and written a chunk at a time, so
+# memory stays flat however many candidates a campaign has. Parquet/Arrow need pyarrow.
+
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet",
+           "arrow": "application/vnd.apache.arrow.file"}
+
+# (column, type); `text` is only exported when asked for
+COLUMNS = [
+    ("id", "int"), ("response_id", "str"), ("email", "str"), ("status", "str"), ("submissions", "int"),
+    ("score", "int"), ("relevance", "float"), ("llm_rating", "int"), ("llm_summary", "str"),
+    ("decision", "str"), ("invited_at", "time"), ("submitted_at", "str"), ("drive_link", "str"),
+    ("file_id", "str"), ("content_hash", "str"),
+    # extracted-text features
+    ("skills_matched", "int"), ("keyword_hits", "str"), ("pages_read", "int"), ("total_pages", "int"),
+    ("truncated", "str"), ("download_error", "str"),
+]
+TEXT_COLUMN = ("text", "str")
+CHUNK_ROWS = 2000
+
+
+class FormatUnavailable(Exception):
+    pass
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def columns(with_text=False):
+    return COLUMNS + [TEXT_COLUMN] if with_text else COLUMNS
+
+
+def candidate_rows(campaign, with_text=False):
+    """Yield one tuple per candidate, in columns() order, oldest first."""
+    latest_outcome = Outcome.objects.filter(campaign=campaign, email=OuterRef('email')).order_by('-created_at', '-id')
+    rows = campaign.candidates.order_by('id').annotate(
+        decision=Subquery(latest_outcome.values('status')[:1])).values_list(
+        'id', 'response_id', 'email', 'status', 'submissions', 'score', 'relevance', 'llm_rating', 'llm_summary',
+        'decision', 'invited_at', 'submitted_at', 'drive_link', 'file_id', 'content_hash', 'keyword_hits', 'extract_meta')
+    for chunk in chunked(rows.iterator(chunk_size=CHUNK_ROWS), CHUNK_ROWS):
+        texts = details.load(row[0] for row in chunk) if with_text else {}
+        for row in chunk:
+            hits, meta = row[-2] or {}, row[-1] or {}
+            out = row[:-2] + (len(hits), json.dumps(hits, sort_keys=True), meta.get('pages_read'), meta.get('total_pages'),
+                              meta.get('truncated'), meta.get('download_error'))
+            if with_text: out += (texts.get(row[0], {}).get('text', ""),)
+            yield out
+
+
+def csv_chunks(rows, names):
+    """Encode rows as CSV text, a few hundred rows per yielded string (for StreamingHttpResponse)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(names)
+    for chunk in chunked(rows, 500):
+        writer.writerows([["" if v is None else v.isoformat() if hasattr(v, 'isoformat') else v for v in row]
+                          for row in chunk])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell(): yield buf.getvalue()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise FormatUnavailable("Parquet/Arrow files need pyarrow (pip install pyarrow); CSV works without it")
+
+
+def write_arrow(rows, cols, sink, fmt="parquet"):
+    """Write rows to `sink` (a path or binary file) as Parquet or an Arrow IPC file, one record batch per chunk."""
+    pa = _pyarrow()
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "time": pa.timestamp("us", tz="UTC")}
+    schema = pa.schema([(name, types[kind]) for name, kind in cols])
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    try:
+        for chunk in chunked(rows, CHUNK_ROWS):
+            arrays = [pa.array(list(values), type=field.type) for values, field in zip(zip(*chunk), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    finally:
+        writer.close()
+
+
+def read_rows(path):
+    """Yield each row of a .csv, .parquet or .arrow file as a dict, reading a batch at a time."""
+    fmt = path.rsplit(".", 1)[-1].lower()
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as fh:
+            yield from csv.DictReader(fh)
+        return
+    if fmt not in FORMATS: raise FormatUnavailable(f"Unknown file type .{fmt}; use .csv, .parquet or .arrow")
+    pa = _pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=CHUNK_ROWS)
+        for batch in batches: yield from batch.to_pylist()
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches): yield from reader.get_batch(i).to_pylist()
@@ -0,0 +1,134 @@
+import os
+import threading
+
+import google_auth_httplib2
+import httplib2
+import google.generativeai as genai
+from django.conf import settings
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from . import metrics
+from .ratelimit import per_minute
+
+SCOPES = [
+    "https://www.googleapis.com/auth/forms.body",
+    "https://www.googleapis.com/auth/forms.responses.readonly",
+    "https://www.googleapis.com/auth/drive",
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/gmail.send",
+]
+
+# Process-wide: one Credentials per token file, shared by every request and thread.
+# Services are cached per thread because their httplib2 transport is not thread-safe.
+_lock = threading.Lock()
+_credentials = {}
+_persisted_tokens = {}
+_local = threading.local()
+_gemini_key = None
+_gemini_models = {}
+_buckets = {}
+
+# Requests per minute per Google API, shared by every thread in the process (so parallel
+# campaign syncs split one quota); HIRING_GOOGLE_RPM overrides per API.
+DEFAULT_RPM = {"forms": 300, "drive": 1000, "sheets": 60, "gmail": 250}
+
+
+def credentials(token_path):
+    with _lock:
+        creds = _credentials.get(token_path)
+        if creds is None:
+            if not os.path.exists(token_path):
+                print(f"⚠️ Warning: {token_path} not found.")
+                return None
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+            _credentials[token_path] = creds
+            _persisted_tokens[token_path] = creds.token
+        if creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        # AuthorizedHttp may also have refreshed in the background since we last looked
+        if creds.token != _persisted_tokens.get(token_path):
+            _persist(creds, token_path)
+            _persisted_tokens[token_path] = creds.token
+        return creds
+
+
+def _persist(creds, token_path):
+    tmp_path = f"{token_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(creds.to_json())
+    os.replace(tmp_path, token_path)
+
+
+def service(name, version, token_path):
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    key = (token_path, name, version)
+    svc = services.get(key)
+    if svc is None:
+        creds = credentials(token_path)
+        if creds is None: raise RuntimeError(f"Google credentials missing: {token_path}")
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=RateLimitedHttp(bucket(name), api=name))
+        svc = services[key] = build(name, version, http=http, cache_discovery=False)
+    else:
+        credentials(token_path)  # refresh + persist if the shared token expired
+    return svc
+
+
+def bucket(api):
+    with _lock:
+        if api not in _buckets:
+            rpm = {**DEFAULT_RPM, **getattr(settings, 'HIRING_GOOGLE_RPM', {})}.get(api, 600)
+            _buckets[api] = per_minute(rpm)
+        return _buckets[api]
+
+
+class RateLimitedHttp(httplib2.Http):
+    # Each request (a batch counts as one) waits for a token from its API's bucket; both the
+    # wait and the call itself are timed into the current run's metrics
+    def __init__(self, bucket, api=None, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket = bucket
+        self.api = api or "google"
+
+    def request(self, *args, **kwargs):
+        with metrics.timer(f"quota_wait.{self.api}"):
+            self.bucket.acquire()
+        with metrics.timer(f"api.{self.api}"):
+            return super().request(*args, **kwargs)
+
+
+def configure_gemini():
+    global _gemini_key
+    key = getattr(settings, 'GEMINI_API_KEY', None)
+    if key and key != _gemini_key:
+        with _lock:
+            genai.configure(api_key=key)
+            _gemini_key = key
+
+
+def gemini_model(name):
+    # Shared per process; HIRING_FAKE_GEMINI swaps in the offline stand-in from fakes.py
+    if getattr(settings, 'HIRING_FAKE_GEMINI', False):
+        from .fakes import FakeGenerativeModel
+        return _gemini_models.setdefault(("fake", name), FakeGenerativeModel(name))
+    configure_gemini()
+    with _lock:
+        model = _gemini_models.get(name)
+        if model is None:
+            model = _gemini_models[name] = genai.GenerativeModel(name)
+    return model
+
+
+def reset():
+    # Drop cached credentials/services, e.g. after token.json is replaced by hand
+    global _gemini_key
+    with _lock:
+        _credentials.clear()
+        _persisted_tokens.clear()
+        _gemini_models.clear()
+        _buckets.clear()
+        _gemini_key = None
+    _local.services = {}
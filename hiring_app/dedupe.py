@@ -0,0 +1,29 @@
+# One candidate per person per campaign: repeat form submissions are recognised by their
+# normalized email or by identical resume bytes (Drive's md5), and the latest one wins.
+
+# Providers that ignore dots and +tags in the local part
+DOT_BLIND_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    local, at, domain = email.rpartition("@")
+    if not at or not local: return email
+    if domain in DOT_BLIND_DOMAINS:
+        local = local.split("+", 1)[0].replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"
+
+
+def supersede(slots, key):
+    """Mark every slot that a later one (same key) replaces with slot["duplicate_of"].
+
+    Slots must be in submission order; returns {key: latest slot}. Keyless slots are left alone.
+    """
+    latest = {}
+    for slot in slots:
+        k = key(slot)
+        if not k or slot.get("duplicate_of"): continue
+        if k in latest: latest[k]["duplicate_of"] = slot["id"]
+        latest[k] = slot
+    return latest
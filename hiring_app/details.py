@@ -0,0 +1,44 @@
+import json
+import zlib
+
+from django.utils import timezone
+
+from . import metrics
+from .models import CandidateDetail
+
+# The candidate table holds the summary every dashboard page loads; full resume text (and
+# anything else that grows per candidate) is kept here compressed, one row per candidate,
+# and only read when a row is expanded or a resume is reviewed.
+
+
+def pack(data):
+    raw = json.dumps(data, separators=(",", ":")).encode('utf-8')
+    return zlib.compress(raw, 6), len(raw)
+
+
+def unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob))) if blob else {}
+
+
+def save(entries):
+    """Upsert {candidate_id: data}; the stored data is replaced, not merged."""
+    now = timezone.now()
+    rows = []
+    for candidate_id, data in entries.items():
+        blob, size = pack(data)
+        rows.append(CandidateDetail(candidate_id=candidate_id, data=blob, raw_bytes=size, updated_at=now))
+        metrics.count("details.bytes", len(blob))
+    CandidateDetail.objects.bulk_create(
+        rows, batch_size=500, update_conflicts=True, unique_fields=['candidate'],
+        update_fields=['data', 'raw_bytes', 'updated_at'],
+    )
+
+
+def load(candidate_ids):
+    """{candidate_id: data} for those that have details stored."""
+    found = {}
+    candidate_ids = list(candidate_ids)
+    for i in range(0, len(candidate_ids), 500):
+        rows = CandidateDetail.objects.filter(candidate_id__in=candidate_ids[i:i + 500]).values_list('candidate_id', 'data')
+        for candidate_id, blob in rows: found[candidate_id] = unpack(blob)
+    return found
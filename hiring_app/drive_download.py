@@ -0,0 +1,88 @@
+import os
+import time
+
+from django.conf import settings
+from googleapiclient.errors import HttpError
+
+from . import metrics, resume_cache
+from .batching import is_transient
+from .ratelimit import backoff_delays
+
+
+class DownloadFailed(Exception):
+    pass
+
+
+def download(drive, file_id, path, meta=None, retries=None, chunk_size=None):
+    """Download a Drive file to `path`, resuming from the partial copy after a failure.
+
+    Bytes land in `path + ".part"` and are renamed into place only once they match Drive's
+    size/md5. Raises DownloadFailed when that doesn't happen within the retries; a partial
+    file left by transient errors is kept, so the next attempt picks up where it stopped.
+    """
+    retries = getattr(settings, 'HIRING_DOWNLOAD_RETRIES', 5) if retries is None else retries
+    chunk_size = chunk_size or getattr(settings, 'HIRING_DOWNLOAD_CHUNK_BYTES', 8 << 20)
+    meta = meta or {}
+    part = f"{path}.part"
+    delays = backoff_delays(retries, base=1.0, cap=30.0)
+    while True:
+        try:
+            _fetch(drive, file_id, part, chunk_size)
+            problem = verify(part, meta)
+            if not problem:
+                os.replace(part, path)
+                return path
+            os.remove(part)  # wrong bytes: start over rather than resume on top of them
+            error = DownloadFailed(problem)
+        except Exception as e:
+            if not is_transient(e):
+                _discard(part)
+                raise DownloadFailed(_describe(e)) from e
+            error = e
+        delay = next(delays, None)
+        if delay is None: raise DownloadFailed(_describe(error))
+        metrics.count("retries.drive")
+        time.sleep(delay)
+
+
+def verify(path, meta):
+    """None if the file matches Drive's metadata, otherwise what is wrong with it."""
+    size, md5 = meta.get('size'), meta.get('md5Checksum')
+    actual = os.path.getsize(path)
+    if size and actual != int(size): return f"size {actual} != {size}"
+    if md5 and resume_cache.file_md5(path) != md5: return "md5 mismatch"
+    if not actual: return "empty file"
+    return None
+
+
+def _fetch(drive, file_id, part, chunk_size):
+    # Ranged GETs from the end of the partial file; Drive answers 206 per chunk
+    req = drive.files().get_media(fileId=file_id)
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    with open(part, "ab") as fh:
+        while True:
+            headers = dict(req.headers, range=f"bytes={offset}-{offset + chunk_size - 1}")
+            resp, content = req.http.request(req.uri, method="GET", headers=headers)
+            if resp.status == 416: return  # nothing past the end: the partial file is complete
+            if resp.status >= 300: raise HttpError(resp, content, uri=req.uri)
+            if resp.status == 200:
+                # Range ignored, so this is the whole file
+                fh.seek(0)
+                fh.truncate()
+                fh.write(content)
+                metrics.count("drive.bytes", len(content))
+                return
+            fh.write(content)
+            metrics.count("drive.bytes", len(content))
+            offset += len(content)
+            total = resp.get('content-range', '').rpartition('/')[2]
+            if not content or (offset >= int(total) if total.isdigit() else len(content) < chunk_size): return
+
+
+def _describe(error):
+    if isinstance(error, HttpError): return f"HTTP {error.resp.status}: {error.reason}"
+    return str(error) or type(error).__name__
+
+
+def _discard(part):
+    if os.path.exists(part): os.remove(part)
@@ -0,0 +1,359 @@
+"""In-process stand-ins for external services, for local runs and tests without API keys."""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import httplib2
+from google.api_core import exceptions as google_exceptions
+from googleapiclient.errors import HttpError
+
+from . import metrics, scoring
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Mimics genai.GenerativeModel.generate_content.
+
+    Resume-evaluation prompts (see llm_eval.py) get a JSON array back with a rating derived
+    from how many JD words each resume shares; any other prompt gets a short markdown draft.
+    `latency` (seconds) and `error_rate` (0-1, raised as 429 ResourceExhausted) simulate load.
+    """
+
+    RESUME_RE = re.compile(r"^=== RESUME id=(\S+) ===\n(.*?)(?=^=== RESUME id=|\Z)", re.S | re.M)
+
+    def __init__(self, model_name="fake-gemini", latency=0.0, error_rate=0.0, seed=None):
+        self.model_name = model_name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        if stream:
+            # Real streaming replies are iterables of partial responses
+            text = self.generate_content(prompt, generation_config).text
+            return (FakeResponse(text[i:i + 40]) for i in range(0, len(text), 40))
+        self.calls += 1
+        if self.latency: time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise google_exceptions.ResourceExhausted("fake quota exceeded")
+        resumes = self.RESUME_RE.findall(prompt)
+        if resumes:
+            jd_words = set(re.findall(r"[a-z]{3,}", prompt.split("=== RESUME", 1)[0].lower()))
+            out = []
+            for rid, text in resumes:
+                overlap = len(jd_words & set(re.findall(r"[a-z]{3,}", text.lower())))
+                out.append({"id": rid, "rating": min(10, overlap), "summary": f"{overlap} JD terms in resume"})
+            return FakeResponse(json.dumps(out))
+        title = prompt.strip().splitlines()[0] if prompt.strip() else "Role"
+        return FakeResponse(f"# {title}\n\n## About the role\nFake draft for local runs.\n\n## Must-haves\n- Python\n")
+
+
+# --- Google APIs -------------------------------------------------------------------------
+# Drop-in replacements for the googleapiclient services HiringAutomator uses; assign them on
+# an instance (automator.drive = FakeDrive(resume_corpus(100))). Every call sleeps `latency` seconds, and
+# with `error_rate` set a share of calls fail with a retryable 429/503 HttpError.
+
+class FakeRequest:
+    def __init__(self, service, fn):
+        self.service, self.fn = service, fn
+
+    def execute(self, num_retries=0):
+        self.service.hit()
+        return self.fn()
+
+
+class FakeService:
+    api = "google"
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.calls += 1
+        with metrics.timer(f"api.{self.api}"):
+            if self.latency: time.sleep(self.latency)
+            self.maybe_fail()
+
+    def maybe_fail(self):
+        # Called from download/sender threads, hence the lock
+        with self._lock:
+            if not self.error_rate or self._random.random() >= self.error_rate: return
+            status = self._random.choice([429, 503])
+        raise HttpError(httplib2.Response({"status": status, "reason": "fake"}), b"fake error", uri="fake://")
+
+    def request(self, fn):
+        return FakeRequest(self, fn)
+
+
+class FakeForms(FakeService):
+    """Serves `responses` (Forms API dicts) with paging and the `timestamp >=` filter."""
+    api = "forms"
+
+    def __init__(self, responses=(), **kwargs):
+        super().__init__(**kwargs)
+        self.items = list(responses)
+
+    def forms(self):
+        return self
+
+    def create(self, body):
+        return self.request(lambda: {"formId": "fake-form", "responderUri": "https://forms.example/fake"})
+
+    def batchUpdate(self, formId, body):
+        return self.request(lambda: {})
+
+    def get(self, formId):
+        return self.request(lambda: {"formId": formId, "items": []})
+
+    def responses(self):
+        return _FormResponses(self)
+
+    def watches(self):
+        return _FormWatches(self)
+
+
+class _FormResponses:
+    def __init__(self, forms):
+        self.forms = forms
+
+    def list(self, formId, pageSize=5000, filter=None, pageToken=None):
+        def page():
+            found = self.forms.items
+            if filter:
+                since = filter.split(">=", 1)[1].strip()
+                found = [r for r in found if r.get("lastSubmittedTime", r.get("createTime", "")) >= since]
+            start = int(pageToken or 0)
+            out = {"responses": found[start:start + pageSize]}
+            if start + pageSize < len(found): out["nextPageToken"] = str(start + pageSize)
+            return out
+        return self.forms.request(page)
+
+    def get(self, formId, responseId):
+        def response():
+            for r in self.forms.items:
+                if r["responseId"] == responseId: return r
+            raise HttpError(httplib2.Response({"status": 404, "reason": "Not Found"}), b"No such response", uri="fake://")
+        return self.forms.request(response)
+
+
+class _FormWatches:
+    # Watches never deliver anything here; push is simulated by posting to the webhook
+    def __init__(self, forms):
+        self.forms = forms
+
+    def create(self, formId, body):
+        expires = (datetime.now(timezone.utc) + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        return self.forms.request(lambda: {"id": f"watch-{formId}", "expireTime": expires, **body["watch"]})
+
+    def renew(self, formId, watchId):
+        return self.create(formId, {"watch": {}})
+
+
+class FakeDrive(FakeService):
+    """Serves `contents` ({file_id: bytes}) for files.get metadata, batches and ranged downloads."""
+    api = "drive"
+
+    def __init__(self, contents=None, **kwargs):
+        super().__init__(**kwargs)
+        self.contents = contents or {}
+        self.http = _FakeDriveHttp(self)
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields=None):
+        def meta():
+            data = self._content(fileId)
+            return {"id": fileId, "size": str(len(data)), "md5Checksum": hashlib.md5(data).hexdigest(),
+                    "headRevisionId": "1", "modifiedTime": "2024-01-01T00:00:00.000Z"}
+        return self.request(meta)
+
+    def get_media(self, fileId):
+        return _FakeMediaRequest(self, fileId)
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def _content(self, file_id):
+        data = self.contents.get(file_id)
+        if data is None:
+            raise HttpError(httplib2.Response({"status": 404, "reason": "Not Found"}), b"File not found", uri="fake://")
+        return data
+
+
+class _FakeMediaRequest:
+    def __init__(self, drive, file_id):
+        self.http, self.headers, self.uri = drive.http, {}, f"fake://drive/{file_id}"
+        self.file_id = file_id
+
+
+class _FakeDriveHttp:
+    # Answers drive_download's ranged GETs the way Drive does: 206 per chunk, 416 past the end
+    def __init__(self, drive):
+        self.drive = drive
+
+    def request(self, uri, method="GET", headers=None):
+        self.drive.hit()
+        data = self.drive._content(uri.rsplit("/", 1)[1])
+        m = re.match(r"bytes=(\d+)-(\d+)", (headers or {}).get("range", ""))
+        if not m: return httplib2.Response({"status": 200}), data
+        start, end = int(m.group(1)), min(int(m.group(2)), len(data) - 1)
+        if start >= len(data): return httplib2.Response({"status": 416}), b""
+        return httplib2.Response({"status": 206, "content-range": f"bytes {start}-{end}/{len(data)}"}), data[start:end + 1]
+
+
+class _FakeBatch:
+    # One round trip (one latency) for the whole batch; items fail independently
+    def __init__(self, service, callback):
+        self.service, self.callback, self.items = service, callback, []
+
+    def add(self, request, request_id):
+        self.items.append((request_id, request))
+
+    def execute(self):
+        self.service.hit()
+        for request_id, request in self.items:
+            try:
+                self.service.maybe_fail()
+                response = request.fn()
+            except HttpError as e:
+                self.callback(request_id, None, e)
+                continue
+            self.callback(request_id, response, None)
+
+
+class FakeSheets(FakeService):
+    """Keeps appended rows per tab in `tabs` ({title: [row, ...]})."""
+    api = "sheets"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tabs = {"Sheet1": []}
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def create(self, body, fields=None):
+        return self.request(lambda: {"spreadsheetId": "fake-sheet", "spreadsheetUrl": "https://sheets.example/fake"})
+
+    def get(self, spreadsheetId, fields=None):
+        return self.request(lambda: {"sheets": [{"properties": {"title": t}} for t in list(self.tabs)]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        def update():
+            for req in body.get("requests", []):
+                if "addSheet" in req: self.tabs.setdefault(req["addSheet"]["properties"]["title"], [])
+            return {}
+        return self.request(update)
+
+    def append(self, spreadsheetId, range, valueInputOption=None, body=None):
+        def append():
+            with self._lock:
+                self.tabs.setdefault(range.split("!", 1)[0], []).extend(body["values"])
+            return {}
+        return self.request(append)
+
+
+class FakeGmail(FakeService):
+    """Records every sent message (raw base64url MIME) in `sent`."""
+    api = "gmail"
+
+    def __init__(self, address="recruiter@example.com", **kwargs):
+        super().__init__(**kwargs)
+        self.address = address
+        self.sent = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def getProfile(self, userId):
+        return self.request(lambda: {"emailAddress": self.address})
+
+    def send(self, userId, body):
+        def send():
+            with self._lock:
+                self.sent.append(body["raw"])
+                return {"id": f"fake-{len(self.sent)}"}
+        return self.request(send)
+
+
+# --- Synthetic resumes -------------------------------------------------------------------
+
+def make_pdf(pages):
+    """A minimal text PDF; `pages` is a list of pages, each a list of lines."""
+    font = 3
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        text = " T* ".join("(%s) Tj" % re.sub(r"[()\\]", "", line) for line in lines)
+        stream = f"BT /F1 11 Tf 14 TL 72 740 Td {text} ET".encode("latin-1", "replace")
+        objs.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                    b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (len(objs), font))
+        kids.append(len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    out, offsets = b"%PDF-1.4\n", []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return out
+
+
+FILLER = ("Delivered features end to end with a small team, owned on-call rotations, mentored juniors, "
+          "wrote design docs and worked closely with product on quarterly planning").split(", ")
+
+
+def resume_corpus(n, pages=(1, 3), seed=0, prefix="f"):
+    """{file_id: pdf bytes} for n distinct resumes mentioning a random handful of known skills."""
+    rnd = random.Random(seed)
+    skills = sorted(scoring.SKILL_VOCABULARY)
+    corpus = {}
+    for i in range(n):
+        mentioned = rnd.sample(skills, rnd.randint(3, 12))
+        body = []
+        for _ in range(rnd.randint(*pages)):
+            lines = [f"{rnd.choice(FILLER)} using {', '.join(rnd.sample(mentioned, min(3, len(mentioned))))}"
+                     for _ in range(40)]
+            body.append(lines)
+        body[0][:0] = [f"Candidate {prefix}{i}", "Skills: " + ", ".join(mentioned)]
+        corpus[f"{prefix}{i}"] = make_pdf(body)
+    return corpus
+
+
+def form_responses(file_ids, email_qid="email", drive_qid="resume", start=None, duplicates=0.0, seed=0):
+    """Forms API response dicts, one per file, one second apart; `duplicates` of them resubmit an earlier email."""
+    rnd = random.Random(seed)
+    start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    out = []
+    for i, file_id in enumerate(file_ids):
+        person = rnd.randrange(i) if i and rnd.random() < duplicates else i
+        ts = (start + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        out.append({"responseId": f"resp-{file_id}", "createTime": ts, "lastSubmittedTime": ts, "answers": {
+            email_qid: {"textAnswers": {"answers": [{"value": f"person{person}@example.com"}]}},
+            drive_qid: {"textAnswers": {"answers": [{"value": f"https://drive.google.com/file/d/{file_id}/view"}]}},
+        }})
+    return out
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import metrics
+from .models import Job
+from .services import HiringAutomator
+
+
+def enqueue(kind, campaign, params, reuse_running=True):
+    """Queue a job, or return the identical one that is still queued/running.
+
+    reuse_running=False only reuses a queued one, for work that must start after the call.
+    """
+    key = hashlib.sha256(json.dumps([kind, campaign.pk if campaign else None, params], sort_keys=True).encode()).hexdigest()
+    statuses = [Job.QUEUED, Job.RUNNING] if reuse_running else [Job.QUEUED]
+    with transaction.atomic():
+        existing = Job.objects.filter(dedupe_key=key, status__in=statuses).first()
+        if existing: return existing
+        job = Job.objects.create(kind=kind, campaign=campaign, params=params, dedupe_key=key)
+    if getattr(settings, 'HIRING_JOBS_EAGER', False):
+        run(claim(job_id=job.pk))
+        job.refresh_from_db()
+    return job
+
+
+def claim(worker=None, job_id=None):
+    """Take the oldest runnable job: queued, or running under a worker whose lease lapsed."""
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    now = timezone.now()
+    lapsed = now - timedelta(seconds=getattr(settings, 'HIRING_JOB_LEASE', 600))
+    runnable = Job.objects.filter(Q(status=Job.QUEUED) | Q(status=Job.RUNNING, heartbeat_at__lt=lapsed))
+    if job_id: runnable = runnable.filter(pk=job_id)
+    for job in runnable.order_by('created_at')[:10]:
+        # Conditional update, so two workers racing for the same row can't both win
+        won = Job.objects.filter(pk=job.pk, status=job.status, heartbeat_at=job.heartbeat_at).update(
+            status=Job.RUNNING, worker=worker, heartbeat_at=now, attempts=F('attempts') + 1)
+        if won:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run(job):
+    if job is None: return None
+    handler = HANDLERS[job.kind]
+    done = set(job.done_keys)
+    failed = set()
+
+    def progress(keys, failed_keys, total):
+        # Only keys that succeeded go into done_keys (the resumed job's `skip`); failed ones
+        # are tried again when the job is retried or its lease is reclaimed
+        done.update(keys)
+        failed.difference_update(keys)
+        failed.update(k for k in failed_keys if k not in done)
+        Job.objects.filter(pk=job.pk).update(
+            processed=len(done) + len(failed), total=max(total, len(done) + len(failed)), failures=len(failed),
+            done_keys=sorted(done), heartbeat_at=timezone.now())
+
+    try:
+        # params["profile"] (set per request, see views) also samples stacks for the run
+        with metrics.record(job.kind, campaign=job.campaign, job=job, profile=job.params.get('profile', False)):
+            results = handler(job, skip=done, progress=progress)
+    except Exception:
+        max_attempts = getattr(settings, 'HIRING_JOB_MAX_ATTEMPTS', 3)
+        status = Job.FAILED if job.attempts >= max_attempts else Job.QUEUED
+        Job.objects.filter(pk=job.pk).update(
+            status=status, error=traceback.format_exc(),
+            finished_at=timezone.now() if status == Job.FAILED else None)
+    else:
+        if isinstance(results, dict): results = [f"{k}: {v}" for k, v in results.items()]
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.DONE, results=(job.results or []) + list(results or []), error="", finished_at=timezone.now())
+    job.refresh_from_db()
+    return job
+
+
+def automator():
+    return HiringAutomator(os.path.join(settings.BASE_DIR, 'token.json'))
+
+
+# Handlers: tasks are safe to re-run after a crash. Sync is incremental by itself;
+# invites/outcomes skip the addresses the job already reported as done.
+def _sync(job, skip, progress):
+    result = automator().sync_responses(full_resync=job.params.get('full_resync', False), progress=progress,
+                                        campaign=job.campaign)
+    refresh_relevance(job.campaign)
+    if isinstance(result, dict): return result
+    return [f"{len(result)} new candidates"]
+
+
+def _ingest(job, skip, progress):
+    # Responses announced by a push (see push.py)
+    ids = [rid for rid in job.params['response_ids'] if rid not in skip]
+    result = automator().ingest_responses(ids, progress=progress, campaign=job.campaign)
+    if isinstance(result, dict): return result
+    return [f"{len(result)} new candidates"]
+
+
+def _invites(job, skip, progress):
+    p = job.params
+    return automator().send_invites(p['emails'], p.get('organizer', 'Hiring Team'), p['interview_date'],
+                                    skip=skip, progress=progress, campaign=job.campaign,
+                                    slot_minutes=p.get('slot_minutes'), buffer_minutes=p.get('buffer_minutes'),
+                                    hours=p.get('hours'))
+
+
+def _outcomes(job, skip, progress):
+    return automator().send_outcomes(job.params['hired_emails'], skip=skip, progress=progress, campaign=job.campaign)
+
+
+def _evaluate(job, skip, progress):
+    return automator().evaluate_candidates(force=job.params.get('force', False), skip=skip, progress=progress,
+                                           campaign=job.campaign)
+
+
+def _rescore(job, skip, progress):
+    result = automator().rescore_candidates(campaign=job.campaign)
+    refresh_relevance(job.campaign)
+    return result
+
+
+def _relevance(job, skip, progress):
+    return automator().refresh_relevance(campaign=job.campaign)
+
+
+def refresh_relevance(campaign):
+    # One queued refresh per campaign however many syncs asked for it; pushed responses
+    # (ingest jobs) are left to push.reconcile's periodic pass instead
+    if campaign: enqueue(Job.RELEVANCE, campaign, {}, reuse_running=False)
+
+
+HANDLERS = {
+    Job.SYNC: _sync,
+    Job.INGEST: _ingest,
+    Job.INVITES: _invites,
+    Job.OUTCOMES: _outcomes,
+    Job.EVALUATE: _evaluate,
+    Job.RESCORE: _rescore,
+    Job.RELEVANCE: _relevance,
+}
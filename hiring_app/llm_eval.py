@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from google.api_core import exceptions as google_exceptions
+
+from . import clients, metrics
+from .models import LLMEvaluation
+from .ratelimit import backoff_delays, per_minute
+
+# Bump whenever PROMPT changes: it is part of the cache key, so old verdicts stop matching
+PROMPT_VERSION = 1
+PROMPT = """You are screening resumes for the job below. Rate each resume from 0 (no fit) to 10 (excellent fit)
+against the job description and give a one-sentence reason.
+Return ONLY a JSON array with one object per resume: [{{"id": "<resume id>", "rating": <0-10>, "summary": "<reason>"}}]
+
+JOB DESCRIPTION:
+{jd}
+
+{resumes}"""
+
+RETRYABLE = (
+    google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded, ValueError,  # ValueError: reply wasn't the JSON we asked for
+)
+
+# Quota is per API key, so every evaluator in the process draws from the same buckets
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _limits(model_name):
+    with _buckets_lock:
+        if model_name not in _buckets:
+            _buckets[model_name] = (per_minute(getattr(settings, 'HIRING_LLM_RPM', 15)),
+                                    per_minute(getattr(settings, 'HIRING_LLM_TPM', 250000)))
+        return _buckets[model_name]
+
+
+def sha(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class ResumeEvaluator:
+    """Grades resumes against a JD with Gemini, several resumes per prompt.
+
+    Verdicts are cached by (model, prompt version, resume hash, JD hash). Prompts run on a
+    small thread pool under shared requests/tokens-per-minute buckets, with exponential
+    backoff on quota and server errors.
+    """
+
+    def __init__(self, model_name=None, batch_size=None, resume_chars=None, concurrency=None, retries=None):
+        self.model_name = model_name or getattr(settings, 'HIRING_LLM_MODEL', 'gemini-2.5-flash-lite')
+        self.batch_size = batch_size or getattr(settings, 'HIRING_LLM_BATCH_SIZE', 8)
+        self.resume_chars = resume_chars or getattr(settings, 'HIRING_LLM_RESUME_CHARS', 3000)
+        self.concurrency = concurrency or getattr(settings, 'HIRING_LLM_CONCURRENCY', 2)
+        self.retries = retries if retries is not None else getattr(settings, 'HIRING_LLM_RETRIES', 5)
+
+    def cache_key(self, resume_hash, jd_hash):
+        return sha(f"{self.model_name}|{PROMPT_VERSION}|{resume_hash}|{jd_hash}")
+
+    def evaluate(self, items, jd_text, on_batch=None):
+        """items: [(key, resume text)] -> {key: {"rating", "summary"} or {"error"}}.
+
+        on_batch(done, failed) is called with the keys graded and the keys that failed as each
+        prompt (or the cache lookup) completes.
+        """
+        jd_hash = sha(jd_text)
+        by_key = {}
+        for key, text in items:
+            by_key.setdefault(self.cache_key(sha(text), jd_hash), []).append((key, text))
+
+        results = {}
+        cached = LLMEvaluation.objects.filter(cache_key__in=list(by_key))
+        for ev in cached:
+            for key, _ in by_key.pop(ev.cache_key):
+                results[key] = {"rating": ev.rating, "summary": ev.summary}
+        metrics.count("llm.cache_hits", len(results))
+        if results and on_batch: on_batch(list(results), [])
+
+        # One entry per distinct resume; duplicates share the verdict
+        pending = [(ck, entries[0][1]) for ck, entries in by_key.items()]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(metrics.bind(self._run_batch), batch, jd_text): batch for batch in batches}
+            for fut in as_completed(futures):
+                verdicts, error = fut.result()
+                # Saved from this thread: pool threads never touch the database
+                LLMEvaluation.objects.bulk_create([
+                    LLMEvaluation(cache_key=ck, model=self.model_name, prompt_version=PROMPT_VERSION,
+                                  rating=v["rating"], summary=v["summary"]) for ck, v in verdicts.items()
+                ], ignore_conflicts=True)
+                done, failed = [], []
+                for ck, _ in futures[fut]:
+                    verdict = verdicts.get(ck)
+                    for key, _ in by_key[ck]:
+                        results[key] = verdict or {"error": error or "missing from model reply"}
+                        (done if verdict else failed).append(key)
+                if on_batch: on_batch(done, failed)
+        return results
+
+    def _run_batch(self, batch, jd_text):
+        # -> ({cache_key: verdict}, error message or None)
+        ids = {f"r{i}": ck for i, (ck, _) in enumerate(batch)}
+        prompt = PROMPT.format(jd=jd_text[:4000], resumes="\n".join(
+            f"=== RESUME id={rid} ===\n{text[:self.resume_chars]}\n" for rid, (_, text) in zip(ids, batch)))
+        requests_bucket, tokens_bucket = _limits(self.model_name)
+        estimated_tokens = len(prompt) // 4 + 80 * len(batch)
+
+        error = None
+        for attempt, delay in enumerate([0.0, *backoff_delays(self.retries)]):
+            if attempt: metrics.count("retries.llm")
+            time.sleep(delay)
+            requests_bucket.acquire()
+            tokens_bucket.acquire(estimated_tokens)
+            try:
+                with metrics.timer("gemini.prompt"):
+                    reply = clients.gemini_model(self.model_name).generate_content(
+                        prompt, generation_config={"response_mime_type": "application/json"})
+                verdicts = self._parse(reply.text, ids)
+                break
+            except RETRYABLE as e:
+                error = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                return {}, f"{type(e).__name__}: {e}"
+        else:
+            return {}, error
+        return verdicts, None
+
+    def _parse(self, text, ids):
+        match = re.search(r"\[.*\]", text or "", re.S)
+        if not match: raise ValueError("no JSON array in reply")
+        verdicts = {}
+        for item in json.loads(match.group(0)):
+            ck = ids.get(str(item.get("id")))
+            if ck is None: continue
+            rating = max(0, min(10, int(item.get("rating", 0))))
+            verdicts[ck] = {"rating": rating, "summary": str(item.get("summary", ""))[:500]}
+        return verdicts
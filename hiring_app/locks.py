@@ -0,0 +1,56 @@
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import CampaignLock
+
+
+class LockHeld(Exception):
+    pass
+
+
+def acquire(campaign, name, ttl):
+    # Returns an owner token, or None if another worker holds a live lock
+    owner = uuid.uuid4().hex
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+    try:
+        with transaction.atomic():
+            CampaignLock.objects.create(campaign=campaign, name=name, owner=owner, expires_at=expires_at)
+        return owner
+    except IntegrityError:
+        pass
+    # Take over a lock whose holder crashed and let it expire
+    taken = CampaignLock.objects.filter(
+        campaign=campaign, name=name, expires_at__lt=timezone.now()
+    ).update(owner=owner, expires_at=expires_at)
+    return owner if taken else None
+
+
+def release(campaign, name, owner):
+    CampaignLock.objects.filter(campaign=campaign, name=name, owner=owner).delete()
+
+
+def is_locked(campaign, name):
+    return CampaignLock.objects.filter(campaign=campaign, name=name, expires_at__gte=timezone.now()).exists()
+
+
+def wait_until_released(campaign, name, timeout, poll=0.5):
+    deadline = time.monotonic() + timeout
+    while is_locked(campaign, name):
+        if time.monotonic() > deadline: return False
+        time.sleep(poll)
+    return True
+
+
+@contextmanager
+def campaign_lock(campaign, name, ttl=900):
+    owner = acquire(campaign, name, ttl)
+    if not owner: raise LockHeld(f"{name} already running for campaign {campaign.pk}")
+    try:
+        yield owner
+    finally:
+        release(campaign, name, owner)
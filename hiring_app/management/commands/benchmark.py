@@ -0,0 +1,147 @@
+import math
+import shutil
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from hiring_app import clients, fakes, jobs, metrics, outbox, scoring
+from hiring_app.models import Campaign, LLMEvaluation, ResumeCache
+
+STAGES = ["sync", "rescore", "evaluate", "invite", "outcome"]
+
+
+class Command(BaseCommand):
+    help = ("Time sync, scoring, AI review, invites and outcomes against in-process fakes of Forms, "
+            "Drive, Sheets, Gmail and Gemini; reports throughput, p50/p95 per-call latency and peak memory.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--responses', type=int, default=200, help="Form responses (one synthetic PDF each) per run")
+        parser.add_argument('--runs', type=int, default=3, help="Fresh campaigns to run the stages on")
+        parser.add_argument('--stages', default=",".join(STAGES), help="Comma-separated subset of " + ",".join(STAGES))
+        parser.add_argument('--max-pages', type=int, default=3, help="Resumes get 1..N pages")
+        parser.add_argument('--duplicates', type=float, default=0.0, help="Share of responses resubmitting an earlier email")
+        parser.add_argument('--latency', type=float, default=0.0, help="Seconds per Google API call")
+        parser.add_argument('--llm-latency', type=float, default=0.0, help="Seconds per Gemini prompt")
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help="Share of Drive, Gmail and Gemini calls failing with a retryable error")
+        parser.add_argument('--download-workers', type=int, default=None)
+        parser.add_argument('--parse-workers', type=int, default=None)
+        parser.add_argument('--quotas', action='store_true',
+                            help="Keep the configured Gemini/Gmail rate limits instead of lifting them")
+        parser.add_argument('--keep', action='store_true', help="Leave the benchmark campaigns in the database")
+
+    def handle(self, *args, **options):
+        stages = [s.strip() for s in options['stages'].split(",") if s.strip()]
+        unknown = set(stages) - set(STAGES)
+        if unknown: raise CommandError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        # Everything the runs create is tagged with this, so it can be removed afterwards
+        tag = f"bench{uuid.uuid4().hex[:8]}"
+        media = tempfile.mkdtemp(prefix="hiring-bench-")
+        overrides = {"MEDIA_ROOT": media, "HIRING_FAKE_GEMINI": True, "HIRING_LLM_MODEL": tag}
+        if not options['quotas']:
+            overrides.update(HIRING_LLM_RPM=10 ** 6, HIRING_LLM_TPM=10 ** 9, HIRING_GMAIL_SENDS_PER_SEC=10 ** 4)
+
+        samples = {stage: [] for stage in stages}  # [(seconds, items, peak bytes)]
+        latencies = {stage: {} for stage in stages}  # {timer: [seconds per call]} over all runs
+        services = []
+        tracing = tracemalloc.is_tracing()
+        if not tracing: tracemalloc.start()
+        try:
+            with override_settings(**overrides):
+                clients.reset()
+                outbox.reset()
+                gemini = clients.gemini_model(tag)
+                gemini.latency, gemini.error_rate = options['llm_latency'], options['error_rate']
+                for run in range(options['runs']):
+                    automator, campaign = self._setup(tag, run, options)
+                    services.append(automator)
+                    for stage in stages:
+                        tracemalloc.reset_peak()
+                        rec = metrics.Recorder(keep_samples=True)
+                        started = time.perf_counter()
+                        with metrics.collect(rec):
+                            items = getattr(self, f"_run_{stage}")(automator, campaign, options)
+                        elapsed = time.perf_counter() - started
+                        samples[stage].append((elapsed, items, tracemalloc.get_traced_memory()[1]))
+                        for name, seconds in rec.samples.items():
+                            latencies[stage].setdefault(name, []).extend(seconds)
+                        self.stdout.write(f"run {run + 1} {stage}: {items} in {elapsed:.2f}s")
+        finally:
+            if not tracing: tracemalloc.stop()
+            clients.reset()
+            outbox.reset()
+            shutil.rmtree(media, ignore_errors=True)
+            if not options['keep']:
+                Campaign.objects.filter(role__startswith=tag).delete()
+                ResumeCache.objects.filter(file_id__startswith=tag).delete()
+                LLMEvaluation.objects.filter(model=tag).delete()
+        self._report(samples, latencies, services)
+
+    def _setup(self, tag, run, options):
+        n, latency, errors = options['responses'], options['latency'], options['error_rate']
+        corpus = fakes.resume_corpus(n, pages=(1, max(1, options['max_pages'])), seed=run, prefix=f"{tag}r{run}-")
+        automator = jobs.automator()
+        automator.forms = fakes.FakeForms(fakes.form_responses(list(corpus), duplicates=options['duplicates'], seed=run),
+                                          latency=latency)
+        automator.drive = fakes.FakeDrive(corpus, latency=latency, error_rate=errors, seed=run)
+        automator.sheets = fakes.FakeSheets(latency=latency)
+        automator.gmail = fakes.FakeGmail(latency=latency, error_rate=errors, seed=run)
+        jd = f"Backend engineer ({tag} run {run}): Python, Django, REST APIs, SQL, Docker, AWS, Kafka, Redis."
+        campaign = Campaign.objects.create(
+            role=f"{tag} run {run}", jd_text=jd, form_id="fake-form", sheet_id="fake-sheet",
+            email_qid="email", drive_qid="resume", scoring_profile=scoring.profile_from_jd(jd), is_active=False)
+        return automator, campaign
+
+    def _run_sync(self, automator, campaign, options):
+        automator.sync_responses(options['download_workers'], options['parse_workers'], campaign=campaign)
+        return campaign.processed_responses.count()
+
+    def _run_rescore(self, automator, campaign, options):
+        result = automator.rescore_candidates(options['download_workers'], options['parse_workers'], campaign=campaign)
+        return result["updated"] + result["failed"]
+
+    def _run_evaluate(self, automator, campaign, options):
+        result = automator.evaluate_candidates(force=True, campaign=campaign)
+        return result["reviewed"] + result["failed"]
+
+    def _run_invite(self, automator, campaign, options):
+        emails = list(campaign.candidates.exclude(email="").order_by('-score').values_list('email', flat=True))
+        return len(automator.send_invites(emails, "Benchmark", "2030-01-07T09:00", campaign=campaign))
+
+    def _run_outcome(self, automator, campaign, options):
+        emails = campaign.candidates.exclude(email="").order_by('-score').values_list('email', flat=True)
+        hired = emails[:max(1, len(emails) // 10)]
+        automator.send_outcomes(list(hired), campaign=campaign)
+        return campaign.outbox.filter(kind="outcome").count()
+
+    def _report(self, samples, latencies, services):
+        # Throughput is over every run together; percentiles are over single calls (one API
+        # request, download, parse, send...), since with a handful of runs a percentile of
+        # whole-run times is just the slowest run.
+        self.stdout.write("")
+        self.stdout.write(f"{'stage':<10}{'runs':>6}{'items':>8}{'total s':>10}{'items/s':>10}{'peak MB':>10}")
+        for stage, runs in samples.items():
+            if not runs: continue
+            seconds, items = sum(s for s, _, _ in runs), sum(i for _, i, _ in runs)
+            rate = items / seconds if seconds else float("inf")
+            peak = max(p for _, _, p in runs) / (1 << 20)
+            self.stdout.write(f"{stage:<10}{len(runs):>6}{items:>8}{seconds:>10.3f}{rate:>10.1f}{peak:>10.1f}")
+        self.stdout.write("")
+        self.stdout.write(f"{'stage':<10}{'timer':<22}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for stage, timers in latencies.items():
+            for name, values in sorted(timers.items(), key=lambda kv: -sum(kv[1])):
+                values = sorted(values)
+                p50, p95 = _percentile(values, 50) * 1000, _percentile(values, 95) * 1000
+                self.stdout.write(f"{stage:<10}{name:<22}{len(values):>8}{p50:>10.2f}{p95:>10.2f}{values[-1] * 1000:>10.2f}")
+        calls = {name: sum(getattr(a, name).calls for a in services) for name in ("forms", "drive", "sheets", "gmail")}
+        self.stdout.write("API calls: " + ", ".join(f"{k} {v}" for k, v in calls.items()))
+        self.stdout.write("Peak memory is this process only; PDF parsing runs in worker processes.")
+
+
+def _percentile(values, pct):
+    # Nearest rank over sorted values
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
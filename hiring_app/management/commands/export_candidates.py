@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hiring_app import bulk
+from hiring_app.models import Campaign
+
+
+class Command(BaseCommand):
+    help = "Export a campaign's candidates (scores, statuses, outcomes, text features) to CSV, Parquet or Arrow."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, help="Campaign id (default: the newest active one)")
+        parser.add_argument('--format', choices=list(bulk.FORMATS), help="Default: taken from --output's extension, else csv")
+        parser.add_argument('--output', '-o', default='-', help="File to write; '-' is stdout (CSV only)")
+        parser.add_argument('--with-text', action='store_true', help="Include the full resume text")
+
+    def handle(self, *args, **options):
+        campaign = Campaign.objects.filter(pk=options['campaign']).first() if options['campaign'] else \
+            Campaign.objects.filter(is_active=True).first()
+        if not campaign: raise CommandError("No such campaign")
+        output = options['output']
+        ext = output.rsplit('.', 1)[-1].lower()
+        fmt = options['format'] or (ext if ext in bulk.FORMATS else 'csv')
+        cols = bulk.columns(options['with_text'])
+        rows = bulk.candidate_rows(campaign, with_text=options['with_text'])
+        if fmt == 'csv':
+            chunks = bulk.csv_chunks(rows, [name for name, _ in cols])
+            if output == '-':
+                for chunk in chunks: self.stdout.write(chunk, ending='')
+            else:
+                with open(output, 'w', newline='', encoding='utf-8') as out:
+                    for chunk in chunks: out.write(chunk)
+        else:
+            if output == '-': raise CommandError(f"{fmt} needs --output FILE")
+            try: bulk.write_arrow(rows, cols, output, fmt)
+            except bulk.FormatUnavailable as e: raise CommandError(str(e))
+        if output != '-': self.stderr.write(f"Wrote {campaign.candidates.count()} candidates to {output}")
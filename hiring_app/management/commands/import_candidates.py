@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hiring_app import bulk, jobs, metrics
+from hiring_app.models import Campaign
+
+
+class Command(BaseCommand):
+    help = ("Load historical candidates from a .csv, .parquet or .arrow file into a campaign and score them offline. "
+            "Columns: email, plus text or resume_path (a local PDF); response_id, submitted_at and drive_link are optional.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--campaign', type=int, help="Campaign id (default: the newest active one)")
+        parser.add_argument('--parse-workers', type=int, default=None, help="Processes parsing resume_path PDFs")
+
+    def handle(self, *args, **options):
+        campaign = Campaign.objects.filter(pk=options['campaign']).first() if options['campaign'] else \
+            Campaign.objects.filter(is_active=True).first()
+        if not campaign: raise CommandError("No such campaign")
+        try:
+            with metrics.record('import', campaign=campaign):
+                automator = jobs.automator()
+                result = automator.import_candidates(
+                    bulk.read_rows(options['path']), parse_workers=options['parse_workers'], campaign=campaign)
+                if 'error' not in result: automator.refresh_relevance(campaign)
+        except (bulk.FormatUnavailable, OSError) as e:
+            raise CommandError(str(e))
+        if 'error' in result: raise CommandError(result['error'])
+        self.stdout.write(", ".join(f"{k}: {v}" for k, v in result.items()))
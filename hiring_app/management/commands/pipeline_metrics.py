@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from hiring_app import metrics
+from hiring_app.models import PipelineRun
+
+
+class Command(BaseCommand):
+    help = "Show the stage timings, counters and swallowed errors of the latest pipeline runs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', help="sync, invites, outcomes or evaluate")
+        parser.add_argument('--campaign', type=int, help="Campaign id")
+        parser.add_argument('--runs', type=int, default=1, help="How many runs to show, newest first")
+        parser.add_argument('--profile', type=int, default=0, metavar='N', help="Also print the N most sampled stacks")
+
+    def handle(self, *args, **options):
+        runs = PipelineRun.objects.select_related('campaign')
+        if options['kind']: runs = runs.filter(kind=options['kind'])
+        if options['campaign']: runs = runs.filter(campaign_id=options['campaign'])
+        runs = list(runs[:options['runs']])
+        if not runs:
+            self.stdout.write("No runs recorded yet")
+            return
+        for run in runs:
+            for line in metrics.summary(run):
+                self.stdout.write(line)
+            if options['profile']:
+                stacks = run.profile.splitlines()[:options['profile']]
+                self.stdout.write("  sampled stacks:" if stacks else "  (not profiled)")
+                for line in stacks:
+                    self.stdout.write(f"    {line}")
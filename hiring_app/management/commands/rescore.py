@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hiring_app import jobs, metrics
+from hiring_app.locks import LockHeld
+from hiring_app.models import Campaign, Job
+
+
+class Command(BaseCommand):
+    help = "Re-check every resume against Drive and rescore it (replaced files are re-downloaded)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, help="Campaign id (default: every active campaign)")
+
+    def handle(self, *args, **options):
+        campaigns = Campaign.objects.filter(pk=options['campaign']) if options['campaign'] else \
+            Campaign.objects.filter(is_active=True)
+        if not campaigns: raise CommandError("No such campaign")
+        for campaign in campaigns:
+            try:
+                with metrics.record(Job.RESCORE, campaign=campaign):
+                    result = jobs.automator().rescore_candidates(campaign=campaign)
+            except LockHeld:
+                self.stderr.write(f"{campaign.role} (#{campaign.pk}): a sync is still running; try again later")
+                continue
+            self.stdout.write(f"{campaign.role} (#{campaign.pk}): " + ", ".join(f"{k}: {v}" for k, v in result.items()))
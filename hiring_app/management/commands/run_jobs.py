@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hiring_app import jobs, push
+
+# How often the worker checks for campaigns due a reconciliation sync / sheet log retry / watch renewal
+RECONCILE_CHECK = 60
+
+
+class Command(BaseCommand):
+    help = "Run queued sync/invite/outcome jobs (resumes jobs left behind by a crashed worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+        parser.add_argument('--poll', type=float, default=2.0, help="Seconds between queue checks")
+        parser.add_argument('--no-reconcile', action='store_true',
+                            help="Don't queue the periodic safety-net syncs (another worker does)")
+
+    def handle(self, *args, **options):
+        next_reconcile = 0
+        while True:
+            if not options['no_reconcile'] and time.monotonic() >= next_reconcile:
+                next_reconcile = time.monotonic() + RECONCILE_CHECK
+                outcome = push.reconcile()
+                for line in outcome["sheet_errors"]:
+                    self.stderr.write(f"Sheet log append failed: {line}")
+                for line in outcome["watch_errors"]:
+                    self.stderr.write(f"Watch renewal failed: {line}")
+            job = jobs.claim()
+            if job is None:
+                if options['once']: return
+                time.sleep(options['poll'])
+                continue
+            self.stdout.write(f"Running job {job.pk} ({job.kind}, attempt {job.attempts})")
+            job = jobs.run(job)
+            self.stdout.write(f"Job {job.pk}: {job.status} ({job.processed}/{job.total}, {job.failures} failed)")
+            for line in job.results:
+                self.stdout.write(f"  {line}")
+            if job.error:
+                self.stderr.write(job.error)
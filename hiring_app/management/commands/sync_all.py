@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from hiring_app import jobs, metrics
+from hiring_app.models import Campaign, Job
+
+
+class Command(BaseCommand):
+    help = "Sync responses for every active campaign in parallel (Google API quotas are shared)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Campaigns synced at once")
+        parser.add_argument('--full', action='store_true', help="Ignore watermarks and re-list every response")
+        parser.add_argument('--profile', action='store_true', help="Sample stacks for each campaign's run")
+
+    def handle(self, *args, **options):
+        campaigns = list(Campaign.objects.filter(is_active=True))
+        if not campaigns:
+            self.stdout.write("No active campaigns")
+            return
+        workers = min(options['workers'] or getattr(settings, 'HIRING_SYNC_ALL_WORKERS', 4), len(campaigns))
+        # Split the parse processes between campaigns rather than giving each a full set
+        parse_workers = max(1, getattr(settings, 'HIRING_PARSE_WORKERS', os.cpu_count() or 1) // workers)
+
+        def sync(campaign):
+            try:
+                with metrics.record(Job.SYNC, campaign=campaign, profile=options['profile']):
+                    return jobs.automator().sync_responses(
+                        parse_workers=parse_workers, full_resync=options['full'], campaign=campaign)
+            finally:
+                connection.close()  # each pool thread opened its own
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(sync, c): c for c in campaigns}
+            for fut in as_completed(futures):
+                campaign = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    self.stderr.write(f"{campaign.role} (#{campaign.pk}): failed: {e}")
+                    continue
+                if isinstance(result, dict):
+                    summary = ", ".join(f"{k}: {v}" for k, v in result.items())
+                else:
+                    summary = f"{len(result)} new candidates"
+                self.stdout.write(f"{campaign.role} (#{campaign.pk}): {summary}")
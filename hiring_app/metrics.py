@@ -0,0 +1,183 @@
+import contextvars
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+
+# Instrumentation for one pipeline run (a job, one campaign of sync_all, ...). record() makes
+# a Recorder current for the calling thread; timer/observe/count/swallowed anywhere below it
+# report into that Recorder and are no-ops when nothing is recording. Work handed to a thread
+# pool has to be wrapped with bind() to report into the same run.
+
+_current = contextvars.ContextVar("hiring_metrics", default=None)
+
+MAX_ERRORS = 50
+
+
+class Recorder:
+    def __init__(self, keep_samples=False):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = Counter()
+        self.errors = []
+        self.threads = {threading.get_ident()}  # threads the Sampler looks at
+        # Every observation per stage, for percentiles (the benchmark); runs only keep totals
+        self.samples = {} if keep_samples else None
+
+    def observe(self, stage, seconds, n=1):
+        with self._lock:
+            s = self.stages.setdefault(stage, {"count": 0, "seconds": 0.0, "max": 0.0})
+            s["count"] += n
+            s["seconds"] += seconds
+            s["max"] = max(s["max"], seconds)
+            if self.samples is not None: self.samples.setdefault(stage, []).append(seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def swallowed(self, where, error):
+        with self._lock:
+            self.counters["errors.swallowed"] += 1
+            self.errors.append({"where": where, "error": f"{type(error).__name__}: {error}"})
+            del self.errors[:-MAX_ERRORS]
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timer(stage):
+    rec = _current.get()
+    if rec is None:
+        yield
+        return
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        rec.observe(stage, time.monotonic() - started)
+
+
+def observe(stage, seconds, n=1):
+    rec = _current.get()
+    if rec: rec.observe(stage, seconds, n)
+
+
+def count(name, n=1):
+    rec = _current.get()
+    if rec and n: rec.count(name, n)
+
+
+def swallowed(where, error):
+    # For exceptions the pipeline deliberately carries on after; they still show up per run
+    rec = _current.get()
+    if rec: rec.swallowed(where, error)
+
+
+def bind(fn):
+    """Wrap fn so it reports into the caller's run when a pool thread calls it."""
+    rec = _current.get()
+    if rec is None: return fn
+
+    @wraps(fn)
+    def bound(*args, **kwargs):
+        ident = threading.get_ident()
+        rec.threads.add(ident)  # sampled only while it works for this run, not while idle in the pool
+        token = _current.set(rec)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+            rec.threads.discard(ident)
+    return bound
+
+
+@contextmanager
+def collect(rec):
+    """Report into `rec` for the enclosed code without saving a PipelineRun."""
+    token = _current.set(rec)
+    try:
+        yield rec
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def record(kind, campaign=None, job=None, profile=False):
+    """Collect metrics for the enclosed run and save them as a PipelineRun."""
+    from .models import PipelineRun
+    rec = Recorder()
+    token = _current.set(rec)
+    sampler = Sampler(rec) if profile else None
+    started_at, started = timezone.now(), time.monotonic()
+    if sampler: sampler.start()
+    try:
+        yield rec
+    finally:
+        if sampler: sampler.stop()
+        _current.reset(token)
+        PipelineRun.objects.create(
+            kind=kind, campaign=campaign, job=job, started_at=started_at, seconds=time.monotonic() - started,
+            stages=rec.stages, counters=dict(rec.counters), errors=rec.errors,
+            profile=sampler.collapsed() if sampler else "")
+        keep = getattr(settings, 'HIRING_METRICS_KEEP', 200)
+        old = PipelineRun.objects.values_list('pk', flat=True)[keep:]
+        PipelineRun.objects.filter(pk__in=list(old)).delete()
+
+
+class Sampler(threading.Thread):
+    """Sampling profiler: snapshots the run's threads' stacks every HIRING_PROFILE_INTERVAL seconds.
+
+    Cheap enough to leave on for a whole sync, unlike cProfile, and it sees the pool
+    threads that bind() registered.
+    """
+
+    def __init__(self, rec, interval=None):
+        super().__init__(daemon=True, name="hiring-profiler")
+        self.rec = rec
+        self.interval = interval or getattr(settings, 'HIRING_PROFILE_INTERVAL', 0.005)
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.rec.threads):
+                frame = frames.get(ident)
+                if frame is not None: self.stacks[_stack(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self, limit=200):
+        return "\n".join(f"{n} {stack}" for stack, n in self.stacks.most_common(limit))
+
+
+def _stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def summary(run):
+    """Lines describing a PipelineRun, slowest stages first."""
+    lines = [f"{run.kind} run #{run.pk} ({run.campaign or 'no campaign'}) at {run.started_at:%Y-%m-%d %H:%M:%S}: "
+             f"{run.seconds:.2f}s"]
+    for stage, s in sorted(run.stages.items(), key=lambda kv: -kv[1]["seconds"]):
+        lines.append(f"  {stage:<22}{s['count']:>7} x {s['seconds']:>9.3f}s  (max {s['max']:.3f}s)")
+    for name, n in sorted(run.counters.items()):
+        lines.append(f"  {name:<22}{n:>7}")
+    for err in run.errors[-10:]:
+        lines.append(f"  ! {err['where']}: {err['error']}")
+    return lines
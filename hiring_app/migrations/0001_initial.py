@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=200)),
+                ('jd_text', models.TextField(blank=True)),
+                ('form_id', models.CharField(db_index=True, max_length=100)),
+                ('form_url', models.URLField(blank=True, max_length=500)),
+                ('sheet_id', models.CharField(blank=True, max_length=100)),
+                ('sheet_url', models.URLField(blank=True, max_length=500)),
+                ('drive_qid', models.CharField(blank=True, max_length=50, null=True)),
+                ('email_qid', models.CharField(blank=True, max_length=50, null=True)),
+                ('linkedin_post_id', models.CharField(blank=True, max_length=200, null=True)),
+                ('response_watermark', models.CharField(blank=True, max_length=40, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Candidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('response_id', models.CharField(max_length=100)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('file_id', models.CharField(blank=True, max_length=200)),
+                ('drive_link', models.URLField(blank=True, max_length=1000)),
+                ('score', models.IntegerField(default=0)),
+                ('text_preview', models.TextField(blank=True)),
+                ('submitted_at', models.CharField(blank=True, max_length=40)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidates', to='hiring_app.campaign')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Outcome',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.CharField(max_length=254)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outcomes', to='hiring_app.campaign')),
+                ('candidate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outcomes', to='hiring_app.candidate')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProcessedResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('response_id', models.CharField(max_length=100)),
+                ('processed_at', models.DateTimeField(auto_now_add=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='processed_responses', to='hiring_app.campaign')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['campaign', 'email'], name='hiring_app__campaig_539b56_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['campaign', 'score'], name='hiring_app__campaig_9a2d36_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='candidate',
+            constraint=models.UniqueConstraint(fields=('campaign', 'response_id'), name='uniq_candidate_response'),
+        ),
+        migrations.AddIndex(
+            model_name='outcome',
+            index=models.Index(fields=['campaign', 'email'], name='hiring_app__campaig_5bc6ec_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='processedresponse',
+            constraint=models.UniqueConstraint(fields=('campaign', 'response_id'), name='uniq_processed_response'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+import json
+import os
+
+from django.conf import settings
+from django.db import migrations
+
+
+def import_campaign_state(apps, schema_editor):
+    # One-off import of the legacy campaign_state.json written by HiringAutomator.save_state
+    path = os.path.join(settings.BASE_DIR, 'campaign_state.json')
+    if not os.path.exists(path):
+        return
+    try:
+        state = json.load(open(path))
+    except ValueError:
+        return
+    if not state.get('form_id'):
+        return
+
+    Campaign = apps.get_model('hiring_app', 'Campaign')
+    Candidate = apps.get_model('hiring_app', 'Candidate')
+    ProcessedResponse = apps.get_model('hiring_app', 'ProcessedResponse')
+
+    campaign = Campaign.objects.create(
+        role=state.get('role') or '', form_id=state['form_id'],
+        form_url=state.get('form_url') or '', sheet_id=state.get('sheet_id') or '',
+        sheet_url=state.get('sheet_url') or '', drive_qid=state.get('drive_qid'),
+        email_qid=state.get('email_qid'), linkedin_post_id=state.get('linkedin_post_id'),
+        response_watermark=state.get('response_watermark'), is_active=True,
+    )
+    seen = set()
+    candidates = []
+    for c in state.get('candidates', []):
+        if not c.get('id') or c['id'] in seen: continue
+        seen.add(c['id'])
+        candidates.append(Candidate(
+            campaign=campaign, response_id=c['id'], email=c.get('email') or '',
+            file_id=c.get('file_id') or '', drive_link=c.get('drive_link') or '',
+            score=c.get('score') or 0, text_preview=c.get('text_preview') or '',
+        ))
+    Candidate.objects.bulk_create(candidates, batch_size=500)
+    ProcessedResponse.objects.bulk_create(
+        [ProcessedResponse(campaign=campaign, response_id=r) for r in set(state.get('processed_ids', []))],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(import_campaign_state, migrations.RunPython.noop),
+    ]
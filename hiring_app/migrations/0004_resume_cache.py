@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0003_campaign_lock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_id', models.CharField(max_length=200, unique=True)),
+                ('revision', models.CharField(max_length=100)),
+                ('text', models.TextField(blank=True)),
+                ('score', models.IntegerField(default=0)),
+                ('scorer_version', models.PositiveIntegerField(default=0)),
+                ('pdf_bytes', models.BigIntegerField(default=0)),
+                ('text_bytes', models.BigIntegerField(default=0)),
+                ('last_used', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0004_resume_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='sheet_tabs',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='outcome',
+            name='logged_to_sheet',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='outcome',
+            index=models.Index(fields=['campaign', 'logged_to_sheet'], name='hiring_app__campaig_98cdf2_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0006_job_queue'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='resumecache',
+            name='scorer_version',
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='scoring_profile',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='keyword_hits',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='resumecache',
+            name='keyword_hits',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='resumecache',
+            name='scorer_key',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0007_scoring_profiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='relevance',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['campaign', 'relevance'], name='hiring_app__campaig_cf02c0_idx'),
+        ),
+    ]
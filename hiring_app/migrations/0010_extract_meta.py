@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0009_llm_evaluation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='extract_meta',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='resumecache',
+            name='extract_meta',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
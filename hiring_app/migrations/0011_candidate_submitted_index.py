@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0010_extract_meta'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['campaign', 'submitted_at'], name='hiring_app__campaig_a458ba_idx'),
+        ),
+    ]
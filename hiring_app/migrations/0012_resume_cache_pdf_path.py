@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0011_candidate_submitted_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumecache',
+            name='pdf_path',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
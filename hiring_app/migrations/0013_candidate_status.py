@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0012_resume_cache_pdf_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='status',
+            field=models.CharField(default='Downloaded', max_length=20),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:58
+
+from django.db import migrations, models
+
+# A frozen copy of dedupe.normalize_email as it was when this migration was written, so
+# later changes to the live function don't change what this migration does.
+DOT_BLIND_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    local, at, domain = email.rpartition("@")
+    if not at or not local: return email
+    if domain in DOT_BLIND_DOMAINS:
+        local = local.split("+", 1)[0].replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"
+
+
+def backfill_email_keys(apps, schema_editor):
+    # Existing duplicates are left as they are; sending already skips repeat addresses
+    Candidate = apps.get_model('hiring_app', 'Candidate')
+    batch = []
+    for cand in Candidate.objects.only('id', 'email').iterator():
+        cand.email_key = normalize_email(cand.email)
+        batch.append(cand)
+    Candidate.objects.bulk_update(batch, ['email_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0013_candidate_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='email_key',
+            field=models.CharField(blank=True, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='invited_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='submissions',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['campaign', 'email_key'], name='hiring_app__campaig_977adf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['campaign', 'content_hash'], name='hiring_app__campaig_7d3ebe_idx'),
+        ),
+        migrations.RunPython(backfill_email_keys, migrations.RunPython.noop),
+    ]
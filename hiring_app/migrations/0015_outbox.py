@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0014_candidate_dedupe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('idempotency_key', models.CharField(max_length=300, unique=True)),
+                ('fingerprint', models.CharField(blank=True, max_length=100)),
+                ('email', models.CharField(max_length=254)),
+                ('decision', models.CharField(blank=True, max_length=20)),
+                ('subject', models.CharField(max_length=300)),
+                ('ics', models.TextField(blank=True)),
+                ('raw', models.TextField()),
+                ('status', models.CharField(default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('gmail_id', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to='hiring_app.campaign')),
+                ('candidate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='messages', to='hiring_app.candidate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'kind', 'status'], name='hiring_app__campaig_37bc9f_idx'), models.Index(fields=['claim_token'], name='hiring_app__claim_t_9b8c75_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0016_pipeline_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='synced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='watch_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='watch_id',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
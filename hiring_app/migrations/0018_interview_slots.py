@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0017_push_ingestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_key', models.CharField(max_length=254)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='hiring_app.campaign')),
+                ('candidate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slots', to='hiring_app.candidate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'start'], name='hiring_app__campaig_a52021_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'email_key'), name='uniq_campaign_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0018_interview_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateDetail',
+            fields=[
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='detail', serialize=False, to='hiring_app.candidate')),
+                ('data', models.BinaryField()),
+                ('raw_bytes', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
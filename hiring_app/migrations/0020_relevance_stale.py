@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0019_candidate_details'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='relevance_stale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
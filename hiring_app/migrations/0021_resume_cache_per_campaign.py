@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:33
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_campaigns(apps, schema_editor):
+    # Rows belong to the campaign whose directory holds their PDF (the last one to store
+    # them). Rows from before per-campaign directories keep no campaign: no lookup matches
+    # them, but eviction still removes their files.
+    ResumeCache = apps.get_model('hiring_app', 'ResumeCache')
+    Campaign = apps.get_model('hiring_app', 'Campaign')
+    campaigns = set(Campaign.objects.values_list('pk', flat=True))
+    batch = []
+    for row in ResumeCache.objects.only('id', 'pdf_path').iterator():
+        m = re.search(r"campaign_(\d+)", row.pdf_path or "")
+        if m and int(m.group(1)) in campaigns:
+            row.campaign_id = int(m.group(1))
+            batch.append(row)
+    ResumeCache.objects.bulk_update(batch, ['campaign'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0020_relevance_stale'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumecache',
+            name='campaign',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='resume_cache', to='hiring_app.campaign'),
+        ),
+        migrations.AlterField(
+            model_name='resumecache',
+            name='file_id',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.RunPython(assign_campaigns, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='resumecache',
+            constraint=models.UniqueConstraint(fields=('campaign', 'file_id'), name='uniq_campaign_resume'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:46
+
+from django.db import migrations, models
+
+
+def mark_logged(apps, schema_editor):
+    # Responses processed before this migration were appended to the sheet inside their sync
+    apps.get_model('hiring_app', 'ProcessedResponse').objects.update(logged_to_sheet=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hiring_app', '0021_resume_cache_per_campaign'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processedresponse',
+            name='logged_to_sheet',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_logged, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='processedresponse',
+            name='sheet_row',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddIndex(
+            model_name='processedresponse',
+            index=models.Index(fields=['campaign', 'logged_to_sheet'], name='hiring_app__campaig_8e2880_idx'),
+        ),
+    ]
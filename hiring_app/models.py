@@ -1,3 +1,291 @@
 from django.db import models
 
-# Create your models here.
+
+class Campaign(models.Model):
+    role = models.CharField(max_length=200)
+    jd_text = models.TextField(blank=True)
+    form_id = models.CharField(max_length=100, db_index=True)
+    form_url = models.URLField(max_length=500, blank=True)
+    sheet_id = models.CharField(max_length=100, blank=True)
+    sheet_url = models.URLField(max_length=500, blank=True)
+    drive_qid = models.CharField(max_length=50, blank=True, null=True)
+    email_qid = models.CharField(max_length=50, blank=True, null=True)
+    linkedin_post_id = models.CharField(max_length=200, blank=True, null=True)
+    # Newest lastSubmittedTime seen by sync_responses (RFC3339, as returned by Forms)
+    response_watermark = models.CharField(max_length=40, blank=True, null=True)
+    synced_at = models.DateTimeField(null=True, blank=True)  # last full listing; see push.reconcile
+    # Forms watch publishing new responses to HIRING_FORMS_WATCH_TOPIC (push ingestion)
+    watch_id = models.CharField(max_length=100, blank=True)
+    watch_expires_at = models.DateTimeField(null=True, blank=True)
+    # {skill: weight} derived from jd_text at launch; see scoring.profile_from_jd
+    scoring_profile = models.JSONField(default=dict, blank=True)
+    # Sheet tabs already created (with headers), so writers don't re-issue addSheet
+    sheet_tabs = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    # New resumes were indexed since Candidate.relevance was last written; see refresh_relevance
+    relevance_stale = models.BooleanField(default=False)
+    # Bumped on every sync commit; writers compare-and-swap on it (see services.sync_responses)
+    version = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.role
+
+
+class CampaignLock(models.Model):
+    # Cross-process mutex (one row per held lock); see locks.campaign_lock
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='locks')
+    name = models.CharField(max_length=30)
+    owner = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'name'], name='uniq_campaign_lock'),
+        ]
+
+
+class Candidate(models.Model):
+    DOWNLOADED = 'Downloaded'
+    DOWNLOAD_FAILED = 'Download Failed'  # score is 0 until a later sync/rescore gets the file
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='candidates')
+    response_id = models.CharField(max_length=100)
+    email = models.CharField(max_length=254, blank=True)
+    email_key = models.CharField(max_length=254, blank=True)  # dedupe.normalize_email(email)
+    file_id = models.CharField(max_length=200, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)  # md5 of the resume PDF
+    submissions = models.IntegerField(default=1)  # repeat submissions collapsed into this candidate
+    invited_at = models.DateTimeField(null=True, blank=True)
+    drive_link = models.URLField(max_length=1000, blank=True)
+    status = models.CharField(max_length=20, default=DOWNLOADED)
+    score = models.IntegerField(default=0)
+    keyword_hits = models.JSONField(default=dict, blank=True)  # {skill: mentions}, explains the score
+    relevance = models.FloatField(default=0.0)  # BM25 of the resume against the campaign JD; see ranking.py
+    llm_rating = models.IntegerField(null=True, blank=True)  # 0-10 from llm_eval, None until reviewed
+    llm_summary = models.TextField(blank=True)
+    text_preview = models.TextField(blank=True)
+    extract_meta = models.JSONField(default=dict, blank=True)  # pages read / truncation; see pdf_text.py
+    submitted_at = models.CharField(max_length=40, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'response_id'], name='uniq_candidate_response'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'email']),
+            models.Index(fields=['campaign', 'email_key']),
+            models.Index(fields=['campaign', 'content_hash']),
+            models.Index(fields=['campaign', 'score']),
+            models.Index(fields=['campaign', 'submitted_at']),
+            models.Index(fields=['campaign', 'relevance']),
+        ]
+
+    def __str__(self):
+        return self.email or self.response_id
+
+
+class CandidateDetail(models.Model):
+    # Full resume text and other per-candidate data too big for the table rows; see details.py
+    candidate = models.OneToOneField(Candidate, on_delete=models.CASCADE, primary_key=True, related_name='detail')
+    data = models.BinaryField()  # zlib-compressed JSON
+    raw_bytes = models.IntegerField(default=0)  # uncompressed size
+    updated_at = models.DateTimeField()
+
+
+class ProcessedResponse(models.Model):
+    # Every response sync has handled, including ones without a usable resume link
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='processed_responses')
+    response_id = models.CharField(max_length=100)
+    processed_at = models.DateTimeField(auto_now_add=True)
+    # The response's "Responses" tab row. It is appended after the sync commits, so the
+    # Sheets call never holds the database; a failed append is retried by the next flush.
+    sheet_row = models.JSONField(default=list, blank=True)
+    logged_to_sheet = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'response_id'], name='uniq_processed_response'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'logged_to_sheet']),
+        ]
+
+
+class Outcome(models.Model):
+    OFFER_SENT = 'OFFER_SENT'
+    REJECTED = 'REJECTED'
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='outcomes')
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='outcomes')
+    email = models.CharField(max_length=254)
+    status = models.CharField(max_length=20)
+    # Rows wait here until a flush appends them to the "Outcomes" tab; a failed flush
+    # leaves them for the next one, so no decision goes unlogged.
+    logged_to_sheet = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['campaign', 'email']),
+            models.Index(fields=['campaign', 'logged_to_sheet']),
+        ]
+
+
+class ResumeCache(models.Model):
+    # Extracted text and score for one Drive file revision; see resume_cache.py. Per campaign,
+    # like the PDFs: a file two campaigns share has a row (and a copy) in each.
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, null=True, blank=True, related_name='resume_cache')
+    file_id = models.CharField(max_length=200)
+    revision = models.CharField(max_length=100)  # md5Checksum, else headRevisionId/modifiedTime
+    text = models.TextField(blank=True)
+    # Score/hits are only valid for the scoring profile they were computed with
+    score = models.IntegerField(default=0)
+    keyword_hits = models.JSONField(default=dict, blank=True)
+    scorer_key = models.CharField(max_length=40, blank=True)
+    extract_meta = models.JSONField(default=dict, blank=True)
+    pdf_bytes = models.BigIntegerField(default=0)  # 0 once the local PDF has been evicted
+    pdf_path = models.CharField(max_length=500, blank=True)  # in its campaign's resume dir
+    text_bytes = models.BigIntegerField(default=0)
+    last_used = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'file_id'], name='uniq_campaign_resume'),
+        ]
+
+
+class Job(models.Model):
+    # Background work queued by the views and run by `manage.py run_jobs`; see jobs.py
+    SYNC = 'sync'
+    INGEST = 'ingest'
+    INVITES = 'invites'
+    OUTCOMES = 'outcomes'
+    EVALUATE = 'evaluate'
+    RESCORE = 'rescore'
+    RELEVANCE = 'relevance'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    kind = models.CharField(max_length=20)
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    params = models.JSONField(default=dict, blank=True)
+    # Same kind + campaign + params while still queued/running => the existing job is reused
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, default=QUEUED)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    # Keys already finished, handed back to the task as `skip` when a job is resumed
+    done_keys = models.JSONField(default=list, blank=True)
+    results = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+
+class LLMEvaluation(models.Model):
+    # Cached Gemini verdict for one resume against one JD; see llm_eval.py for the key
+    cache_key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    prompt_version = models.PositiveIntegerField()
+    rating = models.IntegerField()
+    summary = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class OutboxMessage(models.Model):
+    # One rendered email per (campaign, candidate address, kind); see outbox.py
+    INVITE = 'invite'
+    OUTCOME = 'outcome'
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='outbox')
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='messages')
+    kind = models.CharField(max_length=20)
+    idempotency_key = models.CharField(max_length=300, unique=True)
+    # Inputs the message was rendered from (slot time, decision); an unsent message whose
+    # inputs changed is re-rendered, a sent one never is
+    fingerprint = models.CharField(max_length=100, blank=True)
+    email = models.CharField(max_length=254)
+    decision = models.CharField(max_length=20, blank=True)  # Outcome status, for outcome emails
+    subject = models.CharField(max_length=300)
+    ics = models.TextField(blank=True)
+    raw = models.TextField()  # base64url MIME, exactly what Gmail is given
+    status = models.CharField(max_length=10, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    gmail_id = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['campaign', 'kind', 'status']),
+            models.Index(fields=['claim_token']),
+        ]
+
+
+class PipelineRun(models.Model):
+    # Timings and counters of one sync/invite/outcome/review run; see metrics.py
+    kind = models.CharField(max_length=20)
+    campaign = models.ForeignKey(Campaign, on_delete=models.SET_NULL, null=True, blank=True, related_name='runs')
+    job = models.ForeignKey(Job, on_delete=models.SET_NULL, null=True, blank=True, related_name='runs')
+    started_at = models.DateTimeField()
+    seconds = models.FloatField(default=0)
+    # {stage: {"count", "seconds", "max"}}; stage time on pool threads overlaps, so it can exceed `seconds`
+    stages = models.JSONField(default=dict, blank=True)
+    counters = models.JSONField(default=dict, blank=True)
+    errors = models.JSONField(default=list, blank=True)  # swallowed exceptions, most recent last
+    profile = models.TextField(blank=True)  # sampled stacks, collapsed ("count frame;frame;...") format
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['kind', 'started_at']),
+        ]
+
+
+class InterviewSlot(models.Model):
+    # A booked interview; one per candidate address per campaign, see scheduler.py
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='slots')
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='slots')
+    email_key = models.CharField(max_length=254)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'email_key'], name='uniq_campaign_slot'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'start']),
+        ]
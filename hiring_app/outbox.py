@@ -0,0 +1,157 @@
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import metrics
+from .batching import is_transient
+from .dedupe import normalize_email
+from .models import OutboxMessage
+from .ratelimit import TokenBucket, backoff_delays
+
+# Emails are rendered once into OutboxMessage rows keyed per (campaign, address, kind), then
+# delivered by a pool of senders drawing from one process-wide send rate. A message recorded
+# as sent is not sent again and one that failed is retried by the next dispatch. Delivery is
+# at-least-once: a worker that dies between Gmail accepting a message and saving that leaves
+# it to be sent again once its lease lapses.
+
+_lock = threading.Lock()
+_bucket = None
+
+
+def send_bucket():
+    global _bucket
+    with _lock:
+        if _bucket is None:
+            rate = getattr(settings, 'HIRING_GMAIL_SENDS_PER_SEC', 2)
+            _bucket = TokenBucket(rate, capacity=rate)
+        return _bucket
+
+
+def reset():
+    # Pick up a changed HIRING_GMAIL_SENDS_PER_SEC on the next send
+    global _bucket
+    with _lock:
+        _bucket = None
+
+
+def idempotency_key(campaign, kind, email):
+    # Candidates are one per normalized address (see dedupe.py), so this is per candidate too
+    return f"{kind}:{campaign.pk}:{normalize_email(email)}"
+
+
+def queue(campaign, kind, entries):
+    """Make sure every entry has a stored message; returns the messages in entry order.
+
+    entries are (email, candidate, fingerprint, render) with render(key) returning the
+    subject/raw (and ics/decision) fields. Only new messages, and unsent ones whose
+    fingerprint changed, are rendered.
+    """
+    keyed = [(idempotency_key(campaign, kind, entry[0]), entry) for entry in entries]
+    stored = _by_key([key for key, _ in keyed])
+    new, rerendered = [], []
+    for key, (email, candidate, fingerprint, render) in keyed:
+        msg = stored.get(key)
+        if msg and (msg.fingerprint == fingerprint or msg.status not in (OutboxMessage.PENDING, OutboxMessage.FAILED)):
+            continue
+        fields = dict(render(key), email=email, candidate=candidate, fingerprint=fingerprint)
+        if msg:
+            for name, value in fields.items(): setattr(msg, name, value)
+            rerendered.append(msg)
+        else:
+            new.append(OutboxMessage(campaign=campaign, kind=kind, idempotency_key=key, **fields))
+    # A concurrent queue() may have inserted the same key: theirs stands
+    OutboxMessage.objects.bulk_create(new, batch_size=500, ignore_conflicts=True)
+    if rerendered:
+        OutboxMessage.objects.bulk_update(rerendered, ['email', 'candidate', 'fingerprint', 'decision', 'subject', 'ics', 'raw'],
+                                          batch_size=500)
+    stored = _by_key([key for key, _ in keyed])
+    return [stored[key] for key, _ in keyed if key in stored]
+
+
+def dispatch(messages, send, on_result=None):
+    """Deliver the given messages that aren't sent yet; returns {pk: error or None} for those tried.
+
+    send(message) runs on pool threads and returns Gmail's response. Messages are claimed a
+    window at a time, just before they are sent, and the claim is renewed while they wait for
+    a send slot; one another worker holds is left alone unless its lease lapsed. Each result
+    is saved as soon as it arrives, together with whatever on_result(message, error) writes,
+    but only while the claim is still ours.
+    """
+    lease = getattr(settings, 'HIRING_OUTBOX_LEASE', 300)
+    # Small enough for the whole window to go out well inside one lease at the send rate
+    window = max(1, int(getattr(settings, 'HIRING_GMAIL_SENDS_PER_SEC', 2) * lease / 2))
+    token = uuid.uuid4().hex
+    ids = [m.pk for m in messages if m.status != OutboxMessage.SENT]
+    results = {}
+    with ThreadPoolExecutor(max_workers=getattr(settings, 'HIRING_OUTBOX_WORKERS', 4)) as pool:
+        for i in range(0, len(ids), window):
+            claimed = _claim(ids[i:i + window], token, lease)
+            futures = {pool.submit(metrics.bind(_deliver), send, msg): msg for msg in claimed}
+            renewed = time.monotonic()
+            while futures:
+                done, _ = wait(futures, timeout=lease / 3, return_when=FIRST_COMPLETED)
+                if time.monotonic() - renewed >= lease / 3:
+                    # Shared send rate may be slower than planned: keep the unsent part of the window ours
+                    OutboxMessage.objects.filter(claim_token=token, status=OutboxMessage.SENDING).update(
+                        claimed_at=timezone.now())
+                    renewed = time.monotonic()
+                for fut in done:
+                    msg = futures.pop(fut)
+                    results[msg.pk] = _save(msg, token, *fut.result(), on_result)
+    return results
+
+
+def _claim(ids, token, lease):
+    now = timezone.now()
+    lapsed = now - timedelta(seconds=lease)
+    for i in range(0, len(ids), 500):
+        OutboxMessage.objects.filter(pk__in=ids[i:i + 500]).filter(
+            Q(status__in=[OutboxMessage.PENDING, OutboxMessage.FAILED]) |
+            Q(status=OutboxMessage.SENDING, claimed_at__lt=lapsed)
+        ).update(status=OutboxMessage.SENDING, claim_token=token, claimed_at=now, attempts=F('attempts') + 1)
+    # Earlier windows have all been saved (which clears the token), so this is just the new one
+    return list(OutboxMessage.objects.filter(claim_token=token).order_by('id'))
+
+
+def _save(msg, token, response, error, on_result):
+    if error:
+        msg.status, msg.last_error = OutboxMessage.FAILED, str(error)
+    else:
+        msg.status, msg.last_error, msg.sent_at = OutboxMessage.SENT, "", timezone.now()
+        msg.gmail_id = (response or {}).get('id', '') if isinstance(response, dict) else ''
+    with transaction.atomic():
+        # If our lease lapsed and another worker took the message over, its result stands
+        saved = OutboxMessage.objects.filter(pk=msg.pk, claim_token=token).update(
+            status=msg.status, last_error=msg.last_error, sent_at=msg.sent_at, gmail_id=msg.gmail_id, claim_token="")
+        if saved and on_result: on_result(msg, error)
+    metrics.count("outbox.lease_lost" if not saved else "outbox.failed" if error else "outbox.sent")
+    return error
+
+
+def _by_key(keys):
+    found = {}
+    for i in range(0, len(keys), 500):
+        for msg in OutboxMessage.objects.filter(idempotency_key__in=keys[i:i + 500]):
+            found[msg.idempotency_key] = msg
+    return found
+
+
+def _deliver(send, msg):
+    # Pool thread: waits for a send slot and backs off on rate limits / 5xx
+    delays = backoff_delays(getattr(settings, 'HIRING_OUTBOX_RETRIES', 5), base=1.0, cap=32.0)
+    while True:
+        send_bucket().acquire()
+        try:
+            return send(msg), None
+        except Exception as e:
+            delay = next(delays, None) if is_transient(e) else None
+            if delay is None: return None, e
+            metrics.count("retries.gmail")
+            time.sleep(delay)
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+from . import scoring
+
+# Why extraction stopped before the last page; None means the whole document was read.
+# SKILLS_FOUND text is enough for the profile it was scored with, but not for a different one.
+TOO_LARGE = "too_large"
+PAGE_LIMIT = "page_limit"
+CHAR_LIMIT = "char_limit"
+TIMEOUT = "timeout"
+SKILLS_FOUND = "skills_found"
+ERROR = "error"
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _Timeout()
+
+
+def extract_text(path, max_pages=None, max_bytes=None, max_chars=None, timeout=None, terms=None, early_stop_chars=0):
+    """Pull text from a PDF page by page within the given caps; returns (text, meta).
+
+    meta["seconds"] is the time spent, for the caller's metrics; it isn't meant to be stored.
+
+    Module-level so it can be shipped to ProcessPoolExecutor workers. `terms` is a scoring
+    profile: once every one of its skills has been seen (and at least `early_stop_chars` of
+    text read) the remaining pages are skipped.
+    """
+    meta = {"pages_read": 0, "total_pages": None, "bytes": None, "truncated": None}
+    parts, chars = [], 0
+    started = time.monotonic()
+    try:
+        meta["bytes"] = os.path.getsize(path)
+        if max_bytes and meta["bytes"] > max_bytes:
+            meta["truncated"] = TOO_LARGE
+            return "", dict(meta, seconds=0.0)
+    except OSError:
+        meta["truncated"] = ERROR
+        return "", dict(meta, seconds=0.0)
+
+    profile = scoring.get_profile(terms) if terms and early_stop_chars else None
+    missing = set(profile.terms) if profile else None
+    deadline = time.monotonic() + timeout if timeout else None
+    # The alarm interrupts a single page that never finishes; the deadline check covers
+    # callers off the main thread, where signals can't be used.
+    alarm = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+    try:
+        if alarm: signal.setitimer(signal.ITIMER_REAL, timeout)
+        # An open handle lets pypdf seek to each page instead of reading the whole file up front
+        with open(path, "rb") as fh:
+            reader = PdfReader(fh)
+            meta["total_pages"] = len(reader.pages)
+            for i in range(meta["total_pages"]):
+                if max_pages and i >= max_pages:
+                    meta["truncated"] = PAGE_LIMIT
+                    break
+                if deadline and time.monotonic() > deadline:
+                    meta["truncated"] = TIMEOUT
+                    break
+                page_text = reader.pages[i].extract_text() or ""
+                if max_chars and chars + len(page_text) > max_chars:
+                    parts.append(page_text[:max_chars - chars])
+                    meta["pages_read"] = i + 1
+                    meta["truncated"] = CHAR_LIMIT
+                    break
+                parts.append(page_text)
+                chars += len(page_text)
+                meta["pages_read"] = i + 1
+                if missing:
+                    missing -= set(profile.hits(page_text))
+                if profile and not missing and chars >= early_stop_chars and i + 1 < meta["total_pages"]:
+                    meta["truncated"] = SKILLS_FOUND
+                    break
+    except _Timeout:
+        meta["truncated"] = TIMEOUT
+    except Exception:
+        meta["truncated"] = ERROR
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return "\n".join(parts), dict(meta, seconds=time.monotonic() - started)
+
+
+def limits():
+    """Extraction caps from settings, as keyword arguments for extract_text."""
+    from django.conf import settings
+    return {
+        "max_pages": getattr(settings, 'HIRING_PDF_MAX_PAGES', 15),
+        "max_bytes": getattr(settings, 'HIRING_PDF_MAX_BYTES', 10 << 20),
+        "max_chars": getattr(settings, 'HIRING_PDF_MAX_CHARS', 50000),
+        "timeout": getattr(settings, 'HIRING_PDF_TIMEOUT', 10),
+        "early_stop_chars": getattr(settings, 'HIRING_PDF_EARLY_STOP_CHARS', 4000),
+    }
+
+
+def process_pool(workers):
+    """A ProcessPoolExecutor for extract_text.
+
+    Workers are started by a forkserver (spawn where there is none) rather than forked
+    from the caller, which has download and API client threads running: a lock one of
+    them holds at fork time would stay locked forever in the child.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
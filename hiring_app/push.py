@@ -0,0 +1,80 @@
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import jobs
+from .models import Campaign, Job
+
+# Push ingestion. A Forms watch (see HiringAutomator.watch_form) publishes to Pub/Sub when a
+# form gets responses, and the topic's push subscription calls views.forms_webhook. Forms
+# only says *that* a form changed, so those pushes queue an incremental sync, which lists
+# just the responses past the watermark. Pushes that name responses (e.g. from an Apps
+# Script onFormSubmit trigger) queue an ingest of exactly those. reconcile() is the safety
+# net: a low-frequency sync of every campaign, whatever the pushes did or didn't deliver.
+
+
+def parse(body):
+    """(form_id, response ids) from a Pub/Sub push envelope or a plain {"formId", "responseId(s)"} body.
+
+    Raises ValueError when the body isn't JSON.
+    """
+    payload = json.loads(body or b"{}")
+    message = payload.get("message") if isinstance(payload, dict) else None
+    if isinstance(message, dict):
+        # Forms puts formId/watchId/eventType in the attributes; a stand-in may put JSON in data
+        try: data = json.loads(base64.b64decode(message.get("data") or "") or b"{}")
+        except (binascii.Error, ValueError): data = {}
+        payload = {**(data if isinstance(data, dict) else {}), **(message.get("attributes") or {})}
+    if not isinstance(payload, dict): return None, []
+    ids = payload.get("responseIds") or ([payload["responseId"]] if payload.get("responseId") else [])
+    return payload.get("formId"), [str(i) for i in ids]
+
+
+def notify(form_id, response_ids=()):
+    """Queue the work for one push; returns the jobs (none if no active campaign uses the form)."""
+    queued = []
+    for campaign in Campaign.objects.filter(form_id=form_id, is_active=True):
+        if response_ids:
+            queued.append(jobs.enqueue(Job.INGEST, campaign, {'response_ids': sorted(set(response_ids))}))
+        else:
+            # A sync that is already running may have listed before this response arrived
+            queued.append(jobs.enqueue(Job.SYNC, campaign, {'full_resync': False}, reuse_running=False))
+    return queued
+
+
+def reconcile(automator=None):
+    """Queue a sync for active campaigns not listed in HIRING_RECONCILE_INTERVAL seconds, a
+    relevance refresh for those with newly indexed resumes, retry sheet appends that failed,
+    and renew Forms watches that lapse within a day.
+
+    Returns {"synced": [...], "relevance": [...], "sheet_errors": [...], "watch_errors": [...]}.
+    """
+    now = timezone.now()
+    active = Campaign.objects.filter(is_active=True)
+    interval = getattr(settings, 'HIRING_RECONCILE_INTERVAL', 900)
+    synced = []
+    if interval:
+        stale = active.filter(Q(synced_at__isnull=True) | Q(synced_at__lt=now - timedelta(seconds=interval)))
+        synced = [jobs.enqueue(Job.SYNC, campaign, {'full_resync': False}) for campaign in stale]
+    relevance = [jobs.enqueue(Job.RELEVANCE, campaign, {}, reuse_running=False)
+                 for campaign in active.filter(relevance_stale=True)]
+    sheet_errors = []
+    unlogged = active.filter(Q(processed_responses__logged_to_sheet=False) | Q(outcomes__logged_to_sheet=False)).distinct()
+    for campaign in unlogged:
+        automator = automator or jobs.automator()
+        try:
+            automator.flush_response_log(campaign)
+            automator.flush_outcome_log(campaign)
+        except Exception as e: sheet_errors.append(f"{campaign.role} (#{campaign.pk}): {e}")
+    errors = []
+    if getattr(settings, 'HIRING_FORMS_WATCH_TOPIC', ''):
+        expiring = active.filter(Q(watch_expires_at__isnull=True) | Q(watch_expires_at__lt=now + timedelta(days=1)))
+        for campaign in expiring:
+            try: (automator or jobs.automator()).watch_form(campaign)
+            except Exception as e: errors.append(f"{campaign.role} (#{campaign.pk}): {e}")
+    return {"synced": synced, "relevance": relevance, "sheet_errors": sheet_errors, "watch_errors": errors}
@@ -0,0 +1,135 @@
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the this to we will with "
+    "you your about who what how role team work working years year experience".split())
+
+K1, B = 1.2, 0.75
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class RankingIndex:
+    """BM25 over every extracted resume in a campaign.
+
+    Documents are rows of a sparse term-frequency matrix keyed by response id; adding
+    resumes only tokenizes the new ones, and the index is saved as a single .npz.
+    """
+
+    def __init__(self, doc_ids=None, vocab=None, tf=None):
+        self.doc_ids = list(doc_ids or [])
+        self.vocab = dict(vocab or {})
+        self.tf = tf if tf is not None else sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._refresh()
+
+    def _refresh(self):
+        self.rows = {d: i for i, d in enumerate(self.doc_ids)}
+        self.doc_len = np.asarray(self.tf.sum(axis=1)).ravel()
+        self.df = np.bincount(self.tf.indices, minlength=len(self.vocab)) if self.tf.nnz else np.zeros(len(self.vocab))
+        self._csc = None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def upsert(self, docs):
+        """Add [(doc_id, text)]; a doc_id already in the index has its row replaced."""
+        if not docs: return
+        docs = dict(docs)
+        rows, cols, vals = [], [], []
+        for r, text in enumerate(docs.values()):
+            for term, n in Counter(tokenize(text)).items():
+                rows.append(r)
+                cols.append(self.vocab.setdefault(term, len(self.vocab)))
+                vals.append(n)
+        new = sparse.csr_matrix((vals, (rows, cols)), shape=(len(docs), len(self.vocab)), dtype=np.float32)
+
+        keep = [i for i, d in enumerate(self.doc_ids) if d not in docs]
+        old = self.tf
+        if len(keep) != len(self.doc_ids): old = old[keep]
+        old = old.copy()
+        old.resize((old.shape[0], len(self.vocab)))
+        self.tf = sparse.vstack([old, new], format="csr")
+        self.doc_ids = [self.doc_ids[i] for i in keep] + list(docs)
+        self._refresh()
+
+    def query(self, text):
+        """{doc_id: BM25 score} for a query such as the campaign's JD."""
+        if not self.doc_ids: return {}
+        terms = Counter(t for t in tokenize(text) if t in self.vocab)
+        if not terms: return dict.fromkeys(self.doc_ids, 0.0)
+        cols = np.array([self.vocab[t] for t in terms])
+        qtf = np.array(list(terms.values()), dtype=np.float32)
+        if self._csc is None: self._csc = self.tf.tocsc()
+
+        n = len(self.doc_ids)
+        idf = np.log1p((n - self.df[cols] + 0.5) / (self.df[cols] + 0.5))
+        avgdl = self.doc_len.mean() or 1.0
+        sub = self._csc[:, cols].tocoo()
+        norm = K1 * (1 - B + B * self.doc_len[sub.row] / avgdl)
+        contrib = (sub.data * (K1 + 1) / (sub.data + norm)) * idf[sub.col] * qtf[sub.col]
+        scores = np.bincount(sub.row, weights=contrib, minlength=n)
+        return dict(zip(self.doc_ids, scores.tolist()))
+
+    # --- persistence ---
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, data=self.tf.data, indices=self.tf.indices, indptr=self.tf.indptr,
+                 shape=np.array(self.tf.shape), meta=np.array(json.dumps({"doc_ids": self.doc_ids, "vocab": self.vocab})))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path): return cls()
+        with np.load(path) as f:
+            meta = json.loads(str(f["meta"]))
+            tf = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        return cls(meta["doc_ids"], meta["vocab"], tf)
+
+
+# Loaded indexes are kept per process and reloaded only when the file changes
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def index_path(campaign):
+    return os.path.join(settings.MEDIA_ROOT, 'rank_index', f"campaign_{campaign.pk}.npz")
+
+
+def load_index(campaign):
+    path = index_path(campaign)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    with _cache_lock:
+        hit = _cache.get(path)
+        if hit and hit[0] == mtime: return hit[1]
+    index = RankingIndex.load(path)
+    with _cache_lock:
+        _cache[path] = (mtime, index)
+    return index
+
+
+def add_documents(campaign, docs):
+    """Fold [(response_id, text)] into the campaign's index."""
+    if not docs: return
+    index = load_index(campaign)
+    index.upsert(docs)
+    path = index_path(campaign)
+    index.save(path)
+    with _cache_lock:
+        _cache[path] = (os.path.getmtime(path), index)
+
+
+def relevance(campaign):
+    """{response_id: BM25 score of the resume against the campaign's JD}."""
+    return load_index(campaign).query(campaign.jd_text or campaign.role)
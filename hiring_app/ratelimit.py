@@ -0,0 +1,38 @@
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        # Blocks until n tokens are available; requests larger than the bucket take it whole
+        n = min(float(n), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def per_minute(limit):
+    return TokenBucket(limit / 60.0, capacity=limit)
+
+
+def backoff_delays(retries, base=1.0, cap=60.0):
+    # Exponential backoff with full jitter: U(0, min(cap, base * 2**attempt))
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
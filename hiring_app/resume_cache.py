@@ -0,0 +1,86 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ResumeCache
+
+DRIVE_META_FIELDS = "id,md5Checksum,headRevisionId,modifiedTime,size"
+
+
+def revision_key(meta):
+    # Uploaded PDFs carry an md5; native Drive files only have revision ids/timestamps
+    if not meta: return None
+    return meta.get('md5Checksum') or meta.get('headRevisionId') or meta.get('modifiedTime')
+
+
+def file_md5(path):
+    h = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''): h.update(chunk)
+    return h.hexdigest()
+
+
+def lookup(campaign, metadata):
+    """The campaign's fresh cache entries for {file_id: drive metadata}; stale or unknown files are left out."""
+    hits = {}
+    rows = ResumeCache.objects.filter(campaign=campaign, file_id__in=list(metadata)).exclude(text_bytes=0)
+    for row in rows:
+        key = revision_key(metadata[row.file_id])
+        if key and row.revision == key: hits[row.file_id] = row
+    if hits:
+        ResumeCache.objects.filter(pk__in=[r.pk for r in hits.values()]).update(last_used=timezone.now())
+    return hits
+
+
+def store(campaign, entries):
+    """Upsert the campaign's [(file_id, metadata, text, score, keyword_hits, scorer_key, pdf_path, extract_meta)] after a sync."""
+    now = timezone.now()
+    rows = []
+    for file_id, meta, text, score, keyword_hits, scorer_key, pdf_path, extract_meta in entries:
+        key = revision_key(meta)
+        # No revision: can't tell when it goes stale. No text: likely a failed download.
+        if not key or not text: continue
+        rows.append(ResumeCache(
+            campaign=campaign, file_id=file_id, revision=key, text=text, score=score, keyword_hits=keyword_hits, scorer_key=scorer_key,
+            extract_meta=extract_meta or {},
+            pdf_bytes=os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0, pdf_path=pdf_path,
+            text_bytes=len(text.encode('utf-8')), last_used=now,
+        ))
+    ResumeCache.objects.bulk_create(
+        rows, batch_size=500, update_conflicts=True, unique_fields=['campaign', 'file_id'],
+        update_fields=['revision', 'text', 'score', 'keyword_hits', 'scorer_key', 'extract_meta', 'pdf_bytes', 'pdf_path', 'text_bytes', 'last_used'],
+    )
+
+
+def evict(max_pdf_bytes=None, max_text_bytes=None):
+    """Trim least-recently-used PDFs and extracted texts back under their size caps (shared by all campaigns)."""
+    max_pdf_bytes = max_pdf_bytes or getattr(settings, 'HIRING_PDF_CACHE_MAX_BYTES', 2 << 30)
+    max_text_bytes = max_text_bytes or getattr(settings, 'HIRING_TEXT_CACHE_MAX_BYTES', 200 << 20)
+
+    total = ResumeCache.objects.aggregate(n=Sum('pdf_bytes'))['n'] or 0
+    if total > max_pdf_bytes:
+        evicted = []
+        rows = ResumeCache.objects.filter(pdf_bytes__gt=0).order_by('last_used')
+        for pk, file_id, path, size in rows.values_list('pk', 'file_id', 'pdf_path', 'pdf_bytes').iterator():
+            if total <= max_pdf_bytes: break
+            # Rows from before per-campaign directories have no path; they lived in cv_pdfs itself
+            path = path or os.path.join(settings.MEDIA_ROOT, 'cv_pdfs', f"{file_id}.pdf")
+            if os.path.exists(path): os.remove(path)
+            evicted.append(pk)
+            total -= size
+        ResumeCache.objects.filter(pk__in=evicted).update(pdf_bytes=0)
+
+    total = ResumeCache.objects.aggregate(n=Sum('text_bytes'))['n'] or 0
+    if total > max_text_bytes:
+        evicted = []
+        for pk, pdf_bytes, size in ResumeCache.objects.order_by('last_used').values_list('pk', 'pdf_bytes', 'text_bytes').iterator():
+            if total <= max_text_bytes: break
+            evicted.append(pk)
+            total -= size
+        # Rows whose PDF is still on disk keep their slot (text is cheap to re-extract);
+        # rows with neither are dropped entirely.
+        ResumeCache.objects.filter(pk__in=evicted, pdf_bytes=0).delete()
+        ResumeCache.objects.filter(pk__in=evicted).update(text="", text_bytes=0)
@@ -0,0 +1,141 @@
+import bisect
+import time
+from datetime import datetime, timedelta
+
+from dateutil import tz
+from django.conf import settings
+
+from .locks import campaign_lock, wait_until_released, LockHeld
+from .models import InterviewSlot
+
+# Interview slots. Availability is a list of windows (by default the working hours of each
+# working day from the requested start); one pass over them gives each candidate, best
+# score first, the earliest gap of the slot length that clears every booked interview of
+# the campaign by the buffer. A candidate keeps the slot once booked, so re-sending or
+# resuming an invite job never moves anyone.
+
+
+class BookedIndex:
+    """Booked (start, end) intervals sorted by start, with O(log n) overlap checks.
+
+    Intervals never overlap one another (allocate() keeps buffers between them), so ends are
+    sorted too and the last interval starting before a range is the only one to check.
+    """
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals)
+        self.starts = [start for start, _ in self.intervals]
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def add(self, start, end):
+        i = bisect.bisect(self.starts, start)
+        self.starts.insert(i, start)
+        self.intervals.insert(i, (start, end))
+
+    def overlapping(self, start, end):
+        # The booked interval overlapping [start, end), or None
+        i = bisect.bisect_left(self.starts, end) - 1
+        if i >= 0 and self.intervals[i][1] > start: return self.intervals[i]
+        return None
+
+
+def check_lengths(minutes, buffer):
+    # A slot that ends before it starts, or a negative buffer, would let bookings overlap
+    if minutes < 1: raise ValueError(f"Interview slots must be at least 1 minute long (got {minutes})")
+    if buffer < 0: raise ValueError(f"The buffer between interviews can't be negative (got {buffer})")
+
+
+def allocate(count, windows, booked, minutes, buffer=0):
+    """Up to `count` slot starts, earliest first, in one pass over `windows` ([(start, end)] in order).
+
+    Each new slot is added to `booked`. Raises ValueError for a non-positive length or negative buffer.
+    """
+    check_lengths(minutes, buffer)
+    length, gap = timedelta(minutes=minutes), timedelta(minutes=buffer)
+    slots = []
+    for window_start, window_end in windows:
+        cursor = window_start
+        while len(slots) < count and cursor + length <= window_end:
+            hit = booked.overlapping(cursor - gap, cursor + length + gap)
+            if hit:
+                cursor = max(cursor, hit[1] + gap)  # jump past the booking rather than stepping
+                continue
+            slots.append(cursor)
+            booked.add(cursor, cursor + length)
+            cursor += length + gap
+        if len(slots) >= count: break
+    return slots
+
+
+def daily_windows(first, days, hours, weekdays):
+    """Working-hours windows from `first` (aware) over `days` days; hours is "HH:MM-HH:MM"."""
+    day_start, day_end = (datetime.strptime(h.strip(), "%H:%M").time() for h in hours.split("-"))
+    for d in range(days):
+        day = (first + timedelta(days=d)).date()
+        if day.weekday() not in weekdays: continue
+        start = max(first, datetime.combine(day, day_start, first.tzinfo))
+        end = datetime.combine(day, day_end, first.tzinfo)
+        if start < end: yield start, end
+
+
+def options(minutes=None, buffer=None, hours=None):
+    # Scheduling settings, with the caller's overrides (e.g. from the invite form); raises
+    # ValueError for lengths that can't be booked
+    weekdays = getattr(settings, 'HIRING_INTERVIEW_WEEKDAYS', "0,1,2,3,4")
+    minutes = int(minutes if minutes not in (None, "") else getattr(settings, 'HIRING_INTERVIEW_MINUTES', 45))
+    buffer = int(buffer if buffer not in (None, "") else getattr(settings, 'HIRING_INTERVIEW_BUFFER', 15))
+    check_lengths(minutes, buffer)
+    return {
+        "minutes": minutes,
+        "buffer": buffer,
+        "hours": hours or getattr(settings, 'HIRING_INTERVIEW_HOURS', "09:00-17:00"),
+        "weekdays": {int(d) for d in str(weekdays).split(",") if d.strip()},
+        "days": getattr(settings, 'HIRING_INTERVIEW_HORIZON_DAYS', 30),
+    }
+
+
+def local_tz():
+    # Times typed into the dashboard are in HIRING_INTERVIEW_TZ (default: the server's zone)
+    return tz.gettz(getattr(settings, 'HIRING_INTERVIEW_TZ', '') or None) or tz.tzlocal()
+
+
+def book(campaign, wanted, first, minutes, buffer, hours, weekdays, days):
+    """{email_key: InterviewSlot} for `wanted` ([(email_key, candidate)], best first).
+
+    Already-booked keys keep their slot; the rest get new ones from `first` (aware) on.
+    Keys left out found no free slot within the horizon.
+    """
+    deadline = time.monotonic() + getattr(settings, 'HIRING_SYNC_WAIT', 120)
+    while True:
+        try:
+            # Two invite runs for one campaign must not hand out the same time
+            with campaign_lock(campaign, "schedule", ttl=60):
+                return _book_locked(campaign, wanted, first, minutes, buffer, hours, weekdays, days)
+        except LockHeld:
+            if time.monotonic() > deadline: raise
+            wait_until_released(campaign, "schedule", timeout=max(0, deadline - time.monotonic()))
+
+
+def _book_locked(campaign, wanted, first, minutes, buffer, hours, weekdays, days):
+    keys = [key for key, _ in wanted]
+    booked = {}
+    for i in range(0, len(keys), 500):
+        for slot in campaign.slots.filter(email_key__in=keys[i:i + 500]):
+            booked[slot.email_key] = slot
+    todo = [(key, cand) for key, cand in wanted if key not in booked]
+    if not todo: return booked
+
+    windows = list(daily_windows(first, days, hours, weekdays))
+    if not windows: return booked
+    horizon = windows[-1][1] + timedelta(minutes=buffer)
+    # Only bookings that could collide with these windows go into the index
+    index = BookedIndex(campaign.slots.filter(start__lt=horizon, end__gt=first - timedelta(minutes=buffer))
+                        .values_list('start', 'end'))
+    starts = allocate(len(todo), windows, index, minutes, buffer)
+    new = [InterviewSlot(campaign=campaign, candidate=cand, email_key=key, start=start,
+                         end=start + timedelta(minutes=minutes)) for (key, cand), start in zip(todo, starts)]
+    InterviewSlot.objects.bulk_create(new, batch_size=500)
+    booked.update((slot.email_key, slot) for slot in new)
+    return booked
@@ -0,0 +1,139 @@
+import bisect
+import hashlib
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Canonical skill -> phrases that count as a mention. Matching is case-insensitive and
+# on word boundaries, so "java" doesn't fire inside "javascript" nor "api" inside "capital".
+SKILL_VOCABULARY = {
+    "python": ["python"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "api": ["api", "apis"],
+    "rest": ["rest", "restful", "rest api", "rest apis"],
+    "graphql": ["graphql"],
+    "sql": ["sql", "mysql", "postgresql", "postgres", "sqlite"],
+    "nosql": ["nosql", "mongodb", "dynamodb", "cassandra"],
+    "redis": ["redis"],
+    "docker": ["docker", "containers"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud"],
+    "azure": ["azure"],
+    "terraform": ["terraform"],
+    "ci/cd": ["ci/cd", "continuous integration", "github actions", "jenkins"],
+    "git": ["git"],
+    "linux": ["linux", "unix"],
+    "java": ["java"],
+    "spring": ["spring", "spring boot"],
+    "kotlin": ["kotlin"],
+    "scala": ["scala"],
+    "go": ["golang"],
+    "rust": ["rust"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", ".net", "dotnet"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript"],
+    "node": ["node", "node.js", "nodejs"],
+    "react": ["react", "react.js", "reactjs"],
+    "angular": ["angular"],
+    "vue": ["vue", "vue.js"],
+    "html/css": ["html", "css"],
+    "kafka": ["kafka"],
+    "spark": ["spark", "pyspark"],
+    "airflow": ["airflow"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning", "pytorch", "tensorflow", "keras"],
+    "nlp": ["nlp", "natural language processing"],
+    "llm": ["llm", "llms", "large language models", "generative ai"],
+    "data analysis": ["data analysis", "analytics"],
+    "excel": ["excel"],
+    "tableau": ["tableau", "power bi"],
+    "microservices": ["microservices", "microservice"],
+    "testing": ["unit testing", "pytest", "tdd", "test automation"],
+    "security": ["security", "oauth", "owasp"],
+    "agile": ["agile", "scrum", "kanban"],
+    "figma": ["figma"],
+    "ios": ["ios", "swift"],
+    "android": ["android"],
+}
+
+# The original hardcoded keyword list; used when a campaign has no JD to learn from
+DEFAULT_TERMS = {k: 1 for k in ["python", "django", "api", "sql", "rest", "docker", "java", "node", "aws"]}
+
+MUST_WEIGHT, DEFAULT_WEIGHT, NICE_WEIGHT = 3, 2, 1
+
+
+def _compile(phrases):
+    # Longest first, so "rest api" wins over "rest"; boundaries allow symbols like c++ / node.js
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"(?<![\w+#]){'(?:' + alternation + ')'}(?![\w+#]|\.\w)", re.IGNORECASE)
+
+
+_ALIASES = {alias: skill for skill, aliases in SKILL_VOCABULARY.items() for alias in aliases}
+_VOCAB_RE = _compile(_ALIASES)
+
+
+class ScoringProfile:
+    """Weighted skills for one role, matched in a single regex pass over each resume."""
+
+    def __init__(self, terms):
+        self.terms = dict(terms)
+        self.aliases = {a: s for a, s in _ALIASES.items() if s in self.terms}
+        self.pattern = _compile(self.aliases) if self.aliases else None
+        self.key = hashlib.sha1(json.dumps(sorted(self.terms.items())).encode()).hexdigest()
+
+    def hits(self, text):
+        if not self.pattern or not text: return Counter()
+        return Counter(self.aliases[m.group(0).lower()] for m in self.pattern.finditer(text))
+
+    def score(self, text):
+        # -> (score, {skill: hit count}); each skill counts its weight once, however often it appears
+        hits = self.hits(text)
+        return sum(self.terms[s] for s in hits), dict(hits)
+
+    def score_many(self, texts):
+        # One scan over all resumes joined together; match offsets map back to their resume
+        results = [Counter() for _ in texts]
+        if not self.pattern or not texts: return [(0, {}) for _ in texts]
+        starts, pos = [], 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t or "") + 1
+        joined = "\0".join(t or "" for t in texts)
+        for m in self.pattern.finditer(joined):
+            results[bisect.bisect_right(starts, m.start()) - 1][self.aliases[m.group(0).lower()]] += 1
+        return [(sum(self.terms[s] for s in h), dict(h)) for h in results]
+
+    def to_dict(self):
+        return dict(self.terms)
+
+
+def profile_from_jd(jd_text):
+    """Skills the JD mentions, weighted by section: Must-haves > body text > Nice-to-haves."""
+    terms = {}
+    section_weight = DEFAULT_WEIGHT
+    for line in (jd_text or "").splitlines():
+        heading = line.strip().strip("#*: ").lower()
+        if heading.startswith(("must", "requirements", "required")): section_weight = MUST_WEIGHT
+        elif heading.startswith(("nice", "bonus", "preferred")): section_weight = NICE_WEIGHT
+        elif heading.startswith(("what we offer", "about", "how to apply")): section_weight = DEFAULT_WEIGHT
+        for m in _VOCAB_RE.finditer(line):
+            skill = _ALIASES[m.group(0).lower()]
+            terms[skill] = max(terms.get(skill, 0), section_weight)
+    return terms or dict(DEFAULT_TERMS)
+
+
+@lru_cache(maxsize=32)
+def _cached_profile(terms_json):
+    return ScoringProfile(json.loads(terms_json))
+
+
+def get_profile(terms=None):
+    # Compiled profiles are reused across calls/requests in this process
+    return _cached_profile(json.dumps(sorted((terms or DEFAULT_TERMS).items())))
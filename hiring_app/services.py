@@ -1,77 +1,129 @@
 import os
-import json
 import base64
 import re
 import uuid
-import io
-import email.utils
+import hashlib
+import time
 import requests
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from dateutil import tz
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 # Google Libraries
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from pypdf import PdfReader
-import google.generativeai as genai
+from googleapiclient.errors import HttpError
 from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import bulk, clients, dedupe, details, drive_download, metrics, outbox, pdf_text, ranking, resume_cache, scheduler, scoring
+from .batching import ApiBatch
+from .sheet_log import SheetWriter
+from .locks import campaign_lock, wait_until_released, LockHeld
+from .llm_eval import ResumeEvaluator
+from .models import Campaign, Candidate, ProcessedResponse, Outcome, OutboxMessage, ResumeCache
+
+from .clients import SCOPES
+
+# One resume as yielded by HiringAutomator._process_resumes
+# `error` is set (and text empty) when the resume could not be downloaded
+ParsedResume = namedtuple("ParsedResume", "file_id text score keyword_hits extract_meta error content_hash", defaults=(None, None))
+CANDIDATE_RESUME_FIELDS = ['file_id', 'content_hash', 'status', 'score', 'keyword_hits', 'text_preview', 'extract_meta',
+                           'llm_rating', 'llm_summary']
+
+JD_MODEL = "gemini-2.5-flash-lite"
+# Bump whenever JD_PROMPT changes: cached drafts are keyed on it
+JD_PROMPT_VERSION = 1
+JD_PROMPT = """Draft an inclusive, crisp Job Description for: {role_title}.
+Required Experience: {experience}.
+Include: About the role, Responsibilities, Must-haves, Nice-to-haves, What we offer, How to apply.
+Aim ~350–450 words. Bullets welcome."""
 
-SCOPES = [
-    "https://www.googleapis.com/auth/forms.body",
-    "https://www.googleapis.com/auth/forms.responses.readonly",
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/gmail.send",
-]
+RESPONSES_HEADER = ["Response ID", "Time", "Email", "AI Score", "Status", "Resume Link"]
+OUTCOMES_HEADER = ["Time", "Email", "Status"]
 
-class HiringAutomator:
-    def __init__(self, token_path='token.json', state_path='campaign_state.json'):
-        self.state_path = state_path
-        self.creds = None
-        
-        if os.path.exists(token_path):
-            self.creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-        else:
-            print(f"⚠️ Warning: {token_path} not found.")
+class StaleCampaign(Exception):
+    # Another writer committed to the campaign since we read it
+    pass
 
-        if self.creds:
-            self.forms = build("forms", "v1", credentials=self.creds, cache_discovery=False)
-            self.sheets = build("sheets", "v4", credentials=self.creds, cache_discovery=False)
-            self.drive = build("drive", "v3", credentials=self.creds, cache_discovery=False)
-            self.gmail = build("gmail", "v1", credentials=self.creds, cache_discovery=False)
-        
-        if hasattr(settings, 'GEMINI_API_KEY') and settings.GEMINI_API_KEY:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-
-    def load_state(self):
-        if os.path.exists(self.state_path):
-            try: return json.load(open(self.state_path))
-            except: return {}
-        return {}
-
-    def save_state(self, new_data):
-        state = self.load_state()
-        state.update(new_data)
-        with open(self.state_path, "w") as f:
-            json.dump(state, f, indent=2)
-        return state
+class GoogleService:
+    # Resolved from the process-wide registry on each access, so nothing is built until it is
+    # used and every thread (request or download worker) gets its own transport.
+    # Assigning the attribute on an instance overrides it, e.g. with a fake service.
+    def __init__(self, name, version):
+        self.name, self.version = name, version
+
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        return clients.service(self.name, self.version, obj.token_path)
+
+class HiringAutomator:
+    forms = GoogleService("forms", "v1")
+    sheets = GoogleService("sheets", "v4")
+    drive = GoogleService("drive", "v3")
+    gmail = GoogleService("gmail", "v1")
+
+    def __init__(self, token_path='token.json'):
+        self.token_path = token_path
+        clients.configure_gemini()
+
+    def get_campaign(self, campaign=None):
+        # Several campaigns can run side by side; without an explicit one, the newest active
+        if campaign is not None: return campaign
+        return Campaign.objects.filter(is_active=True).first()
+
+    def resume_dir(self, campaign):
+        # Each campaign downloads into its own directory under media/cv_pdfs
+        path = os.path.join(settings.MEDIA_ROOT, 'cv_pdfs', f"campaign_{campaign.pk}")
+        os.makedirs(path, exist_ok=True)
+        return path
 
     # --- STEP 1: JD GENERATION (Uses Experience + Lite Model) ---
     def generate_jd(self, role_title, experience):
-        prompt = f"""Draft an inclusive, crisp Job Description for: {role_title}.
-Required Experience: {experience}.
-Include: About the role, Responsibilities, Must-haves, Nice-to-haves, What we offer, How to apply.
-Aim ~350–450 words. Bullets welcome."""
+        cache_key = self._jd_cache_key(role_title, experience)
+        cached = caches['jd'].get(cache_key)
+        if cached: return cached
         
         try:
-            model = genai.GenerativeModel("gemini-2.5-flash-lite") 
-            resp = model.generate_content(prompt)
+            model = clients.gemini_model(JD_MODEL)
+            resp = model.generate_content(JD_PROMPT.format(role_title=role_title, experience=experience))
+            caches['jd'].set(cache_key, resp.text)
             return resp.text
         except Exception as e:
-            return f"# {role_title}\n\n(AI Failed. Write manually.\nExp: {experience})"
+            metrics.swallowed("gemini.jd", e)
+            return self._jd_fallback(role_title, experience)
+
+    def stream_jd(self, role_title, experience):
+        # Same as generate_jd, but yields text as Gemini produces it; a cached draft comes out whole
+        cache_key = self._jd_cache_key(role_title, experience)
+        cached = caches['jd'].get(cache_key)
+        if cached:
+            yield cached
+            return
+        parts = []
+        try:
+            model = clients.gemini_model(JD_MODEL)
+            for chunk in model.generate_content(JD_PROMPT.format(role_title=role_title, experience=experience), stream=True):
+                parts.append(chunk.text)
+                yield chunk.text
+        except Exception as e:
+            metrics.swallowed("gemini.jd", e)
+            # Nothing shown yet: send the usual fallback. Mid-stream: keep what arrived, don't cache it.
+            if not parts: yield self._jd_fallback(role_title, experience)
+            return
+        caches['jd'].set(cache_key, "".join(parts))
+
+    def _jd_cache_key(self, role_title, experience):
+        # Normalized so "Backend  Engineer" / "backend engineer" share a draft
+        norm = lambda s: " ".join((s or "").lower().split())
+        return "jd:" + hashlib.sha256(f"{norm(role_title)}|{norm(experience)}|{JD_PROMPT_VERSION}|{JD_MODEL}".encode()).hexdigest()
+
+    def _jd_fallback(self, role_title, experience):
+        return f"# {role_title}\n\n(AI Failed. Write manually.\nExp: {experience})"
 
     # --- NEW: LINKEDIN POSTING ---
     def post_to_linkedin(self, access_token, author_urn, role, jd_text, form_url):
@@ -87,7 +139,7 @@ Aim ~350–450 words. Bullets welcome."""
         try:
             resp = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=payload)
             if resp.status_code in (200, 201): return resp.json().get("id")
-        except: pass
+        except Exception as e: metrics.swallowed("linkedin.post", e)
         return None
 
     # --- STEP 2: CAMPAIGN CREATION (Clears old candidates) ---
@@ -123,162 +175,683 @@ Aim ~350–450 words. Bullets welcome."""
         if linkedin_token and linkedin_urn:
             linkedin_post_id = self.post_to_linkedin(linkedin_token, linkedin_urn, role_title, jd_text, form_url)
 
-        # SAVE STATE - IMPORTANT: Reset candidates list to [] so new campaign is clean
-        self.save_state({
-            "role": role_title, "form_id": form_id, "form_url": form_url,
-            "sheet_id": sheet_id, "sheet_url": sheet_url,
-            "drive_qid": drive_qid, "email_qid": email_qid,
-            "linkedin_post_id": linkedin_post_id,
-            "processed_ids": [],
-            "candidates": [] # <--- THIS LINE ENSURES ONLY NEW CANDIDATES SHOW
-        })
+        # SAVE STATE - a fresh Campaign row with its own form, sheet and candidates;
+        # campaigns already running stay active alongside it
+        campaign = Campaign.objects.create(
+            role=role_title, jd_text=jd_text, form_id=form_id, form_url=form_url or "",
+            scoring_profile=scoring.profile_from_jd(jd_text),
+            sheet_id=sheet_id, sheet_url=sheet_url,
+            drive_qid=drive_qid, email_qid=email_qid,
+            linkedin_post_id=linkedin_post_id,
+        )
+        # Without a watch the campaign still gets new responses, from the reconciliation sync
+        try: self.watch_form(campaign)
+        except Exception as e: metrics.swallowed("forms.watch", e)
         return form_url, sheet_url
 
+    def watch_form(self, campaign):
+        # Ask Forms to publish new responses to HIRING_FORMS_WATCH_TOPIC (a Pub/Sub topic whose
+        # push subscription points at /hooks/forms/); watches last 7 days, see push.reconcile
+        topic = getattr(settings, 'HIRING_FORMS_WATCH_TOPIC', '')
+        if not topic: return None
+        watches = self.forms.forms().watches()
+        if campaign.watch_id:
+            try: watch = watches.renew(formId=campaign.form_id, watchId=campaign.watch_id).execute()
+            except HttpError as e:
+                if e.resp.status != 404: raise
+                watch = None  # expired or deleted: make a new one
+        else:
+            watch = None
+        if watch is None:
+            watch = watches.create(formId=campaign.form_id, body={"watch": {
+                "target": {"topic": {"topicName": topic}}, "eventType": "RESPONSES"}}).execute()
+        campaign.watch_id = watch["id"]
+        campaign.watch_expires_at = datetime.fromisoformat(watch["expireTime"].replace("Z", "+00:00"))
+        campaign.save(update_fields=['watch_id', 'watch_expires_at'])
+        return campaign.watch_id
+
     # --- STEP 3: SYNC & PARSE ---
-    def sync_responses(self):
-        state = self.load_state()
-        if 'form_id' not in state: return {"error": "No active campaign"}
-        
-        sheet_id = state.get('sheet_id')
-        processed_ids = set(state.get('processed_ids', []))
+    # `progress`, where accepted, is called as progress(done, failed, total) after each step:
+    # `done` lists the keys (response ids / emails) finished in that step and `failed` those
+    # that failed. `skip` lets a resumed background job pass the keys it already finished;
+    # failed keys are never in it, so a resumed job tries them again.
 
-        responses = self.forms.forms().responses().list(formId=state['form_id']).execute().get('responses', [])
-        
-        # Load existing for this campaign, default to empty list
-        processed_candidates = state.get('candidates', []) 
-        new_rows = []
-        
-        download_dir = os.path.join(settings.MEDIA_ROOT, 'cv_pdfs')
-        os.makedirs(download_dir, exist_ok=True)
+    def sync_responses(self, download_workers=None, parse_workers=None, full_resync=False, progress=None, campaign=None):
+        campaign = self.get_campaign(campaign)
+        if not campaign: return {"error": "No active campaign"}
 
+        # One sync per campaign across all workers; a concurrent request waits for the
+        # running sync instead of repeating its Drive downloads and sheet appends.
+        try:
+            with campaign_lock(campaign, "sync", ttl=getattr(settings, 'HIRING_SYNC_LOCK_TTL', 900)):
+                campaign.refresh_from_db()
+                return self._sync_locked(campaign, download_workers, parse_workers, full_resync, progress)
+        except LockHeld:
+            wait_until_released(campaign, "sync", timeout=getattr(settings, 'HIRING_SYNC_WAIT', 120))
+            return {"coalesced": True}
+
+    def ingest_responses(self, response_ids, download_workers=None, parse_workers=None, progress=None, campaign=None):
+        # Push path (see push.py): fetch just the named responses and run them through the same
+        # dedupe/download/parse/score steps as a sync. The watermark is left alone, so a response
+        # a push never announced is still picked up by the next (reconciliation) sync.
+        campaign = self.get_campaign(campaign)
+        if not campaign: return {"error": "No active campaign"}
+        seen = set(ProcessedResponse.objects.filter(campaign=campaign, response_id__in=list(response_ids))
+                   .values_list('response_id', flat=True))
+        responses = []
+        for response_id in dict.fromkeys(response_ids):
+            if response_id in seen: continue
+            try:
+                with metrics.timer("forms.get"):
+                    responses.append(self.forms.forms().responses().get(
+                        formId=campaign.form_id, responseId=response_id).execute())
+            except HttpError as e:
+                if e.resp.status != 404: raise
+                metrics.count("forms.unknown_response")  # a stale or mistyped push
+        if not responses: return []
+
+        # Unlike a sync, these ids wouldn't be covered by the run we'd coalesce into: wait our turn
+        deadline = time.monotonic() + getattr(settings, 'HIRING_SYNC_WAIT', 120)
+        while True:
+            try:
+                with campaign_lock(campaign, "sync", ttl=getattr(settings, 'HIRING_SYNC_LOCK_TTL', 900)):
+                    campaign.refresh_from_db()
+                    return self._ingest_locked(campaign, responses, download_workers, parse_workers, progress, listed=False)
+            except LockHeld:
+                if time.monotonic() > deadline: raise
+                wait_until_released(campaign, "sync", timeout=max(0, deadline - time.monotonic()))
+
+    def _sync_locked(self, campaign, download_workers, parse_workers, full_resync, progress):
+        # Incremental: only ask Forms for responses submitted at/after the last one we saw.
+        # full_resync re-lists everything (ProcessedResponse still guards against duplicates).
+        watermark = None if full_resync else campaign.response_watermark
+        with metrics.timer("forms.list"):
+            responses = list(self._list_responses(campaign.form_id, since=watermark))
+        metrics.count("forms.responses", len(responses))
+        return self._ingest_locked(campaign, responses, download_workers, parse_workers, progress, listed=True)
+
+    def _ingest_locked(self, campaign, responses, download_workers, parse_workers, progress, listed):
+        # `listed`: responses is a full listing since the watermark (a sync), rather than pushed ones
+        download_workers = download_workers or getattr(settings, 'HIRING_DOWNLOAD_WORKERS', 8)
+        parse_workers = parse_workers or getattr(settings, 'HIRING_PARSE_WORKERS', os.cpu_count() or 1)
+
+        # Forms does not guarantee listing order; pin it so candidates/rows come out the same every run
+        responses.sort(key=lambda r: (r.get('createTime', ''), r['responseId']))
+        
+        # Only look up the ids in this batch, not every response the campaign has ever seen
+        processed_ids = set()
+        listed_ids = [r['responseId'] for r in responses]
+        for i in range(0, len(listed_ids), 500):
+            processed_ids.update(ProcessedResponse.objects.filter(
+                campaign=campaign, response_id__in=listed_ids[i:i + 500]
+            ).values_list('response_id', flat=True))
+
+        # Pass 1: read answers; each new response gets a slot so results can land in any order
+        slots = []
         for resp in responses:
             resp_id = resp['responseId']
             if resp_id in processed_ids: continue 
 
-            email = self._get_answer(resp, state.get('email_qid')) or resp.get('respondentEmail')
-            drive_link = self._get_answer(resp, state.get('drive_qid'))
-            create_time = resp.get('createTime')
-            
-            score = 0
-            text_preview = "No PDF"
-            status = "No Link"
-
-            if drive_link:
-                file_id = self._extract_file_id(drive_link)
-                if file_id:
-                    status = "Downloaded"
-                    local_path = os.path.join(download_dir, f"{file_id}.pdf")
-                    if not os.path.exists(local_path):
-                        self._download_file(file_id, local_path)
-                    
-                    text = self._extract_text(local_path)
-                    score = self._score_text(text)
-                    text_preview = text[:200]
-                    
-                    processed_candidates.append({
-                        "id": resp_id, "email": email, "file_id": file_id,
-                        "score": score, "text_preview": text_preview, "drive_link": drive_link
-                    })
-            
-            new_rows.append([resp_id, create_time, email, score, status, drive_link or ""])
+            drive_link = self._get_answer(resp, campaign.drive_qid)
+            slots.append({
+                "id": resp_id, "create_time": resp.get('createTime'), "drive_link": drive_link,
+                "email": (self._get_answer(resp, campaign.email_qid) or resp.get('respondentEmail') or "").strip(),
+                "file_id": self._extract_file_id(drive_link) if drive_link else None,
+                "candidate": None,
+            })
             processed_ids.add(resp_id)
 
-        if new_rows:
-            try:
-                self.sheets.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={
-                    "requests": [{"addSheet": {"properties": {"title": "Responses"}}}]
-                }).execute()
-                header = [["Response ID", "Time", "Email", "AI Score", "Status", "Resume Link"]]
-                self.sheets.spreadsheets().values().append(
-                    spreadsheetId=sheet_id, range="Responses!A1", valueInputOption="RAW", body={"values": header}
-                ).execute()
-            except: pass 
-
-            self.sheets.spreadsheets().values().append(
-                spreadsheetId=sheet_id, range="Responses!A1", valueInputOption="RAW", body={"values": new_rows}
-            ).execute()
-
-        state['processed_ids'] = list(processed_ids)
-        state['candidates'] = processed_candidates
-        self.save_state(state)
-        return processed_candidates
+        watermark = self._advance_watermark(responses, campaign.response_watermark) if listed else campaign.response_watermark
+
+        # One candidate per person: a repeat submission with a resume (same normalized email)
+        # supersedes the earlier one, in this batch or already stored. Superseded slots are
+        # never downloaded; their sheet row says "Duplicate".
+        for slot in slots: slot["email_key"] = dedupe.normalize_email(slot["email"])
+        latest = dedupe.supersede(slots, lambda slot: slot["file_id"] and slot["email_key"])
+        known = {}
+        existing = self._candidates_by(campaign, 'email_key', list(latest), known)
+
+        # Pass 2: downloads on threads, PDF parsing on processes, scoring as each parse finishes
+        by_file = {}
+        for slot in slots:
+            if slot["file_id"] and not slot.get("duplicate_of"): by_file.setdefault(slot["file_id"], []).append(slot)
+        # Resumes that failed to download on an earlier sync get another attempt alongside the new ones
+        # (on syncs only: a push carries one or two responses and shouldn't wait on old failures)
+        failed = {}
+        for cand in campaign.candidates.filter(status=Candidate.DOWNLOAD_FAILED).exclude(file_id="") if listed else ():
+            failed.setdefault(cand.file_id, []).append(known.setdefault(cand.pk, cand))
+
+        if progress: progress([s["id"] for s in slots if s["file_id"] not in by_file], [], len(slots))
+        profile = scoring.get_profile(campaign.scoring_profile)
+        changed = {}
+        resumes = {}
+        file_ids = list(by_file) + [fid for fid in failed if fid not in by_file]
+        for resume in self._process_resumes(campaign, file_ids, download_workers, parse_workers, profile):
+            resumes[resume.file_id] = resume
+            if not resume.error:
+                for cand in failed.get(resume.file_id, []):
+                    self._apply_resume(cand, resume)
+                    changed[cand.pk] = cand
+            if progress and resume.file_id in by_file:
+                progress([slot["id"] for slot in by_file[resume.file_id]], [], len(slots))
+
+        # Identical resume bytes under another address are the same person as well
+        live = [slot for slot in slots if slot["file_id"] in by_file and not slot.get("duplicate_of")]
+        for slot in live: slot["content_hash"] = resumes[slot["file_id"]].content_hash or ""
+        dedupe.supersede(live, lambda slot: slot["content_hash"])
+        same_resume = self._candidates_by(campaign, 'content_hash', [slot["content_hash"] for slot in live], known)
+
+        new_candidates = []
+        new_rows = []
+        for slot in slots:
+            resume = resumes.get(slot["file_id"]) if slot["file_id"] in by_file else None
+            if slot.get("duplicate_of"): status = "Duplicate"
+            elif not resume: status = "No Link"
+            else:
+                cand = existing.get(slot["email_key"])
+                if not cand:
+                    cand = same_resume.get(slot["content_hash"])
+                    # ...unless an earlier slot in this batch has already moved it to another resume
+                    if cand and cand.content_hash != slot["content_hash"]: cand = None
+                if cand:
+                    # Latest submission wins, but a failed download doesn't replace a good resume
+                    cand.email, cand.email_key, cand.submissions = slot["email"] or "", slot["email_key"], cand.submissions + 1
+                    if not resume.error:
+                        cand.drive_link, cand.submitted_at = slot["drive_link"], slot["create_time"] or ""
+                        self._apply_resume(cand, resume)
+                    changed[cand.pk] = cand
+                    status = "Resubmitted"
+                else:
+                    cand = Candidate(
+                        campaign=campaign, response_id=slot["id"], email=slot["email"] or "", email_key=slot["email_key"],
+                        drive_link=slot["drive_link"], submitted_at=slot["create_time"] or "")
+                    self._apply_resume(cand, resume)
+                    new_candidates.append(cand)
+                    status = cand.status
+                slot["candidate"] = cand
+            score = slot["candidate"].score if slot["candidate"] else 0
+            new_rows.append([slot["id"], slot["create_time"], slot["email"], score, status, slot["drive_link"] or ""])
+        parsed = [cand for cand in new_candidates + list(changed.values())
+                  if cand.file_id in resumes and not resumes[cand.file_id].error]
+        docs = [(cand.response_id, resumes[cand.file_id].text) for cand in parsed]
+
+        with metrics.timer("db.write"), transaction.atomic():
+            # Compare-and-swap on version: if our lock expired and another sync committed,
+            # roll back rather than write duplicates over its results.
+            updated = Campaign.objects.filter(pk=campaign.pk, version=campaign.version).update(
+                response_watermark=watermark, version=F('version') + 1,
+                **({'synced_at': timezone.now()} if listed else {}))
+            if not updated: raise StaleCampaign(f"campaign {campaign.pk} changed during sync")
+            Candidate.objects.bulk_create(new_candidates, batch_size=500)
+            Candidate.objects.bulk_update(list(changed.values()), CANDIDATE_RESUME_FIELDS + [
+                'email', 'email_key', 'submissions', 'drive_link', 'submitted_at'], batch_size=500)
+            details.save({cand.pk: {"text": resumes[cand.file_id].text} for cand in parsed})
+            # Each response's sheet row is queued with it and appended once this commits: a
+            # Sheets call (with its retries) must not hold SQLite's write lock
+            ProcessedResponse.objects.bulk_create(
+                [ProcessedResponse(campaign=campaign, response_id=slot["id"], sheet_row=row)
+                 for slot, row in zip(slots, new_rows)], batch_size=500)
+
+        try: self.flush_response_log(campaign)
+        except Exception as e: metrics.swallowed("sheets.response_log", e)  # retried by the next sync or reconcile
+        self._index_resumes(campaign, docs)
+        return new_candidates
+
+    def _candidates_by(self, campaign, field, values, known):
+        # {value: candidate} for one dedupe key; `known` (pk -> instance) keeps a candidate
+        # found by both keys a single object
+        found = {}
+        values = sorted({v for v in values if v})
+        for i in range(0, len(values), 500):
+            for cand in campaign.candidates.filter(**{f"{field}__in": values[i:i + 500]}).order_by('id'):
+                found[getattr(cand, field)] = known.setdefault(cand.pk, cand)
+        return found
+
+    def _apply_resume(self, cand, resume):
+        if cand.content_hash and resume.content_hash != cand.content_hash:
+            cand.llm_rating, cand.llm_summary = None, ""  # the review was of the old resume
+        cand.file_id, cand.content_hash = resume.file_id, resume.content_hash or ""
+        cand.status = Candidate.DOWNLOAD_FAILED if resume.error else Candidate.DOWNLOADED
+        cand.score, cand.keyword_hits = resume.score, resume.keyword_hits
+        cand.text_preview, cand.extract_meta = resume.text[:200], resume.extract_meta
+
+    def _index_resumes(self, campaign, docs):
+        # New resumes join the campaign's BM25 index. Adding documents shifts the idf weights
+        # for every candidate, so rather than rewriting them all per sync (or per pushed
+        # response) the campaign is flagged and refresh_relevance catches up in a job.
+        with metrics.timer("bm25"):
+            ranking.add_documents(campaign, docs)
+        if docs: Campaign.objects.filter(pk=campaign.pk).update(relevance_stale=True)
+
+    def refresh_relevance(self, campaign=None):
+        # Rewrites Candidate.relevance from the index; only rows whose (rounded) value moved
+        campaign = self.get_campaign(campaign)
+        if not campaign: return {"error": "No active campaign"}
+        # Cleared first, so resumes indexed while this runs flag the campaign again
+        Campaign.objects.filter(pk=campaign.pk).update(relevance_stale=False)
+        with metrics.timer("bm25"):
+            scores = ranking.relevance(campaign)
+        changed = []
+        for pk, response_id, old in campaign.candidates.values_list('pk', 'response_id', 'relevance').iterator(chunk_size=2000):
+            new = round(scores.get(response_id, 0.0), 2)
+            if new != old: changed.append(Candidate(pk=pk, relevance=new))
+        with metrics.timer("db.write"):
+            Candidate.objects.bulk_update(changed, ['relevance'], batch_size=500)
+        return {"updated": len(changed)}
+
+    def _process_resumes(self, campaign, file_ids, download_workers, parse_workers, profile):
+        # Yields a ParsedResume as each resume is ready. Unchanged Drive revisions come
+        # straight from the resume cache (rescored in one batch if the profile changed);
+        # the rest are downloaded on threads and parsed on processes within pdf_text's caps.
+        # Files with identical bytes (same Drive md5) are fetched and parsed once.
+        if not file_ids: return
+        download_dir = self.resume_dir(campaign)
+        metadata = self._fetch_drive_metadata(file_ids)
+        hits = resume_cache.lookup(campaign, {fid: metadata[fid] for fid in file_ids if fid in metadata})
+        metrics.count("resume_cache.hits", len(hits))
+        pdf_path = lambda fid: os.path.join(download_dir, f"{fid}.pdf")
+        md5_of = lambda fid: (metadata.get(fid) or {}).get('md5Checksum')
+
+        stale = [e for e in hits.values() if e.scorer_key != profile.key]
+        # Text cut short once the old profile's skills were all seen may miss the new ones: re-parse it
+        for entry in stale:
+            if (entry.extract_meta or {}).get('truncated') == pdf_text.SKILLS_FOUND: del hits[entry.file_id]
+        stale = [e for e in stale if e.file_id in hits]
+        rescored = []
+        for entry, (score, kw) in zip(stale, profile.score_many([e.text for e in stale])):
+            entry.score, entry.keyword_hits = score, kw
+            rescored.append((entry.file_id, metadata[entry.file_id], entry.text, score, kw, profile.key,
+                             pdf_path(entry.file_id), entry.extract_meta))
+        resume_cache.store(campaign, rescored)
+
+        # twins: primary file id -> other ids with the same bytes, answered from its result
+        primary = {md5_of(fid): fid for fid in hits if md5_of(fid)}
+        twins, misses = {}, []
+        for fid in file_ids:
+            if fid in hits: continue
+            md5 = md5_of(fid)
+            if md5 and md5 in primary: twins.setdefault(primary[md5], []).append(fid)
+            else:
+                if md5: primary[md5] = fid
+                misses.append(fid)
+        metrics.count("drive.twins", sum(len(t) for t in twins.values()))
+        def fan_out(resume):
+            yield resume
+            for twin in twins.get(resume.file_id, []): yield resume._replace(file_id=twin)
+
+        for file_id, entry in hits.items():
+            yield from fan_out(ParsedResume(file_id, entry.text, entry.score, entry.keyword_hits,
+                                            entry.extract_meta or {}, content_hash=md5_of(file_id)))
+
+        fresh = []
+        limits = pdf_text.limits()
+        if misses:
+            with ThreadPoolExecutor(max_workers=download_workers) as dl_pool, \
+                 pdf_text.process_pool(parse_workers) as parse_pool:
+                pending = {}
+                for file_id in misses:
+                    fut = dl_pool.submit(metrics.bind(self._fetch_resume), file_id, pdf_path(file_id), metadata.get(file_id))
+                    pending[fut] = ("download", file_id)
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        stage, file_id = pending.pop(fut)
+                        if stage == "download":
+                            try: path = fut.result()
+                            except (drive_download.DownloadFailed, OSError) as e:
+                                metrics.count("drive.download_failed")
+                                yield from fan_out(ParsedResume(
+                                    file_id, "", 0, {}, {"download_error": str(e)}, str(e), md5_of(file_id)))
+                                continue
+                            pending[parse_pool.submit(
+                                pdf_text.extract_text, path, terms=profile.terms, **limits)] = ("parse", file_id)
+                            continue
+                        text, extract_meta = fut.result()
+                        # Timed inside the parse process; only the total comes back
+                        metrics.observe("pdf.parse", extract_meta.pop("seconds", 0.0))
+                        metrics.count("pdf.pages", extract_meta["pages_read"])
+                        if extract_meta["truncated"]: metrics.count(f"pdf.truncated.{extract_meta['truncated']}")
+                        with metrics.timer("score"):
+                            score, kw = profile.score(text)
+                        path = pdf_path(file_id)
+                        content_hash = md5_of(file_id) or (resume_cache.file_md5(path) if os.path.exists(path) else None)
+                        for resume in fan_out(ParsedResume(file_id, text, score, kw, extract_meta, None, content_hash)):
+                            fresh.append((resume.file_id, metadata.get(resume.file_id), text, score, kw, profile.key,
+                                          pdf_path(resume.file_id), extract_meta))
+                            yield resume
+
+        resume_cache.store(campaign, fresh)
+        resume_cache.evict()
+
+    def _fetch_drive_metadata(self, file_ids):
+        # One batched round trip per 100 files (Drive's batch limit) instead of a files.get each.
+        # Files without metadata simply miss the cache; the download path still runs for them.
+        batch = ApiBatch(self.drive, limit=100)
+        for file_id in file_ids:
+            batch.add(file_id, self.drive.files().get(fileId=file_id, fields=resume_cache.DRIVE_META_FIELDS))
+        with metrics.timer("drive.metadata"):
+            results = batch.execute()
+        metrics.count("drive.metadata_failed", sum(error is not None for _, error in results.values()))
+        return {fid: resp for fid, (resp, error) in results.items() if error is None}
+
+    def rescore_candidates(self, download_workers=None, parse_workers=None, campaign=None):
+        # Re-checks every resume in the campaign against Drive: replaced files are
+        # re-downloaded and re-parsed, unchanged ones are rescored from cached text
+        # (e.g. after editing Campaign.scoring_profile). Holds the sync lock, since both
+        # write candidate scores; a running sync is waited for, not skipped.
+        campaign = self.get_campaign(campaign)
+        if not campaign: return {"error": "No active campaign"}
+
+        def locked():
+            with campaign_lock(campaign, "sync", ttl=getattr(settings, 'HIRING_SYNC_LOCK_TTL', 900)):
+                campaign.refresh_from_db()
+                return self._rescore_locked(campaign, download_workers, parse_workers)
+        try:
+            return locked()
+        except LockHeld:
+            wait_until_released(campaign, "sync", timeout=getattr(settings, 'HIRING_SYNC_WAIT', 120))
+            return locked()  # still held: LockHeld fails the job, which is retried later
+
+    def _rescore_locked(self, campaign, download_workers, parse_workers):
+        by_file = {}
+        for cand in campaign.candidates.exclude(file_id="").only(
+                'id', 'campaign', 'response_id', 'file_id', 'content_hash', 'status', 'llm_rating', 'llm_summary'):
+            by_file.setdefault(cand.file_id, []).append(cand)
+        changed, texts, failed = [], {}, 0
+        for resume in self._process_resumes(
+                campaign, list(by_file),
+                download_workers or getattr(settings, 'HIRING_DOWNLOAD_WORKERS', 8),
+                parse_workers or getattr(settings, 'HIRING_PARSE_WORKERS', os.cpu_count() or 1),
+                scoring.get_profile(campaign.scoring_profile)):
+            if resume.error:
+                # Keep the last good score; only candidates that never had one are marked failed
+                failed += sum(c.status == Candidate.DOWNLOAD_FAILED for c in by_file[resume.file_id])
+                continue
+            for cand in by_file[resume.file_id]:
+                self._apply_resume(cand, resume)
+                changed.append(cand)
+                texts[cand.pk] = resume.text
+
+        with metrics.timer("db.write"), transaction.atomic():
+            # Same compare-and-swap as sync: if our lock lapsed and another writer committed, theirs stands
+            updated = Campaign.objects.filter(pk=campaign.pk, version=campaign.version).update(version=F('version') + 1)
+            if not updated: raise StaleCampaign(f"campaign {campaign.pk} changed during rescore")
+            Candidate.objects.bulk_update(changed, CANDIDATE_RESUME_FIELDS, batch_size=500)
+            details.save({pk: {"text": text} for pk, text in texts.items()})
+        self._index_resumes(campaign, [(cand.response_id, texts[cand.pk]) for cand in changed])
+        return {"updated": len(changed), "failed": failed}
+
+    # --- Bulk import: historical candidates from a file (see bulk.py), scored offline ---
+    def import_candidates(self, rows, parse_workers=None, campaign=None):
+        # rows are dicts with an email and a resume as `text` or a local PDF `resume_path`
+        # (response_id, submitted_at and drive_link are kept if present). Nothing is sent to
+        # Forms, Drive or Sheets; an address the campaign already has is skipped.
+        campaign = self.get_campaign(campaign)
+        if not campaign: return {"error": "No active campaign"}
+        try:
+            with campaign_lock(campaign, "sync", ttl=getattr(settings, 'HIRING_SYNC_LOCK_TTL', 900)):
+                return self._import_locked(
+                    campaign, rows, parse_workers or getattr(settings, 'HIRING_PARSE_WORKERS', os.cpu_count() or 1))
+        except LockHeld:
+            return {"error": "A sync is running for this campaign; import again once it finishes"}
+
+    def _import_locked(self, campaign, rows, parse_workers):
+        profile = scoring.get_profile(campaign.scoring_profile)
+        limits = pdf_text.limits()
+        known = list(campaign.candidates.values_list('email_key', 'response_id'))
+        emails, response_ids = {k for k, _ in known}, {r for _, r in known}
+        counts = {"imported": 0, "skipped": 0, "no_resume": 0}
+        docs = []
+        with pdf_text.process_pool(parse_workers) as pool:
+            for chunk in bulk.chunked(rows, 500):
+                batch = []
+                for row in chunk:
+                    email = (row.get('email') or "").strip()
+                    key = dedupe.normalize_email(email)
+                    response_id = str(row.get('response_id') or f"import:{key}")
+                    if not key or key in emails or response_id in response_ids:
+                        counts["skipped"] += 1
+                        continue
+                    emails.add(key)
+                    response_ids.add(response_id)
+                    batch.append((row, email, key, response_id))
+                # PDFs are parsed on processes within the same caps as synced resumes
+                parsing = [pool.submit(pdf_text.extract_text, row['resume_path'], terms=profile.terms, **limits)
+                           if row.get('resume_path') and not row.get('text') else None for row, *_ in batch]
+                parsed = [fut.result() if fut else (row.get('text') or "", {}) for fut, (row, *_) in zip(parsing, batch)]
+                with metrics.timer("score"):
+                    scores = profile.score_many([text for text, _ in parsed])
+
+                cands = []
+                for (row, email, key, response_id), (text, meta), (score, kw) in zip(batch, parsed, scores):
+                    meta.pop("seconds", None)
+                    drive_link = row.get('drive_link') or ""
+                    if not text:
+                        # A Drive link is fetched by the next sync's retry of failed downloads
+                        counts["no_resume"] += 1
+                        meta["download_error"] = "no resume text in the import"
+                    cands.append(Candidate(
+                        campaign=campaign, response_id=response_id, email=email, email_key=key,
+                        file_id=(self._extract_file_id(drive_link) if drive_link else None) or "",
+                        drive_link=drive_link, submitted_at=str(row.get('submitted_at') or ""),
+                        status=Candidate.DOWNLOADED if text else Candidate.DOWNLOAD_FAILED,
+                        score=score, keyword_hits=kw, text_preview=text[:200], extract_meta=meta))
+                with metrics.timer("db.write"), transaction.atomic():
+                    Candidate.objects.bulk_create(cands, batch_size=500)
+                    details.save({c.pk: {"text": text} for c, (text, _) in zip(cands, parsed) if text})
+                docs.extend((c.response_id, text) for c, (text, _) in zip(cands, parsed) if text)
+                counts["imported"] += len(cands)
+        self._index_resumes(campaign, docs)
+        return counts
+
+    # --- STEP 3b: AI REVIEW (Gemini grades resumes against the JD) ---
+    def evaluate_candidates(self, force=False, skip=(), progress=None, campaign=None):
+        campaign = self.get_campaign(campaign)
+        if not campaign: return {"error": "No active campaign"}
+        cands = campaign.candidates.exclude(file_id="").only('id', 'campaign', 'response_id', 'file_id', 'text_preview')
+        if not force: cands = cands.filter(llm_rating__isnull=True)
+        cands = [c for c in cands if c.response_id not in skip]
+        # Full text lives in the resume cache and the candidate details; the preview is the last resort
+        texts = dict(ResumeCache.objects.filter(campaign=campaign, file_id__in={c.file_id for c in cands}).values_list('file_id', 'text'))
+        stored = details.load(c.pk for c in cands if c.file_id not in texts)
+        for c in cands:
+            if c.pk in stored: texts.setdefault(c.file_id, stored[c.pk].get("text", ""))
+        by_response = {c.response_id: c for c in cands}
+
+        def on_batch(keys, failed):
+            if progress: progress(keys, failed, len(cands))
+
+        verdicts = ResumeEvaluator().evaluate(
+            [(c.response_id, texts.get(c.file_id) or c.text_preview) for c in cands],
+            campaign.jd_text or campaign.role, on_batch=on_batch)
+        reviewed = []
+        for rid, verdict in verdicts.items():
+            if "error" in verdict: continue
+            cand = by_response[rid]
+            cand.llm_rating, cand.llm_summary = verdict["rating"], verdict["summary"]
+            reviewed.append(cand)
+        Candidate.objects.bulk_update(reviewed, ['llm_rating', 'llm_summary'], batch_size=500)
+        return {"reviewed": len(reviewed), "failed": len(verdicts) - len(reviewed)}
+
+    def _list_responses(self, form_id, since=None, page_size=5000):
+        # Pages through responses; `since` is an RFC3339 lastSubmittedTime watermark
+        kwargs = {"formId": form_id, "pageSize": page_size}
+        if since: kwargs["filter"] = f"timestamp >= {since}"
+        while True:
+            page = self.forms.forms().responses().list(**kwargs).execute()
+            yield from page.get('responses', [])
+            token = page.get('nextPageToken')
+            if not token: return
+            kwargs["pageToken"] = token
+
+    def _advance_watermark(self, responses, watermark):
+        # The filter is inclusive (>=) so a response submitted in the same instant as the
+        # watermark is never lost; processed_ids drops the ones we already have.
+        # Compare parsed values: fractional seconds vary in length, so strings don't sort
+        parse = lambda t: datetime.fromisoformat(t.replace("Z", "+00:00"))
+        for resp in responses:
+            ts = resp.get('lastSubmittedTime') or resp.get('createTime')
+            if ts and (not watermark or parse(ts) > parse(watermark)): watermark = ts
+        return watermark
 
     # --- STEP 4 & 5 (Invites & Outcomes) ---
-    def send_invites(self, candidate_emails, organizer_name, interview_date):
-        state = self.load_state()
-        role = state.get('role', 'Role')
+    def send_invites(self, candidate_emails, organizer_name, interview_date, skip=(), progress=None, campaign=None,
+                     slot_minutes=None, buffer_minutes=None, hours=None):
+        # interview_date is the earliest slot; see scheduler.py for how the rest are placed
+        campaign = self.get_campaign(campaign)
+        if not campaign: return []
+        role = campaign.role
         results = []
         try: dt_start = datetime.strptime(interview_date, "%Y-%m-%dT%H:%M")
         except ValueError: dt_start = datetime.strptime(interview_date, "%Y-%m-%dT%H:%M:%S")
+        dt_start = dt_start.replace(tzinfo=scheduler.local_tz())
+        opts = scheduler.options(slot_minutes, buffer_minutes, hours)
 
         sender_email = "recruiter@example.com"
         try:
             profile = self.gmail.users().getProfile(userId='me').execute()
             sender_email = profile.get('emailAddress', sender_email)
-        except: pass
-
-        for i, email_addr in enumerate(candidate_emails):
-            slot_time = dt_start + timedelta(minutes=i*45)
-            ics_content = self._make_ics(organizer_name, sender_email, "Candidate", email_addr, role, slot_time)
-            subject = f"Interview Invitation: {role}"
-            body = f"Hi,\n\nWe are impressed by your profile. Please find the interview invite attached for {slot_time}."
-            try:
-                self._send_email_with_ics(email_addr, subject, body, ics_content)
-                results.append(f"Sent to {email_addr}")
-            except Exception as e:
-                results.append(f"Failed {email_addr}: {e}")
+        except Exception as e: metrics.swallowed("gmail.profile", e)
+
+        # Repeats of an address in the selection are dropped; the rest are booked best score first
+        by_key = {}
+        for email_addr in candidate_emails: by_key.setdefault(dedupe.normalize_email(email_addr), email_addr)
+        candidate_emails = list(by_key.values())
+        cands = {c.email_key: c for c in campaign.candidates.filter(email_key__in=list(by_key))}
+        order = {key: i for i, key in enumerate(by_key)}
+        ranked = sorted(by_key, key=lambda k: (-(cands[k].score if k in cands else -1), order[k]))
+
+        # At most one invite per person per campaign: already-delivered ones are only reported (and
+        # don't take a slot)
+        sent_keys = {outbox.idempotency_key(campaign, OutboxMessage.INVITE, by_key[k]): k for k in ranked}
+        already = {sent_keys[key] for key in OutboxMessage.objects.filter(
+            idempotency_key__in=list(sent_keys), status=OutboxMessage.SENT).values_list('idempotency_key', flat=True)}
+        results.extend(f"Skipped {by_key[k]}: already invited" for k in ranked if k in already)
+        if progress: progress([by_key[k] for k in already], [], len(candidate_emails))
+
+        wanted = [(k, cands.get(k)) for k in ranked if k not in already and by_key[k] not in skip]
+        with metrics.timer("schedule"):
+            slots = scheduler.book(campaign, wanted, dt_start, **opts)
+
+        def render(email_addr, slot):
+            # Only runs for messages the outbox has to (re)render, i.e. on the final assignment
+            def fields(key):
+                start = slot.start.astimezone(dt_start.tzinfo)
+                ics_content = self._make_ics(organizer_name, sender_email, "Candidate", email_addr, role, start,
+                                             minutes=opts["minutes"])
+                subject = f"Interview Invitation: {role}"
+                body = f"Hi,\n\nWe are impressed by your profile. Please find the interview invite attached for {start:%a %d %b %Y, %H:%M}."
+                return {"subject": subject, "ics": ics_content, "raw": self._render_email(key, email_addr, subject, body, ics_content)}
+            return fields
+
+        entries = []
+        for key, cand in wanted:
+            email_addr = by_key[key]
+            slot = slots.get(key)
+            if slot is None:
+                results.append(f"Not scheduled {email_addr}: no free slot in the next {opts['days']} days")
+                if progress: progress([], [email_addr], len(candidate_emails))
+                continue
+            entries.append((email_addr, cand, slot.start.isoformat(), render(email_addr, slot)))
+        messages = outbox.queue(campaign, OutboxMessage.INVITE, entries)
+
+        def on_result(msg, error):
+            if not error and msg.candidate_id:
+                Candidate.objects.filter(pk=msg.candidate_id).update(invited_at=msg.sent_at)
+            results.append(f"Failed {msg.email}: {error}" if error else f"Sent to {msg.email}")
+            if progress: progress([] if error else [msg.email], [msg.email] if error else [], len(candidate_emails))
+        outbox.dispatch(messages, self._send_message, on_result=on_result)
         return results
 
-    def send_outcomes(self, hired_emails):
-        state = self.load_state()
-        role = state.get('role', 'Role')
-        all_candidates = state.get('candidates', [])
-        results = []
-        
-        sender_email = "recruiter@example.com"
+    def send_outcomes(self, hired_emails, skip=(), progress=None, campaign=None):
+        campaign = self.get_campaign(campaign)
+        if not campaign: return []
+        # A second click/worker must not start a parallel round of offers and rejections
         try:
-            profile = self.gmail.users().getProfile(userId='me').execute()
-            sender_email = profile.get('emailAddress', sender_email)
-        except: pass
+            with campaign_lock(campaign, "outcomes"):
+                return self._send_outcomes_locked(campaign, hired_emails, skip, progress)
+        except LockHeld:
+            return ["SKIPPED: outcomes are already being sent for this campaign"]
+
+    def _send_outcomes_locked(self, campaign, hired_emails, skip, progress):
+        role = campaign.role
+        all_candidates = campaign.candidates.only('id', 'campaign', 'email', 'email_key').iterator()
+        results = []
 
-        for cand in all_candidates:
-            email_addr = cand.get('email')
-            if not email_addr: continue
-            
-            if email_addr in hired_emails:
-                subject = f"Offer: {role}"
-                body = f"Hi,\n\nCongratulations! We are thrilled to offer you the {role} position.\n\nWelcome aboard!"
-                status = "OFFER_SENT"
-            else:
-                subject = f"Update on your application for {role}"
-                body = f"Hi,\n\nThank you for your application. We have decided to move forward with other candidates."
-                status = "REJECTED"
+        hired = {dedupe.normalize_email(e) for e in hired_emails}
+        offer_subject, offer_body = f"Offer: {role}", f"Hi,\n\nCongratulations! We are thrilled to offer you the {role} position.\n\nWelcome aboard!"
+        reject_subject = f"Update on your application for {role}"
+        reject_body = f"Hi,\n\nThank you for your application. We have decided to move forward with other candidates."
 
-            try:
-                self._send_plain_email(email_addr, subject, body)
-                results.append(f"{status}: {email_addr}")
+        def render(email_addr, status):
+            def fields(key):
+                subject, body = (offer_subject, offer_body) if status == Outcome.OFFER_SENT else (reject_subject, reject_body)
+                return {"subject": subject, "decision": status, "raw": self._render_email(key, email_addr, subject, body)}
+            return fields
+
+        seen = set()
+        entries = []
+        for cand in all_candidates:
+            email_addr = cand.email
+            if not email_addr or email_addr in skip: continue
+            key = cand.email_key or dedupe.normalize_email(email_addr)
+            if key in seen: continue  # legacy duplicate candidates share one email
+            seen.add(key)
+            status = Outcome.OFFER_SENT if key in hired else Outcome.REJECTED
+            entries.append((email_addr, cand, status, render(email_addr, status)))
+        messages = outbox.queue(campaign, OutboxMessage.OUTCOME, entries)
+
+        # At most one outcome email per person per campaign. Delivered messages get their
+        # Outcome row in the same transaction as the outbox update; the sheet log is flushed
+        # once at the end, even if something above fails part-way.
+        already = [m for m in messages if m.status == OutboxMessage.SENT]
+        if already: results.append(f"SKIPPED: {len(already)} candidates whose address already received an outcome")
+        if progress: progress([m.email for m in already], [], len(messages) + len(skip))
+
+        def on_result(msg, error):
+            results.append(f"FAILED: {msg.email} - {error}" if error else f"{msg.decision}: {msg.email}")
+            if not error:
+                Outcome.objects.create(campaign=campaign, candidate_id=msg.candidate_id, email=msg.email, status=msg.decision)
+            if progress: progress([] if error else [msg.email], [msg.email] if error else [], len(messages) + len(skip))
+        try:
+            outbox.dispatch(messages, self._send_message, on_result=on_result)
+        finally:
+            try: self.flush_outcome_log(campaign)
             except Exception as e:
-                results.append(f"FAILED: {email_addr} - {e}")
-            
-            self._log_outcome_to_sheet(state.get('sheet_id'), email_addr, status)
+                metrics.swallowed("sheets.outcome_log", e)
+                results.append(f"SHEET LOG PENDING: {e}")
         return results
 
-    # --- HELPERS ---
-    def _send_plain_email(self, to_email, subject, body):
-        msg = MIMEMultipart()
-        msg["To"] = to_email
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain", "utf-8"))
-        raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
-        self.gmail.users().messages().send(userId="me", body={"raw": raw}).execute()
+    def flush_outcome_log(self, campaign):
+        # Appends every not-yet-logged outcome (including leftovers from a failed earlier flush)
+        with campaign_lock(campaign, "sheet_log", ttl=300):
+            pending = list(campaign.outcomes.filter(logged_to_sheet=False).order_by('id').values_list('id', 'created_at', 'email', 'status'))
+            if not pending: return 0
+            rows = [[created.astimezone(tz.tzlocal()).strftime("%Y-%m-%d %H:%M:%S"), email, status] for _, created, email, status in pending]
+            SheetWriter(self.sheets, campaign).append("Outcomes", OUTCOMES_HEADER, rows)
+            self._mark_logged(Outcome, [pk for pk, *_ in pending])
+        return len(pending)
+
+    def flush_response_log(self, campaign):
+        # Appends the "Responses" rows that syncs have committed but not yet logged. The lock
+        # keeps a sync and reconcile from appending the same rows twice.
+        with campaign_lock(campaign, "sheet_log", ttl=300):
+            pending = list(campaign.processed_responses.filter(logged_to_sheet=False).order_by('id').values_list('id', 'sheet_row'))
+            if not pending: return 0
+            SheetWriter(self.sheets, campaign).append("Responses", RESPONSES_HEADER, [row for _, row in pending if row])
+            self._mark_logged(ProcessedResponse, [pk for pk, _ in pending])
+        return len(pending)
+
+    def _mark_logged(self, model, pks):
+        for i in range(0, len(pks), 500):
+            model.objects.filter(pk__in=pks[i:i + 500]).update(logged_to_sheet=True)
 
-    def _log_outcome_to_sheet(self, sheet_id, email, status):
-        try:
-            try: self.sheets.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={"requests": [{"addSheet": {"properties": {"title": "Outcomes"}}}]}).execute()
-            except: pass
-            row = [[datetime.now().strftime("%Y-%m-%d %H:%M:%S"), email, status]]
-            self.sheets.spreadsheets().values().append(spreadsheetId=sheet_id, range="Outcomes!A1", valueInputOption="RAW", body={"values": row}).execute()
-        except: pass
+    # --- HELPERS ---
+    def _send_message(self, msg):
+        # Runs on an outbox sender thread, which gets its own Gmail transport
+        with metrics.timer("gmail.send"):
+            return self.gmail.users().messages().send(userId="me", body={"raw": msg.raw}).execute()
 
     def _q_text(self, title, idx, paragraph=False, required=True, desc=None):
         item = {"title": title, "questionItem": {"question": {"required": required, "textQuestion": {"paragraph": paragraph}}}}
@@ -307,29 +880,24 @@ Aim ~350–450 words. Bullets welcome."""
             from urllib.parse import urlparse, parse_qs
             qs = parse_qs(urlparse(url).query)
             if "id" in qs: return qs["id"][0]
-        except: pass
+        except Exception as e: metrics.swallowed("drive.link", e)
         return None 
 
-    def _download_file(self, file_id, path):
-        try:
-            req = self.drive.files().get_media(fileId=file_id)
-            with io.FileIO(path, "wb") as fh:
-                downloader = MediaIoBaseDownload(fh, req)
-                done = False
-                while not done: status, done = downloader.next_chunk()
-        except: pass
-
-    def _extract_text(self, path):
-        try: return "\n".join([p.extract_text() for p in PdfReader(path).pages])
-        except: return ""
-
-    def _score_text(self, text):
-        keywords = ["python", "django", "api", "sql", "rest", "docker", "java", "node", "aws"]
-        return sum(1 for k in keywords if k in text.lower())
-
-    def _make_ics(self, org_name, sender_email, cand_name, cand_email, role, start_dt):
+    def _fetch_resume(self, file_id, path, meta=None):
+        # Runs on a download worker; returns the path for the parse stage.
+        # A local copy is only trusted if it still matches Drive's size/checksum.
+        if not os.path.exists(path) or drive_download.verify(path, meta or {}):
+            with metrics.timer("drive.download"):
+                self._download_file(file_id, path, meta)
+        return path
+
+    def _download_file(self, file_id, path, meta=None):
+        # Resumable and verified; raises drive_download.DownloadFailed
+        return drive_download.download(self.drive, file_id, path, meta)
+
+    def _make_ics(self, org_name, sender_email, cand_name, cand_email, role, start_dt, minutes=45):
         uid = f"{uuid.uuid4().hex}@hiring-agent"
-        end_dt = start_dt + timedelta(minutes=45)
+        end_dt = start_dt + timedelta(minutes=minutes)
         fmt = lambda d: d.astimezone(tz.UTC).strftime("%Y%m%dT%H%M%SZ")
         return f"""BEGIN:VCALENDAR
 PRODID:-//HiringAgent//EN
@@ -347,14 +915,17 @@ DESCRIPTION:Interview for {role}
 END:VEVENT
 END:VCALENDAR"""
 
-    def _send_email_with_ics(self, to_email, subject, body, ics_text):
-        msg = MIMEMultipart("mixed") 
+    def _render_email(self, key, to_email, subject, body, ics_text=None):
+        # -> base64url MIME as stored in the outbox. The Message-ID is derived from the
+        # idempotency key, so mail clients fold a repeated delivery into one message.
+        msg = MIMEMultipart("mixed")
         msg["To"] = to_email
         msg["Subject"] = subject
+        msg["Message-ID"] = f"<{hashlib.sha1(key.encode()).hexdigest()}@hiring-agent>"
         msg.attach(MIMEText(body, "plain", "utf-8"))
-        ics_part = MIMEText(ics_text, "calendar", "utf-8")
-        ics_part.add_header("Content-Class", "urn:content-classes:calendarmessage")
-        ics_part.add_header("Content-Type", "text/calendar; method=REQUEST")
-        msg.attach(ics_part)
-        raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
-        self.gmail.users().messages().send(userId="me", body={"raw": raw}).execute()
\ No newline at end of file
+        if ics_text:
+            ics_part = MIMEText(ics_text, "calendar", "utf-8")
+            ics_part.add_header("Content-Class", "urn:content-classes:calendarmessage")
+            ics_part.add_header("Content-Type", "text/calendar; method=REQUEST")
+            msg.attach(ics_part)
+        return base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
\ No newline at end of file
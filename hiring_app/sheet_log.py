@@ -0,0 +1,41 @@
+from . import metrics
+
+
+class SheetWriter:
+    """Appends rows to named tabs of a campaign's spreadsheet.
+
+    Each tab is created (with its header) at most once per campaign; the titles are
+    remembered in Campaign.sheet_tabs so later runs skip the addSheet round trip.
+    Rows go out in chunks, one values.append per chunk.
+    """
+
+    def __init__(self, sheets, campaign, chunk_size=1000):
+        self.sheets = sheets
+        self.campaign = campaign
+        self.chunk_size = chunk_size
+
+    def ensure_tab(self, title, header):
+        if title in self.campaign.sheet_tabs: return
+        meta = self.sheets.spreadsheets().get(
+            spreadsheetId=self.campaign.sheet_id, fields="sheets.properties.title").execute()
+        existing = {s["properties"]["title"] for s in meta.get("sheets", [])}
+        if title not in existing:
+            self.sheets.spreadsheets().batchUpdate(spreadsheetId=self.campaign.sheet_id, body={
+                "requests": [{"addSheet": {"properties": {"title": title}}}]
+            }).execute()
+            self._append(title, [header])
+        self.campaign.sheet_tabs = sorted(set(self.campaign.sheet_tabs) | {title})
+        self.campaign.save(update_fields=['sheet_tabs'])
+
+    def append(self, title, header, rows):
+        if not rows: return
+        self.ensure_tab(title, header)
+        for i in range(0, len(rows), self.chunk_size):
+            self._append(title, rows[i:i + self.chunk_size])
+
+    def _append(self, title, rows):
+        metrics.count("sheets.rows", len(rows))
+        with metrics.timer("sheets.append"):
+            self.sheets.spreadsheets().values().append(
+                spreadsheetId=self.campaign.sheet_id, range=f"{title}!A1", valueInputOption="RAW", body={"values": rows}
+            ).execute()
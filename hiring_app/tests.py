@@ -1,3 +1,566 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+import httplib2
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+from pypdf import PageObject
+
+from . import bulk, dedupe, drive_download, fakes, jobs, locks, outbox, pdf_text, push, scheduler, scoring
+from .models import Campaign, CampaignLock, Candidate, InterviewSlot, Job, OutboxMessage
+from .services import RESPONSES_HEADER, HiringAutomator
+
+
+def make_campaign(**kwargs):
+    fields = dict(role="Backend Engineer", form_id="form", sheet_id="sheet", email_qid="email", drive_qid="resume")
+    return Campaign.objects.create(**dict(fields, **kwargs))
+
+
+@override_settings(HIRING_GMAIL_SENDS_PER_SEC=1000, HIRING_OUTBOX_RETRIES=0)
+class OutboxDispatchTests(TransactionTestCase):
+    # Senders run on pool threads, which only see committed rows
+    def setUp(self):
+        outbox.reset()
+        self.campaign = make_campaign()
+        self.sent = []
+
+    def tearDown(self):
+        outbox.reset()
+
+    def make_messages(self, n, **fields):
+        return [OutboxMessage.objects.create(
+            campaign=self.campaign, kind=OutboxMessage.INVITE, email=f"p{i}@example.com",
+            idempotency_key=outbox.idempotency_key(self.campaign, OutboxMessage.INVITE, f"p{i}@example.com"),
+            subject="Interview", raw=f"raw-{i}", **fields) for i in range(n)]
+
+    def send(self, msg):
+        self.sent.append(msg.email)
+        return {"id": f"gmail-{msg.pk}"}
+
+    def test_sends_each_message_once(self):
+        messages = self.make_messages(3)
+        results = outbox.dispatch(messages, self.send)
+        self.assertEqual(results, {m.pk: None for m in messages})
+        outbox.dispatch(OutboxMessage.objects.all(), self.send)
+        self.assertEqual(sorted(self.sent), ["p0@example.com", "p1@example.com", "p2@example.com"])
+        self.assertEqual(set(OutboxMessage.objects.values_list('status', flat=True)), {OutboxMessage.SENT})
+
+    def test_leaves_live_claims_alone_and_takes_over_lapsed_ones(self):
+        now = timezone.now()
+        live, lapsed = self.make_messages(2, status=OutboxMessage.SENDING, claim_token="other")
+        OutboxMessage.objects.filter(pk=live.pk).update(claimed_at=now)
+        OutboxMessage.objects.filter(pk=lapsed.pk).update(claimed_at=now - timedelta(hours=1))
+        outbox.dispatch([live, lapsed], self.send)
+        self.assertEqual(self.sent, [lapsed.email])
+        live.refresh_from_db()
+        self.assertEqual((live.status, live.claim_token), (OutboxMessage.SENDING, "other"))
+
+    def test_result_is_dropped_when_the_claim_was_taken_over(self):
+        msg, = self.make_messages(1)
+        recorded = []
+
+        def send(m):
+            # Another worker reclaims the message while this send is in flight
+            OutboxMessage.objects.filter(pk=m.pk).update(claim_token="other", status=OutboxMessage.SENDING)
+            return {"id": "late"}
+
+        outbox.dispatch([msg], send, on_result=lambda m, error: recorded.append(m.pk))
+        msg.refresh_from_db()
+        self.assertEqual((msg.status, msg.claim_token, msg.gmail_id), (OutboxMessage.SENDING, "other", ""))
+        self.assertEqual(recorded, [])
+
+    @override_settings(HIRING_GMAIL_SENDS_PER_SEC=1000, HIRING_OUTBOX_LEASE=0.004)
+    def test_claims_a_window_at_a_time(self):
+        # 1000 sends/s over half a 4ms lease: windows of two
+        messages = self.make_messages(5)
+        unclaimed = []
+
+        def send(m):
+            unclaimed.append(OutboxMessage.objects.filter(status=OutboxMessage.PENDING).count())
+            return self.send(m)
+
+        outbox.dispatch(messages, send)
+        self.assertEqual(len(self.sent), 5)
+        self.assertEqual(max(unclaimed), 3)
+        self.assertEqual(set(OutboxMessage.objects.values_list('attempts', flat=True)), {1})
+
+
+@override_settings(HIRING_GMAIL_SENDS_PER_SEC=1000, HIRING_OUTBOX_RETRIES=0, HIRING_JOBS_EAGER=False, HIRING_JOB_LEASE=60)
+class InviteJobRetryTests(TransactionTestCase):
+    def setUp(self):
+        outbox.reset()
+        self.campaign = make_campaign()
+        for i in range(2):
+            Candidate.objects.create(campaign=self.campaign, response_id=f"r{i}", email=f"p{i}@example.com",
+                                     email_key=f"p{i}@example.com", score=10 - i)
+        self.automator = HiringAutomator()
+        self.automator.gmail = fakes.FakeGmail(error_rate=1.0)
+        patcher = mock.patch.object(jobs, "automator", return_value=self.automator)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        outbox.reset()
+
+    def test_failed_sends_are_not_recorded_as_done(self):
+        job = jobs.enqueue(Job.INVITES, self.campaign, {
+            'emails': ["p0@example.com", "p1@example.com"], 'interview_date': "2030-01-07T09:00"})
+        job = jobs.run(jobs.claim(job_id=job.pk))
+        self.assertEqual((job.done_keys, job.failures, job.processed), ([], 2, 2))
+
+        # A worker that resumes the job (here: after its lease lapsed) sends them this time
+        Job.objects.filter(pk=job.pk).update(status=Job.RUNNING, heartbeat_at=timezone.now() - timedelta(minutes=5))
+        self.automator.gmail.error_rate = 0
+        job = jobs.run(jobs.claim(job_id=job.pk))
+        self.assertEqual((job.done_keys, job.failures), (["p0@example.com", "p1@example.com"], 0))
+        self.assertEqual(len(self.automator.gmail.sent), 2)
+
+
+class SchedulerTests(TestCase):
+    minutes, buffer = 45, 15
+
+    def setUp(self):
+        self.campaign = make_campaign()
+        self.first = datetime(2030, 1, 7, 9, 0, tzinfo=dt_timezone.utc)  # a Monday
+
+    def book(self, keys, first=None):
+        return scheduler.book(self.campaign, [(key, None) for key in keys], first or self.first,
+                              self.minutes, self.buffer, "09:00-12:00", {0, 1, 2, 3, 4}, 5)
+
+    def assert_no_overlap(self):
+        slots = list(InterviewSlot.objects.filter(campaign=self.campaign).order_by('start'))
+        for a, b in zip(slots, slots[1:]):
+            self.assertGreaterEqual(b.start, a.end + timedelta(minutes=self.buffer), f"{a.email_key} / {b.email_key}")
+
+    def test_allocate_skips_booked_intervals_and_keeps_the_buffer(self):
+        booked = scheduler.BookedIndex([(self.first + timedelta(minutes=60), self.first + timedelta(minutes=105))])
+        windows = [(self.first, self.first + timedelta(hours=3))]
+        starts = scheduler.allocate(3, windows, booked, self.minutes, self.buffer)
+        # 9:00 ends with its buffer just as the 10:00 booking starts; 10:45 + 15 puts the next at 11:00
+        self.assertEqual([(s - self.first).seconds // 60 for s in starts], [0, 120])
+        self.assertEqual(len(booked), 3)
+
+    def test_later_runs_book_around_earlier_ones(self):
+        first = self.book(["a", "b", "c"])
+        later = self.book(["d", "e"], first=self.first - timedelta(hours=1))
+        self.assertEqual(len(first) + len(later), 5)
+        self.assert_no_overlap()
+
+    def test_a_booked_candidate_keeps_their_slot(self):
+        start = self.book(["a"])["a"].start
+        again = self.book(["b", "a"])
+        self.assertEqual(again["a"].start, start)
+        self.assertEqual(InterviewSlot.objects.filter(email_key="a").count(), 1)
+
+    @override_settings(HIRING_SYNC_WAIT=0.2)
+    def test_a_run_waits_for_the_one_holding_the_schedule(self):
+        # Runs are serialised by the campaign's "schedule" lock, so each sees the other's bookings
+        owner = locks.acquire(self.campaign, "schedule", ttl=60)
+        with self.assertRaises(locks.LockHeld):
+            self.book(["a"])
+        self.assertFalse(InterviewSlot.objects.exists())
+        locks.release(self.campaign, "schedule", owner)
+        self.assertEqual(list(self.book(["a"])), ["a"])
+
+    def test_candidates_without_a_free_slot_are_left_out(self):
+        # 3 hours a day for 5 weekdays fits 15 one-hour slots (45 minutes + 15 buffer)
+        booked = self.book([f"k{i}" for i in range(20)])
+        self.assertEqual(len(booked), 15)
+        self.assert_no_overlap()
+
+    def test_lengths_that_could_overlap_are_refused(self):
+        for minutes, buffer in [(45, -30), (-5, 15), (0, 15)]:
+            with self.subTest(minutes=minutes, buffer=buffer):
+                with self.assertRaises(ValueError):
+                    scheduler.options(minutes, buffer)
+                with self.assertRaises(ValueError):
+                    scheduler.book(self.campaign, [("a", None), ("b", None)], self.first, minutes, buffer,
+                                   "09:00-12:00", {0, 1, 2, 3, 4}, 5)
+        self.assertFalse(InterviewSlot.objects.exists())
+        self.assertEqual(scheduler.options("", "")["minutes"], 45)
+
+    @override_settings(HIRING_JOBS_EAGER=False)
+    def test_invite_form_reports_bad_lengths_without_queueing(self):
+        Candidate.objects.create(campaign=self.campaign, response_id="r1", email="a@example.com", email_key="a@example.com")
+        url = reverse('send_invites', args=[self.campaign.pk])
+        form = {'selected_candidates': ["a@example.com"], 'interview_date': "2030-01-07T09:00"}
+        response = self.client.post(url, dict(form, slot_minutes="45", buffer_minutes="-30"))
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, "buffer between interviews", status_code=400)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(self.client.post(url, dict(form, slot_minutes="30", buffer_minutes="0")).status_code, 302)
+        self.assertEqual(Job.objects.get().params['slot_minutes'], 30)
+
+
+@override_settings(HIRING_WEBHOOK_TOKEN="s3cret", HIRING_JOBS_EAGER=False)
+class FormsWebhookTests(TestCase):
+    def setUp(self):
+        self.campaign = make_campaign(form_id="form-1")
+
+    def post(self, token=None, body=None):
+        url = reverse('forms_webhook') + (f"?token={token}" if token is not None else "")
+        return self.client.post(url, data=json.dumps(body if body is not None else {"formId": "form-1"}),
+                                content_type="application/json")
+
+    def test_rejects_a_missing_or_wrong_token(self):
+        self.assertEqual(self.post().status_code, 403)
+        self.assertEqual(self.post("wrong").status_code, 403)
+        self.assertEqual(self.post("s3cret-but-longer").status_code, 403)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(HIRING_WEBHOOK_TOKEN="")
+    def test_is_off_without_a_configured_token(self):
+        self.assertEqual(self.post("").status_code, 404)
+        self.assertFalse(Job.objects.exists())
+
+    def test_only_accepts_post(self):
+        self.assertEqual(self.client.get(reverse('forms_webhook') + "?token=s3cret").status_code, 405)
+
+    def test_bad_body_is_rejected(self):
+        response = self.client.post(reverse('forms_webhook') + "?token=s3cret", data="not json",
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_valid_push_queues_work_for_the_form(self):
+        response = self.post("s3cret")
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get()
+        self.assertEqual((job.kind, job.campaign_id), (Job.SYNC, self.campaign.pk))
+        self.post("s3cret", {"formId": "form-1", "responseIds": ["r2", "r1"]})
+        self.assertEqual(Job.objects.get(kind=Job.INGEST).params, {'response_ids': ["r1", "r2"]})
+
+    def test_pushes_for_unknown_forms_are_acknowledged(self):
+        response = self.post("s3cret", {"formId": "other"})
+        self.assertEqual((response.status_code, response.json()), (202, {'jobs': []}))
+
+
+class CampaignLockTests(TestCase):
+    def setUp(self):
+        self.campaign = make_campaign()
+
+    def test_a_live_lock_is_not_taken_twice(self):
+        owner = locks.acquire(self.campaign, "sync", ttl=60)
+        self.assertIsNone(locks.acquire(self.campaign, "sync", ttl=60))
+        self.assertIsNotNone(locks.acquire(self.campaign, "schedule", ttl=60))
+        self.assertIsNotNone(locks.acquire(make_campaign(), "sync", ttl=60))
+        locks.release(self.campaign, "sync", owner)
+        self.assertIsNotNone(locks.acquire(self.campaign, "sync", ttl=60))
+
+    def test_an_expired_lock_is_taken_over(self):
+        stale = locks.acquire(self.campaign, "sync", ttl=60)
+        CampaignLock.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        owner = locks.acquire(self.campaign, "sync", ttl=60)
+        self.assertNotIn(owner, (None, stale))
+        # The crashed holder's release must not free the new owner's lock
+        locks.release(self.campaign, "sync", stale)
+        self.assertTrue(locks.is_locked(self.campaign, "sync"))
+
+    def test_campaign_lock_raises_while_held_and_releases_on_error(self):
+        with self.assertRaises(ValueError), locks.campaign_lock(self.campaign, "sync"):
+            with self.assertRaises(locks.LockHeld), locks.campaign_lock(self.campaign, "sync"):
+                pass
+            raise ValueError
+        self.assertFalse(locks.is_locked(self.campaign, "sync"))
+
+
+class DedupeTests(SimpleTestCase):
+    def test_normalize_email(self):
+        self.assertEqual(dedupe.normalize_email(" Jane.Doe+jobs@GMail.com "), "janedoe@gmail.com")
+        self.assertEqual(dedupe.normalize_email("jane.doe@googlemail.com"), "janedoe@gmail.com")
+        # Other providers treat dots and tags as part of the address
+        self.assertEqual(dedupe.normalize_email("Jane.Doe+jobs@example.com"), "jane.doe+jobs@example.com")
+        self.assertEqual(dedupe.normalize_email("not-an-email"), "not-an-email")
+        self.assertEqual(dedupe.normalize_email(None), "")
+
+    def test_latest_submission_supersedes_earlier_ones(self):
+        slots = [{"id": "r1", "key": "a"}, {"id": "r2", "key": "b"}, {"id": "r3", "key": "a"},
+                 {"id": "r4", "key": ""}, {"id": "r5", "key": "a"}]
+        latest = dedupe.supersede(slots, key=lambda s: s["key"])
+        self.assertEqual({k: s["id"] for k, s in latest.items()}, {"a": "r5", "b": "r2"})
+        self.assertEqual([s.get("duplicate_of") for s in slots], ["r3", None, "r5", None, None])
+
+
+@override_settings(HIRING_JOBS_EAGER=False, HIRING_RECONCILE_INTERVAL=0)
+class ResponseSheetLogTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.campaign = make_campaign()
+        self.automator = HiringAutomator()
+        corpus = fakes.resume_corpus(2)
+        self.automator.forms = fakes.FakeForms(fakes.form_responses(list(corpus)))
+        self.automator.drive = fakes.FakeDrive(corpus)
+        self.automator.sheets = fakes.FakeSheets(error_rate=1.0)
+
+    def test_a_failed_append_keeps_the_sync_and_is_retried_by_reconcile(self):
+        self.automator.sync_responses(download_workers=2, parse_workers=1, campaign=self.campaign)
+        self.assertEqual(self.campaign.candidates.count(), 2)
+        self.assertEqual(self.campaign.processed_responses.filter(logged_to_sheet=False).count(), 2)
+        self.assertFalse(CampaignLock.objects.exists())
+
+        self.automator.sheets.error_rate = 0
+        self.assertEqual(push.reconcile(self.automator)["sheet_errors"], [])
+        rows = self.automator.sheets.tabs["Responses"]
+        self.assertEqual(rows[0], RESPONSES_HEADER)
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ["resp-f0", "resp-f1"])
+        self.assertFalse(self.campaign.processed_responses.filter(logged_to_sheet=False).exists())
+        # Nothing is appended twice
+        self.automator.flush_response_log(self.campaign)
+        self.assertEqual(len(self.automator.sheets.tabs["Responses"]), 3)
+
+
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.campaign = make_campaign()
+        self.automator = HiringAutomator()
+
+    def import_rows(self, rows, campaign=None):
+        return self.automator.import_candidates(rows, parse_workers=1, campaign=campaign or self.campaign)
+
+    def test_import_skips_known_addresses_and_flags_missing_resumes(self):
+        counts = self.import_rows([
+            {"email": "Jane.Doe@gmail.com", "text": "Python Django developer"},
+            {"email": "janedoe+old@gmail.com", "text": "an older copy"},
+            {"email": "sam@example.com"},
+            {"email": ""},
+        ])
+        self.assertEqual(counts, {"imported": 2, "skipped": 2, "no_resume": 1})
+        self.assertEqual(self.import_rows([{"email": "jane.doe@gmail.com", "text": "again"}])["skipped"], 1)
+        sam = self.campaign.candidates.get(email_key="sam@example.com")
+        self.assertEqual(sam.status, Candidate.DOWNLOAD_FAILED)
+        self.campaign.refresh_from_db()
+        self.assertTrue(self.campaign.relevance_stale)
+
+    def test_exported_csv_imports_into_another_campaign(self):
+        self.import_rows([{"email": "a@example.com", "text": "Python and SQL", "submitted_at": "2024-05-01"},
+                          {"email": "b@example.com", "text": "Go and Kubernetes"}])
+        path = os.path.join(settings.MEDIA_ROOT, "export.csv")
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            names = [name for name, _ in bulk.columns(with_text=True)]
+            fh.writelines(bulk.csv_chunks(bulk.candidate_rows(self.campaign, with_text=True), names))
+
+        rows = list(bulk.read_rows(path))
+        self.assertEqual([(r["email"], r["text"], r["submitted_at"]) for r in rows],
+                         [("a@example.com", "Python and SQL", "2024-05-01"), ("b@example.com", "Go and Kubernetes", "")])
+        other = make_campaign(role="Data Engineer")
+        self.assertEqual(self.import_rows(rows, campaign=other), {"imported": 2, "skipped": 0, "no_resume": 0})
+        exported = {c.email_key: c.score for c in self.campaign.candidates.all()}
+        self.assertEqual({c.email_key: c.score for c in other.candidates.all()}, exported)
+
+    def test_unknown_file_types_are_refused(self):
+        with self.assertRaises(bulk.FormatUnavailable):
+            list(bulk.read_rows("candidates.xlsx"))
+
+
+class ScoringTests(SimpleTestCase):
+    def test_skills_match_on_word_boundaries(self):
+        profile = scoring.ScoringProfile({"java": 2, "api": 1, "c++": 1, "node": 1, "javascript": 1})
+        self.assertEqual(profile.score("JavaScript at a capital firm")[1], {"javascript": 1})
+        self.assertEqual(profile.score("Java. C++ and Node.js")[1], {"java": 1, "c++": 1, "node": 1})
+        self.assertEqual(profile.score("Javanese, node.jsx, C#")[1], {})
+
+    def test_longest_phrase_wins_and_each_skill_counts_once(self):
+        profile = scoring.ScoringProfile({"rest": 3, "api": 1})
+        # "rest apis" is one mention of REST, not REST plus API
+        self.assertEqual(profile.score("REST APIs, REST APIs"), (3, {"rest": 2}))
+
+    def test_score_many_matches_scoring_each_resume(self):
+        profile = scoring.get_profile({"java": 2, "api": 1, "python": 1})
+        texts = ["Java and Python", "capital", "", None, "api", "java"]
+        self.assertEqual(profile.score_many(texts), [profile.score(t) for t in texts])
+        self.assertIs(scoring.get_profile({"python": 1, "java": 2, "api": 1}), profile)
+
+    def test_profile_from_jd_weights_by_section(self):
+        jd = "Backend role with Docker\n## Must-haves\n- Python, Kafka\n## Nice-to-haves\n- Python, Rust, Docker"
+        self.assertEqual(scoring.profile_from_jd(jd), {"docker": 2, "python": 3, "kafka": 3, "rust": 1})
+        self.assertEqual(scoring.profile_from_jd("No skills named here"), scoring.DEFAULT_TERMS)
+
+
+class PdfTextTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "resume.pdf")
+        pages = [["Python and Django"], ["Kafka streams"], ["Rust services"], ["Go tooling"]]
+        with open(self.path, "wb") as fh: fh.write(fakes.make_pdf(pages))
+
+    def extract(self, **caps):
+        text, meta = pdf_text.extract_text(self.path, **caps)
+        meta.pop("seconds")
+        return text, meta
+
+    def test_reads_every_page_without_caps(self):
+        text, meta = self.extract()
+        self.assertIn("Rust services", text)
+        self.assertEqual((meta["pages_read"], meta["total_pages"], meta["truncated"]), (4, 4, None))
+
+    def test_stops_at_the_page_and_character_caps(self):
+        text, meta = self.extract(max_pages=2)
+        self.assertNotIn("Rust", text)
+        self.assertEqual((meta["pages_read"], meta["truncated"]), (2, pdf_text.PAGE_LIMIT))
+        text, meta = self.extract(max_chars=20)
+        # Pages are joined with newlines; the cap counts the pages' own text
+        self.assertEqual(text, "Python and Django\nKaf")
+        self.assertEqual((meta["pages_read"], meta["truncated"]), (2, pdf_text.CHAR_LIMIT))
+
+    def test_oversized_missing_and_broken_files(self):
+        text, meta = self.extract(max_bytes=100)
+        self.assertEqual((text, meta["pages_read"], meta["truncated"]), ("", 0, pdf_text.TOO_LARGE))
+        os.replace(self.path, self.path + ".gone")
+        self.assertEqual(self.extract()[1]["truncated"], pdf_text.ERROR)
+        with open(self.path, "wb") as fh: fh.write(b"%PDF-1.4 not really")
+        self.assertEqual(self.extract(), ("", {"pages_read": 0, "total_pages": None, "bytes": 19, "truncated": pdf_text.ERROR}))
+
+    def test_stops_once_every_skill_is_seen(self):
+        text, meta = self.extract(terms={"python": 1, "kafka": 1}, early_stop_chars=1)
+        self.assertEqual((meta["pages_read"], meta["truncated"]), (2, pdf_text.SKILLS_FOUND))
+
+    def test_a_page_that_never_finishes_is_interrupted(self):
+        # On the main thread SIGALRM cuts into the page itself
+        with mock.patch.object(PageObject, "extract_text", side_effect=lambda *a, **k: time.sleep(5)):
+            started = time.monotonic()
+            text, meta = self.extract(timeout=0.1)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual((text, meta["pages_read"], meta["truncated"]), ("", 0, pdf_text.TIMEOUT))
+
+    def test_off_the_main_thread_the_deadline_is_checked_between_pages(self):
+        out = []
+        slow_page = lambda *a, **k: time.sleep(0.2) or "page"
+        with mock.patch.object(PageObject, "extract_text", side_effect=slow_page):
+            worker = threading.Thread(target=lambda: out.append(self.extract(timeout=0.3)))
+            worker.start()
+            worker.join()
+        text, meta = out[0]
+        self.assertEqual((meta["pages_read"], meta["truncated"]), (2, pdf_text.TIMEOUT))
+
+
+class DriveDownloadTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "f1.pdf")
+        self.content = fakes.resume_corpus(1, prefix="f")["f0"]
+        self.drive = fakes.FakeDrive({"f1": self.content})
+        self.meta = self.drive.files().get(fileId="f1").execute()
+        self.ranges = []
+        serve = self.drive.http.request
+
+        def request(uri, method="GET", headers=None):
+            self.ranges.append(int(headers["range"].split("=")[1].split("-")[0]))
+            return serve(uri, method, headers)
+        self.drive.http.request = request
+        sleep = mock.patch.object(drive_download.time, "sleep")
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def download(self, **kwargs):
+        return drive_download.download(self.drive, "f1", self.path, self.meta, chunk_size=500, **kwargs)
+
+    def read(self):
+        with open(self.path, "rb") as fh: return fh.read()
+
+    def test_downloads_in_ranged_chunks(self):
+        self.download()
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(self.ranges, list(range(0, len(self.content), 500)))
+        self.assertFalse(os.path.exists(self.path + ".part"))
+
+    def test_resumes_from_a_partial_file(self):
+        with open(self.path + ".part", "wb") as fh: fh.write(self.content[:700])
+        self.download()
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(self.ranges[0], 700)
+
+    def test_a_transient_error_keeps_the_partial_file(self):
+        serve, calls = self.drive.http.request, []
+
+        def flaky(uri, method="GET", headers=None):
+            calls.append(uri)
+            if len(calls) == 2: raise HttpError(httplib2.Response({"status": 503, "reason": "fake"}), b"", uri=uri)
+            return serve(uri, method, headers)
+        self.drive.http.request = flaky
+        self.download(retries=1)
+        self.assertEqual(self.read(), self.content)
+        # The failed request for the second chunk is retried from there, not from the start
+        self.assertEqual(self.ranges, list(range(0, len(self.content), 500)))
+        self.assertEqual(len(calls), len(self.ranges) + 1)
+
+    def test_bytes_that_fail_verification_are_fetched_again(self):
+        with open(self.path + ".part", "wb") as fh: fh.write(b"x" * len(self.content))
+        self.download(retries=1)
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(self.ranges[0], len(self.content))
+
+    def test_gives_up_on_missing_files_and_spent_retries(self):
+        with self.assertRaises(drive_download.DownloadFailed):
+            drive_download.download(self.drive, "missing", self.path, retries=3, chunk_size=500)
+        self.assertEqual(len(self.ranges), 1)  # a 404 is not retried
+        self.drive.error_rate = 1.0
+        with self.assertRaisesMessage(drive_download.DownloadFailed, "HTTP"):
+            self.download(retries=2)
+        self.assertFalse(os.path.exists(self.path))
+
+
+@override_settings(HIRING_JOBS_EAGER=False, HIRING_JOB_LEASE=60, HIRING_JOB_MAX_ATTEMPTS=2)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.campaign = make_campaign()
+        self.calls = []
+
+    def handle(self, job, skip, progress):
+        self.calls.append(set(skip))
+        keys = [k for k in job.params['keys'] if k not in skip]
+        for key in keys[:2]: progress([key], [], len(job.params['keys']))
+        if len(keys) > 2: raise RuntimeError("worker died")
+        return [f"{len(keys)} done"]
+
+    def run_job(self, job):
+        with mock.patch.dict(jobs.HANDLERS, {Job.SYNC: self.handle}):
+            return jobs.run(jobs.claim(worker="w1", job_id=job.pk))
+
+    def test_identical_jobs_are_queued_once(self):
+        job = jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]})
+        self.assertEqual(jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]}), job)
+        self.assertNotEqual(jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["b"]}), job)
+        self.assertEqual(jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]}, reuse_running=False), job)
+        # Once it runs, work that must start after the call gets a job of its own
+        Job.objects.filter(pk=job.pk).update(status=Job.RUNNING)
+        self.assertEqual(jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]}), job)
+        self.assertNotEqual(jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]}, reuse_running=False), job)
+
+    def test_a_running_job_is_only_claimed_once_its_lease_lapses(self):
+        job = jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]})
+        claimed = jobs.claim(worker="w1")
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, Job.RUNNING, 1))
+        self.assertIsNone(jobs.claim(worker="w2"))
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=61))
+        taken = jobs.claim(worker="w2")
+        self.assertEqual((taken.pk, taken.worker, taken.attempts), (job.pk, "w2", 2))
+
+    def test_a_retried_job_skips_the_keys_it_finished(self):
+        job = jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a", "b", "c", "d", "e"]})
+        job = self.run_job(job)
+        self.assertEqual((job.status, job.done_keys, job.processed, job.total), (Job.QUEUED, ["a", "b"], 2, 5))
+        self.assertIn("worker died", job.error)
+        job = self.run_job(job)
+        self.assertEqual(self.calls, [set(), {"a", "b"}])
+        # Out of attempts with work left: the job fails instead of going round again
+        self.assertEqual((job.status, job.done_keys, job.attempts), (Job.FAILED, ["a", "b", "c", "d"], 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_a_finished_job_keeps_its_results(self):
+        job = self.run_job(jobs.enqueue(Job.SYNC, self.campaign, {'keys': ["a"]}))
+        self.assertEqual((job.status, job.results, job.error), (Job.DONE, ["1 done"], ""))
+        self.assertTrue(job.campaign.runs.filter(job=job).exists())
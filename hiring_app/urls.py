@@ -1,11 +1,30 @@
 from django.urls import path
 from . import views
 
+# The unscoped routes act on the newest active campaign; campaigns/<id>/... name one explicitly
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('generate-jd/', views.generate_jd, name='generate_jd'),
+    path('generate-jd/stream/', views.generate_jd_stream, name='generate_jd_stream'),
     path('create-campaign/', views.create_campaign, name='create_campaign'),
     path('sync/', views.sync_responses, name='sync_responses'),
     path('invite/', views.send_invites, name='send_invites'),
     path('outcomes/', views.send_outcomes, name='send_outcomes'),
-]
\ No newline at end of file
+    path('evaluate/', views.evaluate_candidates, name='evaluate_candidates'),
+    path('rescore/', views.rescore_candidates, name='rescore_candidates'),
+    path('candidates/', views.candidates_json, name='candidates_json'),
+    path('campaigns/<int:campaign_id>/', views.dashboard, name='dashboard'),
+    path('campaigns/<int:campaign_id>/sync/', views.sync_responses, name='sync_responses'),
+    path('campaigns/<int:campaign_id>/invite/', views.send_invites, name='send_invites'),
+    path('campaigns/<int:campaign_id>/outcomes/', views.send_outcomes, name='send_outcomes'),
+    path('campaigns/<int:campaign_id>/evaluate/', views.evaluate_candidates, name='evaluate_candidates'),
+    path('campaigns/<int:campaign_id>/rescore/', views.rescore_candidates, name='rescore_candidates'),
+    path('campaigns/<int:campaign_id>/candidates/', views.candidates_json, name='candidates_json'),
+    path('campaigns/<int:campaign_id>/candidates/<int:candidate_id>/', views.candidate_detail, name='candidate_detail'),
+    path('campaigns/<int:campaign_id>/export/', views.export_candidates, name='export_candidates'),
+    path('campaigns/<int:campaign_id>/close/', views.close_campaign, name='close_campaign'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('metrics/', views.pipeline_metrics, name='pipeline_metrics'),
+    path('hooks/forms/', views.forms_webhook, name='forms_webhook'),
+    path('campaigns/<int:campaign_id>/metrics/', views.pipeline_metrics, name='pipeline_metrics'),
+]
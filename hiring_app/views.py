@@ -1,31 +1,140 @@
-from django.shortcuts import render, redirect
+from django.core.paginator import Paginator
+from django.db.models import F, OuterRef, Subquery
+from django.http import (FileResponse, Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+                         StreamingHttpResponse)
+from django.shortcuts import render, redirect, get_object_or_404
 from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from . import bulk, details, jobs, push, scheduler
+from .models import Campaign, Candidate, Job, Outcome, PipelineRun
 from .services import HiringAutomator
+import hmac
 import os
+import tempfile
+from urllib.parse import urlencode
 
 # Helper to initialize service
 def get_automator():
     # Looks for token.json in the project root
     token_path = os.path.join(settings.BASE_DIR, 'token.json')
-    state_path = os.path.join(settings.BASE_DIR, 'campaign_state.json')
-    return HiringAutomator(token_path, state_path)
+    return HiringAutomator(token_path)
 
-def dashboard(request):
-    try:
-        automator = get_automator()
-        state = automator.load_state()
-    except Exception as e:
-        # Pass empty state if file read fails
-        state = {}
-        # You might want to log the error or handle it, 
-        # but for dashboard load, we usually just want it to render.
-        # If critical errors persist, the error page logic from previous steps handles specific actions.
-
-    context = {
-        'state': state,
-        'candidates': state.get('candidates', [])
-    }
-    return render(request, 'hiring_app/dashboard.html', context)
+# Only the summary columns the candidate table renders; the rest is fetched per row by candidate_detail
+CANDIDATE_COLUMNS = ('id', 'email', 'status', 'submissions', 'invited_at', 'score', 'relevance', 'llm_rating',
+                     'extract_meta', 'submitted_at')
+
+# ?sort= choices. Keyword score first by default; JD relevance (BM25) breaks the many ties between equal scores
+CANDIDATE_SORTS = {
+    'score': ('-score', '-relevance', 'id'),
+    'relevance': ('-relevance', '-score', 'id'),
+    'rating': (F('llm_rating').desc(nulls_last=True), '-score', 'id'),
+    'newest': ('-submitted_at', '-id'),
+    'oldest': ('submitted_at', 'id'),
+}
+# ?status= choices; `decision` is the latest outcome sent to the candidate's address
+CANDIDATE_STATUSES = {
+    'undecided': {'decision__isnull': True},
+    'invited': {'invited_at__isnull': False},
+    'offer_sent': {'decision': Outcome.OFFER_SENT},
+    'rejected': {'decision': Outcome.REJECTED},
+    'reviewed': {'llm_rating__isnull': False},
+    'unreviewed': {'llm_rating__isnull': True},
+    'download_failed': {'status': Candidate.DOWNLOAD_FAILED},
+}
+MAX_PAGE_SIZE = 200
+
+def _int_param(params, name, default):
+    try: return int(params.get(name, default))
+    except (TypeError, ValueError): return default
+
+def candidate_page(campaign, params):
+    # One page of the campaign's candidates, filtered and sorted by the query string, so
+    # the dashboard and the JSON endpoint cost the same whatever the campaign size.
+    sort = params.get('sort') if params.get('sort') in CANDIDATE_SORTS else 'score'
+    status = params.get('status') if params.get('status') in CANDIDATE_STATUSES else ''
+    min_score = _int_param(params, 'min_score', None)
+    per_page = min(max(_int_param(params, 'per_page', getattr(settings, 'HIRING_DASHBOARD_PAGE_SIZE', 50)), 1), MAX_PAGE_SIZE)
+
+    latest_outcome = Outcome.objects.filter(campaign=campaign, email=OuterRef('email')).order_by('-created_at', '-id')
+    candidates = campaign.candidates.only('campaign', *CANDIDATE_COLUMNS).annotate(
+        decision=Subquery(latest_outcome.values('status')[:1]))
+    if min_score is not None: candidates = candidates.filter(score__gte=min_score)
+    if status: candidates = candidates.filter(**CANDIDATE_STATUSES[status])
+    page = Paginator(candidates.order_by(*CANDIDATE_SORTS[sort]), per_page).get_page(params.get('page'))
+    filters = {'sort': sort, 'status': status, 'min_score': '' if min_score is None else min_score, 'per_page': per_page}
+    return page, filters
+
+def get_campaign(campaign_id=None):
+    # Campaign-scoped URLs name their campaign; the bare ones fall back to the newest active
+    if campaign_id is not None: return get_object_or_404(Campaign, pk=campaign_id)
+    return Campaign.objects.filter(is_active=True).first()
+
+def to_dashboard(campaign):
+    return redirect('dashboard', campaign_id=campaign.pk) if campaign else redirect('dashboard')
+
+def dashboard_context(params=None, campaign_id=None):
+    campaign = get_campaign(campaign_id)
+    context = {'state': campaign, 'candidates': [], 'page': None, 'filters': {}, 'jobs': [],
+               'campaigns': Campaign.objects.filter(is_active=True).only('id', 'role')}
+    if campaign:
+        context['page'], context['filters'] = candidate_page(campaign, params or {})
+        # Pagination links keep the current filters
+        context['filter_query'] = urlencode({k: v for k, v in context['filters'].items() if v != ''})
+        context['candidates'] = context['page'].object_list
+        context['has_candidates'] = campaign.candidates.exists()
+        context['jobs'] = campaign.jobs.all()[:5]
+    return context
+
+def dashboard(request, campaign_id=None):
+    return render(request, 'hiring_app/dashboard.html', dashboard_context(request.GET, campaign_id))
+
+def candidates_json(request, campaign_id=None):
+    # Same page the dashboard table shows, for scripts and client-side rendering
+    campaign = get_campaign(campaign_id)
+    if not campaign: return JsonResponse({'error': 'No active campaign'}, status=404)
+    page, filters = candidate_page(campaign, request.GET)
+    return JsonResponse({
+        'page': page.number, 'num_pages': page.paginator.num_pages, 'count': page.paginator.count,
+        'filters': filters,
+        'results': [{
+            'id': c.id, 'email': c.email, 'status': c.status, 'submissions': c.submissions,
+            'invited_at': c.invited_at, 'score': c.score, 'relevance': c.relevance, 'llm_rating': c.llm_rating,
+            'extract_meta': c.extract_meta, 'submitted_at': c.submitted_at, 'decision': c.decision,
+        } for c in page.object_list],
+    })
+
+def candidate_detail(request, campaign_id, candidate_id):
+    # Loaded when a row is expanded: everything the summary leaves out, with the full resume text
+    cand = get_object_or_404(Candidate.objects.only('drive_link', 'keyword_hits', 'llm_summary', 'extract_meta', 'text_preview'), pk=candidate_id, campaign_id=campaign_id)
+    stored = details.load([cand.pk]).get(cand.pk, {})
+    return JsonResponse({
+        'id': cand.id, 'drive_link': cand.drive_link, 'keyword_hits': cand.keyword_hits,
+        'llm_summary': cand.llm_summary, 'extract_meta': cand.extract_meta,
+        'text': stored.get('text') or cand.text_preview, 'full_text': 'text' in stored,
+    })
+
+def export_candidates(request, campaign_id):
+    # Every candidate of the campaign as ?format=csv|parquet|arrow (?text=1 adds resume text)
+    campaign = get_campaign(campaign_id)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in bulk.FORMATS: return HttpResponseBadRequest(f"format must be one of {', '.join(bulk.FORMATS)}")
+    with_text = request.GET.get('text') == '1'
+    cols = bulk.columns(with_text)
+    rows = bulk.candidate_rows(campaign, with_text=with_text)
+    filename = f"campaign_{campaign.pk}_candidates.{fmt}"
+    if fmt == 'csv':
+        response = StreamingHttpResponse(bulk.csv_chunks(rows, [name for name, _ in cols]), content_type=bulk.FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    # Parquet's footer is written last, so build the file on disk and stream that
+    out = tempfile.TemporaryFile()
+    try: bulk.write_arrow(rows, cols, out, fmt)
+    except bulk.FormatUnavailable as e:
+        out.close()
+        return HttpResponse(str(e), status=501, content_type='text/plain')
+    out.seek(0)
+    return FileResponse(out, as_attachment=True, filename=filename, content_type=bulk.FORMATS[fmt])
 
 def generate_jd(request):
     if request.method == "POST":
@@ -45,13 +154,21 @@ def generate_jd(request):
         }
         
         # We need to reload the state for the rest of the dashboard
-        state = automator.load_state()
-        context['state'] = state
-        context['candidates'] = state.get('candidates', [])
+        context.update(dashboard_context(request.GET))
         
         return render(request, 'hiring_app/dashboard.html', context)
     return redirect('dashboard')
 
+def generate_jd_stream(request):
+    # Used by the dashboard's JS: the draft is written into the page as Gemini produces it
+    if request.method != "POST": return redirect('dashboard')
+    automator = get_automator()
+    stream = automator.stream_jd(request.POST.get('role'), request.POST.get('experience'))
+    response = StreamingHttpResponse(stream, content_type='text/plain; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx hold the stream back
+    return response
+
 def create_campaign(request):
     if request.method == "POST":
         role = request.POST.get('role')
@@ -68,45 +185,120 @@ def create_campaign(request):
         return redirect('dashboard')
     return redirect('dashboard')
 
-def sync_responses(request):
-    automator = get_automator()
-    automator.sync_responses()
+def close_campaign(request, campaign_id):
+    # Stops the campaign showing up in sync_all and the campaign switcher; its data stays
+    if request.method == "POST":
+        Campaign.objects.filter(pk=campaign_id).update(is_active=False)
     return redirect('dashboard')
 
-def send_invites(request):
+def _hours_param(params):
+    # "HH:MM-HH:MM" from the invite form's day_start/day_end, or None for the default hours
+    start, end = params.get('day_start'), params.get('day_end')
+    return f"{start}-{end}" if start and end and start < end else None
+
+def job_params(request, params):
+    # ?profile=1 (or a profile=1 form field) turns on the sampling profiler for that run
+    if request.GET.get('profile') == '1' or request.POST.get('profile') == '1':
+        params['profile'] = True
+    return params
+
+# Sync, invites and outcomes are queued as background jobs (see jobs.py / run_jobs);
+# the dashboard polls job_status for progress.
+def sync_responses(request, campaign_id=None):
+    campaign = get_campaign(campaign_id)
+    if campaign:
+        # ?full=1 ignores the stored watermark and re-lists every response
+        jobs.enqueue(Job.SYNC, campaign, job_params(request, {'full_resync': request.GET.get('full') == '1'}))
+    return to_dashboard(campaign)
+
+def send_invites(request, campaign_id=None):
+    campaign = get_campaign(campaign_id)
     if request.method == "POST":
         # Get emails from checkbox in UI
         selected_emails = request.POST.getlist('selected_candidates')
         interview_date = request.POST.get('interview_date') # Format YYYY-MM-DDTHH:MM
         
-        print(f"DEBUG: Attempting to send to: {selected_emails}")
-        
         if not selected_emails:
-            print("DEBUG: No emails were selected!")
-            return redirect('dashboard')
-        
-        automator = get_automator()
-        results = automator.send_invites(selected_emails, "Hiring Team", interview_date)
+            return to_dashboard(campaign)
         
-        # Optional: Print results to console for debugging
-        print("\n--------- EMAIL RESULTS ---------")
-        for r in results:
-            print(r)
-        print("---------------------------------\n")
+        if campaign:
+            # Optional overrides of the HIRING_INTERVIEW_* defaults, checked here rather than failing in the job
+            overrides = {
+                'slot_minutes': _int_param(request.POST, 'slot_minutes', None),
+                'buffer_minutes': _int_param(request.POST, 'buffer_minutes', None),
+                'hours': _hours_param(request.POST),
+            }
+            try:
+                scheduler.options(overrides['slot_minutes'], overrides['buffer_minutes'], overrides['hours'])
+            except ValueError as e:
+                context = dashboard_context(request.GET, campaign.pk)
+                context['invite_error'] = str(e)
+                return render(request, 'hiring_app/dashboard.html', context, status=400)
+            jobs.enqueue(Job.INVITES, campaign, job_params(request, {
+                'emails': selected_emails, 'organizer': "Hiring Team", 'interview_date': interview_date, **overrides,
+            }))
         
-    return redirect('dashboard')
+    return to_dashboard(campaign)
 
-def send_outcomes(request):
+def send_outcomes(request, campaign_id=None):
+    campaign = get_campaign(campaign_id)
     if request.method == "POST":
         # Get list of people selected for HIRE
         hired_emails = request.POST.getlist('hired_candidates')
         
-        automator = get_automator()
-        results = automator.send_outcomes(hired_emails)
-        
-        print("\n--------- OUTCOME RESULTS ---------")
-        for r in results:
-            print(r)
-        print("-----------------------------------\n")
+        if campaign:
+            jobs.enqueue(Job.OUTCOMES, campaign, job_params(request, {'hired_emails': sorted(hired_emails)}))
         
-    return redirect('dashboard')
\ No newline at end of file
+    return to_dashboard(campaign)
+
+def evaluate_candidates(request, campaign_id=None):
+    campaign = get_campaign(campaign_id)
+    if request.method == "POST":
+        if campaign:
+            jobs.enqueue(Job.EVALUATE, campaign, job_params(request, {'force': request.POST.get('force') == '1'}))
+    return to_dashboard(campaign)
+
+def rescore_candidates(request, campaign_id=None):
+    # Re-checks every resume against Drive and the current scoring profile
+    campaign = get_campaign(campaign_id)
+    if request.method == "POST":
+        if campaign:
+            jobs.enqueue(Job.RESCORE, campaign, job_params(request, {}))
+    return to_dashboard(campaign)
+
+def job_status(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    return JsonResponse({
+        'id': job.pk, 'kind': job.kind, 'status': job.status,
+        'processed': job.processed, 'total': job.total, 'failures': job.failures,
+        'finished': job.is_finished, 'error': job.error.strip().splitlines()[-1] if job.error else "",
+    })
+
+
+def pipeline_metrics(request, campaign_id=None):
+    # Breakdown of the latest runs: ?kind=sync|invites|outcomes|evaluate, ?runs=N, ?profile=1 for sampled stacks
+    runs = PipelineRun.objects.select_related('campaign')
+    if campaign_id: runs = runs.filter(campaign_id=campaign_id)
+    if request.GET.get('kind'): runs = runs.filter(kind=request.GET['kind'])
+    with_profile = request.GET.get('profile') == '1'
+    runs = runs[:min(_int_param(request.GET, 'runs', 1), 50)]
+    return JsonResponse({'runs': [{
+        'id': run.pk, 'kind': run.kind, 'campaign': run.campaign_id, 'job': run.job_id,
+        'started_at': run.started_at.isoformat(), 'seconds': run.seconds,
+        'stages': run.stages, 'counters': run.counters, 'errors': run.errors,
+        **({'profile': run.profile.splitlines()} if with_profile else {}),
+    } for run in runs]})
+
+@csrf_exempt
+@require_POST
+def forms_webhook(request):
+    # Push endpoint for the Forms watch's Pub/Sub subscription (or a local stand-in posting
+    # {"formId", "responseIds"}); the shared HIRING_WEBHOOK_TOKEN rides along as ?token=
+    expected = getattr(settings, 'HIRING_WEBHOOK_TOKEN', '')
+    if not expected: raise Http404
+    if not hmac.compare_digest(request.GET.get('token', ''), expected): return HttpResponseForbidden()
+    try: form_id, response_ids = push.parse(request.body)
+    except ValueError: return HttpResponseBadRequest("Body must be JSON")
+    # Anything else is acknowledged: Pub/Sub would otherwise redeliver it indefinitely
+    queued = push.notify(form_id, response_ids) if form_id else []
+    return JsonResponse({'jobs': [job.pk for job in queued]}, status=202)
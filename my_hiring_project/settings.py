@@ -80,6 +80,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Several gunicorn workers share this file: wait for the write lock instead of failing,
+        # and take it up front so read-then-write transactions can't deadlock on upgrade.
+        'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
     }
 }
 
@@ -133,3 +136,98 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # Google Gemini Key
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+
+# Sync pipeline concurrency (Drive downloads on threads, PDF parsing on processes)
+HIRING_DOWNLOAD_WORKERS = int(os.getenv('HIRING_DOWNLOAD_WORKERS', 8))
+HIRING_PARSE_WORKERS = int(os.getenv('HIRING_PARSE_WORKERS', os.cpu_count() or 1))
+
+# Per-campaign sync lock: how long a crashed holder keeps it, and how long a concurrent request waits
+HIRING_SYNC_LOCK_TTL = int(os.getenv('HIRING_SYNC_LOCK_TTL', 900))
+HIRING_SYNC_WAIT = int(os.getenv('HIRING_SYNC_WAIT', 120))
+
+# Resume cache size caps (least-recently-used PDFs / extracted texts are evicted past these)
+HIRING_PDF_CACHE_MAX_BYTES = int(os.getenv('HIRING_PDF_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+HIRING_TEXT_CACHE_MAX_BYTES = int(os.getenv('HIRING_TEXT_CACHE_MAX_BYTES', 200 * 1024 ** 2))
+
+# Email outbox: sends per second across all senders, concurrent senders, how long a
+# claim on a message stays with a silent worker (a live one renews it), and retries on
+# rate limits / 5xx
+HIRING_GMAIL_SENDS_PER_SEC = float(os.getenv('HIRING_GMAIL_SENDS_PER_SEC', 2))
+HIRING_OUTBOX_WORKERS = int(os.getenv('HIRING_OUTBOX_WORKERS', 4))
+HIRING_OUTBOX_LEASE = int(os.getenv('HIRING_OUTBOX_LEASE', 300))
+HIRING_OUTBOX_RETRIES = int(os.getenv('HIRING_OUTBOX_RETRIES', 5))
+
+# Background jobs: lease before a silent worker's job is taken over, retry budget, and
+# HIRING_JOBS_EAGER=1 to run jobs inline in the request (handy without a worker running)
+HIRING_JOB_LEASE = int(os.getenv('HIRING_JOB_LEASE', 600))
+HIRING_JOB_MAX_ATTEMPTS = int(os.getenv('HIRING_JOB_MAX_ATTEMPTS', 3))
+HIRING_JOBS_EAGER = os.getenv('HIRING_JOBS_EAGER', '0') == '1'
+
+# Gemini resume review: resumes per prompt, chars kept per resume, parallel prompts, quota and retries.
+# HIRING_FAKE_GEMINI=1 swaps in the offline stand-in from hiring_app/fakes.py.
+HIRING_LLM_MODEL = os.getenv('HIRING_LLM_MODEL', 'gemini-2.5-flash-lite')
+HIRING_LLM_BATCH_SIZE = int(os.getenv('HIRING_LLM_BATCH_SIZE', 8))
+HIRING_LLM_RESUME_CHARS = int(os.getenv('HIRING_LLM_RESUME_CHARS', 3000))
+HIRING_LLM_CONCURRENCY = int(os.getenv('HIRING_LLM_CONCURRENCY', 2))
+HIRING_LLM_RPM = int(os.getenv('HIRING_LLM_RPM', 15))
+HIRING_LLM_TPM = int(os.getenv('HIRING_LLM_TPM', 250000))
+HIRING_LLM_RETRIES = int(os.getenv('HIRING_LLM_RETRIES', 5))
+HIRING_FAKE_GEMINI = os.getenv('HIRING_FAKE_GEMINI', '0') == '1'
+
+# Generated JDs are cached per (role, experience, prompt version, model)
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'jd': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'jd-drafts',
+        'TIMEOUT': int(os.getenv('HIRING_JD_CACHE_TTL', 7 * 24 * 3600)),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('HIRING_JD_CACHE_SIZE', 256))},
+    },
+}
+
+# PDF extraction caps per resume (pages, file size, characters, seconds); see hiring_app/pdf_text.py.
+# Extraction also stops once every profile skill is found and this much text has been read (0 = off).
+HIRING_PDF_MAX_PAGES = int(os.getenv('HIRING_PDF_MAX_PAGES', 15))
+HIRING_PDF_MAX_BYTES = int(os.getenv('HIRING_PDF_MAX_BYTES', 10 << 20))
+HIRING_PDF_MAX_CHARS = int(os.getenv('HIRING_PDF_MAX_CHARS', 50000))
+HIRING_PDF_TIMEOUT = int(os.getenv('HIRING_PDF_TIMEOUT', 10))
+HIRING_PDF_EARLY_STOP_CHARS = int(os.getenv('HIRING_PDF_EARLY_STOP_CHARS', 4000))
+
+# Candidates per dashboard page (?per_page= overrides, up to 200)
+HIRING_DASHBOARD_PAGE_SIZE = int(os.getenv('HIRING_DASHBOARD_PAGE_SIZE', 50))
+
+# Google API requests per minute, shared by all campaigns syncing in this process
+HIRING_GOOGLE_RPM = {
+    'forms': int(os.getenv('HIRING_FORMS_RPM', 300)),
+    'drive': int(os.getenv('HIRING_DRIVE_RPM', 1000)),
+    'sheets': int(os.getenv('HIRING_SHEETS_RPM', 60)),
+    'gmail': int(os.getenv('HIRING_GMAIL_RPM', 250)),
+}
+# Campaigns synced at once by `manage.py sync_all`
+HIRING_SYNC_ALL_WORKERS = int(os.getenv('HIRING_SYNC_ALL_WORKERS', 4))
+
+# Resume downloads: attempts on 429/5xx/network errors (resuming the partial file) and Range chunk size
+HIRING_DOWNLOAD_RETRIES = int(os.getenv('HIRING_DOWNLOAD_RETRIES', 5))
+HIRING_DOWNLOAD_CHUNK_BYTES = int(os.getenv('HIRING_DOWNLOAD_CHUNK_BYTES', 8 << 20))
+
+# Pipeline metrics (see hiring_app/metrics.py): runs kept in the database, and the sampling
+# interval in seconds when a run is profiled (?profile=1 on the action that queued it)
+HIRING_METRICS_KEEP = int(os.getenv('HIRING_METRICS_KEEP', 200))
+HIRING_PROFILE_INTERVAL = float(os.getenv('HIRING_PROFILE_INTERVAL', 0.005))
+
+# Push ingestion: Pub/Sub topic Forms watches publish to ("projects/<project>/topics/<topic>";
+# empty = no watches), the token the push subscription appends as ?token= to /hooks/forms/,
+# and how stale (seconds) a campaign's last full listing may get before run_jobs re-syncs it
+HIRING_FORMS_WATCH_TOPIC = os.getenv('HIRING_FORMS_WATCH_TOPIC', '')
+HIRING_WEBHOOK_TOKEN = os.getenv('HIRING_WEBHOOK_TOKEN', '')
+HIRING_RECONCILE_INTERVAL = int(os.getenv('HIRING_RECONCILE_INTERVAL', 900))
+
+# Interview scheduling (see hiring_app/scheduler.py): slot length and gap between interviews in
+# minutes, daily hours and weekdays (0=Mon) interviewers are available, how many days ahead
+# slots may go, and the time zone of dashboard times (empty = the server's)
+HIRING_INTERVIEW_MINUTES = int(os.getenv('HIRING_INTERVIEW_MINUTES', 45))
+HIRING_INTERVIEW_BUFFER = int(os.getenv('HIRING_INTERVIEW_BUFFER', 15))
+HIRING_INTERVIEW_HOURS = os.getenv('HIRING_INTERVIEW_HOURS', '09:00-17:00')
+HIRING_INTERVIEW_WEEKDAYS = os.getenv('HIRING_INTERVIEW_WEEKDAYS', '0,1,2,3,4')
+HIRING_INTERVIEW_HORIZON_DAYS = int(os.getenv('HIRING_INTERVIEW_HORIZON_DAYS', 30))
+HIRING_INTERVIEW_TZ = os.getenv('HIRING_INTERVIEW_TZ', '')